@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, NamedTuple, Optional
+
+from prometheus_client import Counter, Gauge
+
+from settings import env_float
+
+QUEUE_DEPTH = Gauge("admission_queue_depth", "Requests waiting for a triage slot.", ["lane"])
+IN_FLIGHT = Gauge("admission_in_flight", "Requests currently being triaged.", ["lane"])
+SHED = Counter("admission_shed_total", "Requests rejected with 429.", ["lane", "reason"])
+DEGRADED = Counter("admission_degraded_total", "Requests triaged rulebook-only because of load.", ["lane"])
+
+HIGH = "high"
+NORMAL = "normal"
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: int) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Admission(NamedTuple):
+    lane: str
+    degraded: bool
+
+
+class _Lane:
+    def __init__(self, name: str, concurrency: int, max_waiting: Optional[int], degrade_at: Optional[int]) -> None:
+        self.name = name
+        self.concurrency = concurrency
+        self.max_waiting = max_waiting
+        self.degrade_at = degrade_at
+        self.in_flight = 0
+        self.waiting = 0
+        self.shed = 0
+        self.degraded = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout: Optional[float]) -> bool:
+        """Take a slot; returns whether the request should be degraded. Raises AdmissionRejected."""
+        with self._cond:
+            if self.max_waiting is not None and self.in_flight >= self.concurrency and self.waiting >= self.max_waiting:
+                self.shed += 1
+                SHED.labels(lane=self.name, reason="queue_full").inc()
+                raise AdmissionRejected("queue_full", retry_after=max(1, int(timeout or 1)))
+
+            degraded = self.degrade_at is not None and self.waiting >= self.degrade_at
+            self.waiting += 1
+            QUEUE_DEPTH.labels(lane=self.name).set(self.waiting)
+            try:
+                deadline = None if timeout is None else time.monotonic() + timeout
+                while self.in_flight >= self.concurrency:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self.shed += 1
+                        SHED.labels(lane=self.name, reason="queue_timeout").inc()
+                        raise AdmissionRejected("queue_timeout", retry_after=max(1, int(timeout or 1)))
+                    self._cond.wait(remaining)
+            finally:
+                self.waiting -= 1
+                QUEUE_DEPTH.labels(lane=self.name).set(self.waiting)
+
+            self.in_flight += 1
+            IN_FLIGHT.labels(lane=self.name).set(self.in_flight)
+            if degraded:
+                self.degraded += 1
+                DEGRADED.labels(lane=self.name).inc()
+            return degraded
+
+    def reject(self, reason: str) -> None:
+        """Count a request shed before it reached the queue (e.g. rate limited)."""
+        with self._cond:
+            self.shed += 1
+        SHED.labels(lane=self.name, reason=reason).inc()
+
+    def release(self) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            IN_FLIGHT.labels(lane=self.name).set(self.in_flight)
+            self._cond.notify()
+
+    def stats(self) -> Dict[str, object]:
+        with self._cond:
+            return {
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "concurrency": self.concurrency,
+                "max_waiting": self.max_waiting,
+                "degrade_at": self.degrade_at,
+                "shed": self.shed,
+                "degraded": self.degraded,
+            }
+
+
+class _TokenBuckets:
+    """Per-key token buckets (e.g. one per Datadog host or reporter)."""
+
+    def __init__(self, rate: float, burst: float, max_keys: int = 10_000) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self.limited = 0
+
+    def take(self, key: str) -> Optional[int]:
+        """Consume a token; returns None if allowed, else seconds until the next token."""
+        if self.rate <= 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens < 1.0:
+                self._buckets[key] = [tokens, now]
+                self.limited += 1
+                return max(1, math.ceil((1.0 - tokens) / self.rate))
+            self._buckets[key] = [tokens - 1.0, now]
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+            return None
+
+    def _prune(self, now: float) -> None:
+        full_after = self.burst / self.rate
+        stale = [k for k, (_, last) in self._buckets.items() if now - last >= full_after]
+        for k in stale:
+            del self._buckets[k]
+
+
+class AdmissionController:
+    """Two-lane admission in front of triage.
+
+    P1 candidates (Datadog force_p1, rulebook P1 override) use the high lane,
+    which is never rate limited or shed. Everything else is rate limited per
+    source/host key and goes through a bounded normal lane: past `degrade_at`
+    waiting requests they are triaged rulebook-only, and once the queue is full
+    (or a slot does not free up in time) they are rejected with Retry-After.
+    Keep normal concurrency + queue below the server threadpool size so waiting
+    requests cannot starve the high lane of threads.
+    """
+
+    def __init__(self) -> None:
+        self.queue_timeout = env_float("ADMISSION_QUEUE_TIMEOUT_SECONDS", 10)
+        self.high = _Lane(HIGH, int(env_float("ADMISSION_HIGH_CONCURRENCY", 8)), None, None)
+        self.normal = _Lane(
+            NORMAL,
+            int(env_float("ADMISSION_NORMAL_CONCURRENCY", 8)),
+            int(env_float("ADMISSION_MAX_QUEUE", 16)),
+            int(env_float("ADMISSION_DEGRADE_QUEUE", 4)),
+        )
+        self.buckets = _TokenBuckets(
+            rate=env_float("ADMISSION_RATE_PER_SECOND", 5),
+            burst=env_float("ADMISSION_BURST", 20),
+        )
+
+    @contextmanager
+    def admit(self, priority: bool, key: str) -> Iterator[Admission]:
+        if priority:
+            self.high.acquire(None)
+            try:
+                yield Admission(HIGH, False)
+            finally:
+                self.high.release()
+            return
+
+        retry_after = self.buckets.take(key)
+        if retry_after is not None:
+            self.normal.reject("rate_limited")
+            raise AdmissionRejected("rate_limited", retry_after=retry_after)
+
+        degraded = self.normal.acquire(self.queue_timeout)
+        try:
+            yield Admission(NORMAL, degraded)
+        finally:
+            self.normal.release()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            HIGH: self.high.stats(),
+            NORMAL: self.normal.stats(),
+            "rate_limited": self.buckets.limited,
+        }
+
+
+controller = AdmissionController()
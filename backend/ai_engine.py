@@ -1,15 +1,24 @@
 from __future__ import annotations
 
 import json
+import logging
+import math
 import os
+import random
 import re
 from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
 
 from dotenv import load_dotenv
 import yaml
 
+from settings import env_float
+from telemetry import record_fallback, stage
+from text_prep import bounded_text, llm_excerpt
+
+logger = logging.getLogger(__name__)
+
 # Load environment variables
 load_dotenv()
 load_dotenv(dotenv_path=Path(__file__).resolve().parent / ".env", override=False)
@@ -21,7 +30,8 @@ load_dotenv(dotenv_path=Path(__file__).resolve().parent / ".env", override=False
 
 @lru_cache(maxsize=1)
 def load_rulebook() -> dict:
-    rulebook_path = Path(__file__).resolve().parent / "rulebook.yml"
+    # RULEBOOK_PATH lets `replay.py` evaluate a candidate rulebook before it replaces the real one.
+    rulebook_path = Path(os.getenv("RULEBOOK_PATH", "").strip() or Path(__file__).resolve().parent / "rulebook.yml")
     if not rulebook_path.exists():
         raise FileNotFoundError(f"rulebook.yml not found at: {rulebook_path}")
 
@@ -33,43 +43,87 @@ def load_rulebook() -> dict:
 # RULE-BASED LOGIC
 # ==============================
 
+class RuleMatch(NamedTuple):
+    """Everything the rulebook matched in one ticket, from a single scan of its text."""
+
+    override_phrase: Optional[str]
+    team: str
+    routing_hits: Dict[str, List[str]]
+    severity_hits: Dict[str, List[str]]
+
+
 def _contains_p1_override(text: str, rulebook: dict) -> bool:
     t = text.lower()
     phrases = rulebook.get("overrides", {}).get("p1_phrases", []) or []
     return any(str(phrase).lower() in t for phrase in phrases)
 
 
-def _route_team_rule_based(title: str, description: str, rulebook: dict) -> str:
-    text = f"{title}\n{description}".lower()
+def _rulebook_terms(rulebook: dict) -> Tuple[str, ...]:
+    """Every phrase `match_rules` looks for: P1 overrides, routing keywords and severity signals."""
+    groups = [rulebook.get("overrides", {}).get("p1_phrases", []) or []]
+    groups += list((rulebook.get("routing", {}).get("rules", {}) or {}).values())
+    groups += list((rulebook.get("severity", {}).get("signals", {}) or {}).values())
+    return tuple(sorted({str(term).lower() for group in groups for term in (group or [])}))
 
-    routing = rulebook.get("routing", {})
-    rules: Dict[str, List[str]] = routing.get("rules", {}) or {}
-    team_order = routing.get("teams", []) or list(rules.keys())
 
-    for team in team_order:
-        keywords = rules.get(team, []) or []
-        if any(str(k).lower() in text for k in keywords):
-            return str(team)
+def _rules_text(title: str, description: str, rulebook: dict) -> str:
+    # Bounded view of long descriptions; lines carrying any rulebook phrase are always kept.
+    return f"{title}\n{bounded_text(description, _rulebook_terms(rulebook))}".lower()
 
-    return "Application Support"
 
+def match_rules(title: str, description: str, rulebook: dict) -> RuleMatch:
+    text = _rules_text(title, description, rulebook)
 
-def _severity_rule_based(title: str, description: str, rulebook: dict) -> Tuple[str, float, str]:
-    text = f"{title}\n{description}".lower()
+    phrases = rulebook.get("overrides", {}).get("p1_phrases", []) or []
+    override = next((str(p) for p in phrases if str(p).lower() in text), None)
 
-    if _contains_p1_override(text, rulebook):
-        return "P1", 0.99, "Critical override phrase detected."
+    routing = rulebook.get("routing", {}) or {}
+    rules: Dict[str, List[str]] = routing.get("rules", {}) or {}
+    routing_hits = {str(t): [str(k) for k in (kws or []) if str(k).lower() in text] for t, kws in rules.items()}
+    team_order = routing.get("teams", []) or list(rules.keys())
+    team = next((str(t) for t in team_order if routing_hits.get(str(t))), "Application Support")
 
     signals = rulebook.get("severity", {}).get("signals", {}) or {}
+    severity_hits = {str(sev): [str(k) for k in (kws or []) if str(k).lower() in text] for sev, kws in signals.items()}
+
+    return RuleMatch(override, team, routing_hits, severity_hits)
+
+
+def _severity_rule_based(match: RuleMatch) -> Tuple[str, float, str]:
+    if match.override_phrase:
+        return "P1", 0.99, "Critical override phrase detected."
 
     for sev in ["P1", "P2", "P3", "P4"]:
-        keywords = signals.get(sev, []) or []
-        if any(str(k).lower() in text for k in keywords):
+        if match.severity_hits.get(sev):
             return sev, 0.75, f"Detected {sev} severity keywords."
 
     return "P3", 0.55, "Defaulted to P3 due to weak signals."
 
 
+def build_decision_trace(match: RuleMatch, severity: str, team: str, triage_source: Optional[str]) -> dict:
+    """Explain the final severity/routing from the match results triage already computed."""
+    severity_match = next(iter(match.severity_hits.get(severity) or []), None)
+    routing_match = next(iter(match.routing_hits.get(team) or []), None)
+
+    if match.override_phrase:
+        severity_logic = "P1 override"
+        signals_detected = match.override_phrase
+    elif severity_match:
+        severity_logic = f"Matched {severity} signal"
+        signals_detected = severity_match
+    else:
+        severity_logic = "AI classification"
+        signals_detected = None
+
+    return {
+        "triage_source": triage_source,
+        "signals_detected": signals_detected,
+        "severity_logic": severity_logic,
+        "routing_logic": f"Matched {team} keywords" if routing_match else f"Defaulted to {team}",
+        "routing_match": routing_match,
+    }
+
+
 def _fix_suggestions_rule_based(team: str, severity: str, rulebook: dict) -> List[str]:
     fixes = rulebook.get("fixes", {}) or {}
     base = fixes.get("base", []) or []
@@ -83,6 +137,61 @@ def _fix_suggestions_rule_based(team: str, severity: str, rulebook: dict) -> Lis
     return [str(s) for s in steps][:5]
 
 
+# ==============================
+# CONFIDENCE GATING
+# ==============================
+
+def _specificity(phrase: str) -> float:
+    # Multi-word phrases ("unable to login company-wide") are far less ambiguous than "down" or "error".
+    return float(min(3, len(phrase.split())))
+
+
+def _strength(matched: List[str], conflicting: List[str]) -> float:
+    support = sum(_specificity(p) for p in matched)
+    against = sum(_specificity(p) for p in conflicting)
+    if support <= 0:
+        return 0.0
+    return (1.0 - math.exp(-0.7 * support)) * (support / (support + against))
+
+
+def score_rulebook_match(match: RuleMatch, severity: str, team: str) -> Tuple[float, dict]:
+    """Score in [0, 1] for how unambiguously the rulebook supports `severity` and `team`.
+
+    Counts matched keywords weighted by specificity, discounted by matches that
+    point at other severities/teams. Severity dominates because routing is
+    rule-based either way; the LLM only decides severity and fixes.
+    """
+    sev_matched = match.severity_hits.get(severity, [])
+    sev_conflict = [k for sev, ks in match.severity_hits.items() if sev != severity for k in ks]
+
+    team_matched = match.routing_hits.get(team, [])
+    team_conflict = [k for t, ks in match.routing_hits.items() if t != team for k in ks]
+
+    severity_score = _strength(sev_matched, sev_conflict)
+    routing_score = _strength(team_matched, team_conflict)
+    score = round(0.75 * severity_score + 0.25 * routing_score, 4)
+
+    return score, {
+        "severity_matches": sev_matched,
+        "severity_conflicts": sev_conflict,
+        "routing_matches": team_matched,
+        "routing_conflicts": team_conflict,
+    }
+
+
+def llm_gate(match: RuleMatch, severity: str, team: str) -> dict:
+    """Decide whether the rulebook answer is strong enough to skip the LLM.
+
+    Skipped tickets are sampled at LLM_SHADOW_RATE for a background shadow call so
+    agreement with the LLM can be measured.
+    """
+    threshold = env_float("LLM_SKIP_THRESHOLD", 0.8)
+    score, matches = score_rulebook_match(match, severity, team)
+    skip = score >= threshold
+    shadow = skip and random.random() < env_float("LLM_SHADOW_RATE", 0.1)
+    return {"score": score, "threshold": threshold, "skip_llm": skip, "shadow": shadow, **matches}
+
+
 # ==============================
 # SAFE JSON EXTRACTION
 # ==============================
@@ -149,47 +258,40 @@ def _refine_fixes(ai_fixes: List[str], team: str, severity: str, rulebook: dict)
 
 
 # ==============================
-# MAIN TRIAGE FUNCTION
+# LLM TRIAGE
 # ==============================
 
-def triage_ticket(title: str, description: str) -> dict:
-    rulebook = load_rulebook()
-    text = f"{title}\n{description}"
+# (title, description, prompt) -> raw model text. When set it replaces the Gemini
+# call, and triage no longer needs GEMINI_API_KEY (offline replay, recorded answers).
+LLMResponder = Callable[[str, str, str], str]
+_llm_responder: Optional[LLMResponder] = None
 
-    # --- Hard override ---
-    if _contains_p1_override(text, rulebook):
-        team = _route_team_rule_based(title, description, rulebook)
-        return {
-            "severity": "P1",
-            "confidence": 0.99,
-            "reasoning": "Rule-based critical override triggered.",
-            "triage_source": "rulebook_override",
-            "assigned_team": team,
-            "suggested_fixes": _fix_suggestions_rule_based(team, "P1", rulebook),
-        }
 
-    # --- If no API key, fallback immediately ---
-    api_key = os.getenv("GEMINI_API_KEY", "").strip()
-    if not api_key:
-        team = _route_team_rule_based(title, description, rulebook)
-        severity, confidence, reasoning = _severity_rule_based(title, description, rulebook)
-        return {
-            "severity": severity,
-            "confidence": confidence,
-            "reasoning": reasoning,
-            "triage_source": "rulebook_no_api_key",
-            "assigned_team": team,
-            "suggested_fixes": _fix_suggestions_rule_based(team, severity, rulebook),
-        }
+def set_llm_responder(responder: Optional[LLMResponder]) -> None:
+    global _llm_responder
+    _llm_responder = responder
 
-    # --- AI TRIAGE ---
-    try:
-        from google import genai  # type: ignore
 
-        team = _route_team_rule_based(title, description, rulebook)
-        client = genai.Client(api_key=api_key)
+def llm_available() -> bool:
+    return bool(os.getenv("GEMINI_API_KEY", "").strip()) or _llm_responder is not None
+
 
-        prompt = f"""
+def _generate(prompt: str, api_key: str) -> str:
+    from google import genai  # type: ignore
+
+    base_url = os.getenv("GEMINI_BASE_URL", "").strip()
+    client = genai.Client(api_key=api_key, http_options={"base_url": base_url} if base_url else None)
+    response = client.models.generate_content(
+        model="gemini-2.5-flash",
+        contents=prompt,
+    )
+    return response.text or ""
+
+
+def _triage_with_llm(title: str, description: str, team: str, rulebook: dict, api_key: str) -> dict:
+    """Ask Gemini for severity/fixes. Raises on any client or parsing error."""
+    p1_phrases = tuple(str(p).lower() for p in rulebook.get("overrides", {}).get("p1_phrases", []) or [])
+    prompt = f"""
 You are an enterprise IT incident triage agent.
 
 Return STRICT JSON ONLY (no markdown, no extra keys) in this schema:
@@ -209,51 +311,170 @@ Constraints:
 
 Ticket:
 Title: {title}
-Description: {description}
+Description: {llm_excerpt(description, p1_phrases)}
 """.strip()
 
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-        )
+    with stage("llm"):
+        if _llm_responder is not None:
+            raw = _llm_responder(title, description, prompt)
+        else:
+            raw = _generate(prompt, api_key)
+
+    raw = raw.strip()
+    parsed = _extract_json_object(raw)
+
+    severity = str(parsed.get("severity", "P3"))
+    confidence = float(parsed.get("confidence", 0.6))
+    reasoning = str(parsed.get("reasoning", "AI triage result."))
+    ai_fixes = parsed.get("suggested_fixes", []) or []
+    if not isinstance(ai_fixes, list):
+        ai_fixes = []
+
+    if severity not in {"P1", "P2", "P3", "P4"}:
+        severity = "P3"
+    confidence = max(0.0, min(1.0, confidence))
+
+    # Rulebook refinement layer
+    suggested_fixes = _refine_fixes([str(x) for x in ai_fixes], team, severity, rulebook)
+
+    return {
+        "severity": severity,
+        "confidence": confidence,
+        "reasoning": reasoning,
+        "triage_source": "gemini",
+        "assigned_team": team,
+        "suggested_fixes": suggested_fixes,
+    }
+
+
+# ==============================
+# MAIN TRIAGE FUNCTIONS
+# ==============================
+
+def has_p1_override(title: str, description: str) -> bool:
+    """Whether the rulebook forces P1 for this text (used to prioritise admission)."""
+    rulebook = load_rulebook()
+    return _contains_p1_override(_rules_text(title, description, rulebook), rulebook)
+
+
+def forces_p1(source: Optional[str], metadata: Optional[dict]) -> bool:
+    """Whether a Datadog alert was flagged critical at ingest (`monitoring.parse_datadog_alert`)."""
+    return source == "datadog" and bool((metadata or {}).get("force_p1"))
+
+
+def apply_p1_override(result: dict) -> dict:
+    """A copy of a triage result with the Datadog P1 override applied on top."""
+    result = dict(result)
+    result["severity"] = "P1"
+    result["confidence"] = max(float(result.get("confidence", 0.75)), 0.9)
+    result["reasoning"] = "Datadog P1 override: critical monitoring alert triggered."
+    return result
+
+
+def _rulebook_result(match: RuleMatch, rulebook: dict, severity: str, confidence: float, reasoning: str, triage_source: str) -> dict:
+    return {
+        "severity": severity,
+        "confidence": confidence,
+        "reasoning": reasoning,
+        "triage_source": triage_source,
+        "assigned_team": match.team,
+        "suggested_fixes": _fix_suggestions_rule_based(match.team, severity, rulebook),
+        "rules": match,
+    }
+
 
-        raw = (response.text or "").strip()
-        parsed = _extract_json_object(raw)
+def triage_rulebook(title: str, description: str, triage_source: str = "rulebook", gate_llm: bool = True) -> dict:
+    """Rulebook-only triage (microseconds). The P1 override always wins and is reported as such.
 
-        severity = str(parsed.get("severity", "P3"))
-        confidence = float(parsed.get("confidence", 0.6))
-        reasoning = str(parsed.get("reasoning", "AI triage result."))
-        ai_fixes = parsed.get("suggested_fixes", []) or []
-        if not isinstance(ai_fixes, list):
-            ai_fixes = []
+    With `gate_llm=False` (load shedding: the LLM is not an option anyway) or when no
+    LLM is configured, the confidence gate is not consulted, so the ticket keeps
+    `triage_source` and no gate score.
+    """
+    rulebook = load_rulebook()
+
+    gate = None
+    with stage("rule_match"):
+        match = match_rules(title, description, rulebook)
+        if match.override_phrase:
+            severity, confidence, reasoning = "P1", 0.99, "Rule-based critical override triggered."
+            triage_source = "rulebook_override"
+        else:
+            severity, confidence, reasoning = _severity_rule_based(match)
+            if gate_llm and llm_available():
+                gate = llm_gate(match, severity, match.team)
+                if gate["skip_llm"]:
+                    triage_source = "rulebook_gated"
+
+    result = _rulebook_result(match, rulebook, severity, confidence, reasoning, triage_source)
+    result["gate"] = gate
+    return result
+
+
+def refine_with_llm(title: str, description: str) -> Optional[dict]:
+    """LLM triage on its own, or None when no API key is set or the call fails."""
+    if not llm_available():
+        return None
+    api_key = os.getenv("GEMINI_API_KEY", "").strip()
+
+    rulebook = load_rulebook()
+    with stage("rule_match"):
+        match = match_rules(title, description, rulebook)
+    try:
+        result = _triage_with_llm(title, description, match.team, rulebook, api_key)
+    except Exception as e:
+        logger.warning("AI refinement failed, keeping rulebook result: %s", e)
+        record_fallback("llm_error")
+        return None
+    result["rules"] = match
+    return result
+
+
+def triage_ticket(title: str, description: str) -> dict:
+    rulebook = load_rulebook()
 
-        if severity not in {"P1", "P2", "P3", "P4"}:
-            severity = "P3"
-        confidence = max(0.0, min(1.0, confidence))
+    api_key = os.getenv("GEMINI_API_KEY", "").strip()
 
-        # Rulebook refinement layer
-        suggested_fixes = _refine_fixes([str(x) for x in ai_fixes], team, severity, rulebook)
+    # One rule_match observation per ticket: scan, severity and confidence gate together.
+    with stage("rule_match"):
+        match = match_rules(title, description, rulebook)
+        if not match.override_phrase:
+            severity, confidence, reasoning = _severity_rule_based(match)
+            gate = llm_gate(match, severity, match.team) if llm_available() else None
 
-        return {
-            "severity": severity,
-            "confidence": confidence,
-            "reasoning": reasoning,
-            "triage_source": "gemini",
-            "assigned_team": team,
-            "suggested_fixes": suggested_fixes,
-        }
+    # --- Hard override ---
+    if match.override_phrase:
+        return _rulebook_result(
+            match, rulebook, "P1", 0.99, "Rule-based critical override triggered.", "rulebook_override"
+        )
+
+    # --- If no API key, fallback immediately ---
+    if gate is None:
+        return _rulebook_result(match, rulebook, severity, confidence, reasoning, "rulebook_no_api_key")
+
+    # --- Confidence gate: unambiguous rulebook signals skip the LLM ---
+    if gate["skip_llm"]:
+        result = _rulebook_result(
+            match,
+            rulebook,
+            severity,
+            confidence,
+            f"{reasoning} Strong rulebook match (score {gate['score']:.2f}); LLM skipped.",
+            "rulebook_gated",
+        )
+        result["gate"] = gate
+        return result
+
+    # --- AI TRIAGE ---
+    try:
+        result = _triage_with_llm(title, description, match.team, rulebook, api_key)
+        result["gate"] = gate
+        result["rules"] = match
+        return result
 
     except Exception as e:
-        # Optional: log error here
-        print("AI TRIAGE ERROR:", str(e))
-
-        team = _route_team_rule_based(title, description, rulebook)
-        severity, confidence, reasoning = _severity_rule_based(title, description, rulebook)
-
-        return {
-            "severity": severity,
-            "confidence": confidence,
-            "reasoning": reasoning,
-            "assigned_team": team,
-            "suggested_fixes": _fix_suggestions_rule_based(team, severity, rulebook),
-        }
\ No newline at end of file
+        logger.warning("AI triage failed, falling back to rulebook: %s", e)
+        record_fallback("llm_error")
+
+        result = _rulebook_result(match, rulebook, severity, confidence, reasoning, "rulebook_fallback")
+        result["gate"] = gate
+        return result
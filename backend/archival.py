@@ -0,0 +1,200 @@
+"""Move RESOLVED tickets out of the hot `tickets` table into `tickets_archive`.
+
+Runs in chunked batches, one short transaction each, so the hot table (and
+with it listing, search and claim latency) stays bounded without long locks.
+Archived tickets keep their ids; their incident clusters stay in
+`incident_clusters` and remain reachable for duplicate detection through
+`clustering.cold_index`. Reads opt in with `include_archived=true`.
+
+Run once from the backend directory:
+
+    python -m archival --older-than-days 30
+
+or set ARCHIVE_AFTER_DAYS to run it periodically inside the API process.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from sqlalchemy import Table, case, delete, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from changes import bump_change_counter
+from database import Base, SessionLocal, engine
+from models import ArchivedTicket, ArchiveMetric, Ticket
+from settings import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+_COLUMNS = [c.name for c in Ticket.__table__.columns]
+
+
+def _aggregate(db: Union[Session, Connection], table: Table, where: Any) -> Dict[Tuple[str, str], int]:
+    """The dashboard aggregates over the rows of `table` matching `where`."""
+    c = table.c
+    total, escalated, duplicates, monitoring = db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(case((c.escalated.is_(True), 1), else_=0)), 0),
+            func.coalesce(func.sum(case((c.is_duplicate.is_(True), 1), else_=0)), 0),
+            func.coalesce(func.sum(case((c.source == "datadog", 1), else_=0)), 0),
+        ).where(where)
+    ).one()
+    counts = {("total", ""): total, ("escalated", ""): escalated, ("duplicates", ""): duplicates}
+    counts[("monitoring", "")] = monitoring
+    for dimension, column in (("severity", c.severity), ("team", c.assigned_team)):
+        rows = db.execute(select(column, func.count()).where(where, column.isnot(None)).group_by(column))
+        counts.update({(dimension, str(key)): n for key, n in rows})
+    return {k: int(v) for k, v in counts.items() if v}
+
+
+def _add_archive_metrics(db: Union[Session, Connection], counts: Dict[Tuple[str, str], int]) -> None:
+    if not counts:
+        return
+    dialect_insert = pg_insert if engine.dialect.name == "postgresql" else sqlite_insert
+    stmt = dialect_insert(ArchiveMetric.__table__).values(
+        [{"dimension": dim, "key": key, "value": n} for (dim, key), n in counts.items()]
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["dimension", "key"], set_={"value": ArchiveMetric.__table__.c.value + stmt.excluded.value}
+        )
+    )
+
+
+def read_archive_metrics(db: Session) -> Dict[Tuple[str, str], int]:
+    return {(r.dimension, r.key): int(r.value) for r in db.execute(select(ArchiveMetric.__table__))}
+
+
+def ensure_archive_metrics(bind: Engine) -> None:
+    """Build the archive aggregates once for archives written before they were tracked."""
+    with bind.begin() as conn:
+        if conn.execute(select(ArchiveMetric.dimension).limit(1)).first() is not None:
+            return
+        if conn.execute(select(ArchivedTicket.id).limit(1)).first() is None:
+            return
+        _add_archive_metrics(conn, _aggregate(conn, ArchivedTicket.__table__, literal(True)))
+
+
+def archive_batch(db: Session, cutoff: datetime, batch_size: int) -> int:
+    """Copy up to `batch_size` RESOLVED tickets created before `cutoff` to the archive and
+    delete them from the hot table, in one transaction. Returns the number moved."""
+    # Never move the newest ticket: SQLite hands out max(id) + 1 to the next
+    # insert, which would reuse an id that now lives in the archive.
+    newest = select(func.max(Ticket.id)).scalar_subquery()
+    candidates = (
+        select(Ticket.id)
+        .where(Ticket.lifecycle_status == "RESOLVED", Ticket.created_at < cutoff, Ticket.id < newest)
+        .order_by(Ticket.id)
+        .limit(batch_size)
+    )
+    if engine.dialect.name == "postgresql":
+        candidates = candidates.with_for_update(skip_locked=True)
+
+    ids: List[int] = [int(r[0]) for r in db.execute(candidates)]
+    if not ids:
+        db.rollback()
+        return 0
+
+    table = Ticket.__table__
+    # Dashboard totals must not drop when tickets leave the hot table.
+    _add_archive_metrics(db, _aggregate(db, table, table.c.id.in_(ids)))
+    db.execute(
+        insert(ArchivedTicket.__table__).from_select(
+            _COLUMNS + ["archived_at"],
+            select(*(table.c[name] for name in _COLUMNS), literal(datetime.utcnow())).where(table.c.id.in_(ids)),
+        )
+    )
+    db.execute(delete(Ticket).where(Ticket.id.in_(ids)).execution_options(synchronize_session=False))
+    bump_change_counter(db)
+    db.commit()
+    return len(ids)
+
+
+def archive_resolved(
+    older_than_days: float,
+    batch_size: int = 1000,
+    max_batches: Optional[int] = None,
+    stop: Optional[threading.Event] = None,
+) -> int:
+    """Archive RESOLVED tickets older than `older_than_days`; returns the total moved."""
+    from clustering import cold_index
+    from events import RESYNC, bus
+
+    stop = stop or threading.Event()
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    pause = env_float("ARCHIVE_BATCH_PAUSE_SECONDS", 0.05)
+    moved = 0
+    batches = 0
+    db = SessionLocal()
+    try:
+        while max_batches is None or batches < max_batches:
+            count = archive_batch(db, cutoff, batch_size)
+            moved += count
+            batches += 1
+            if count < batch_size:
+                break
+            # Leave room for request traffic between batches.
+            if stop.wait(pause):
+                break
+    finally:
+        db.close()
+
+    if moved:
+        cold_index.invalidate()
+        bus.publish(RESYNC, {"reason": "archived", "count": moved})
+        logger.info("Archived %d resolved tickets created before %s", moved, cutoff.isoformat())
+    return moved
+
+
+class Archiver:
+    """Background thread running `archive_resolved` every ARCHIVE_INTERVAL_SECONDS."""
+
+    def __init__(self, older_than_days: float) -> None:
+        self.older_than_days = older_than_days
+        self.batch_size = env_int("ARCHIVE_BATCH_SIZE", 1000)
+        self.interval = env_float("ARCHIVE_INTERVAL_SECONDS", 3600)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                archive_resolved(self.older_than_days, self.batch_size, stop=self._stop)
+            except Exception:
+                logger.exception("Archival run failed")
+            self._stop.wait(self.interval)
+
+    def start(self) -> "Archiver":
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        self._thread.join(timeout)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Archive RESOLVED tickets older than a given age.")
+    parser.add_argument("--older-than-days", type=float, default=env_float("ARCHIVE_AFTER_DAYS", 30))
+    parser.add_argument("--batch-size", type=int, default=env_int("ARCHIVE_BATCH_SIZE", 1000))
+    parser.add_argument("--max-batches", type=int)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    Base.metadata.create_all(bind=engine, tables=[ArchivedTicket.__table__, ArchiveMetric.__table__])
+    ensure_archive_metrics(engine)
+    moved = archive_resolved(args.older_than_days, args.batch_size, args.max_batches)
+    print(f"Archived {moved} tickets")
+
+
+if __name__ == "__main__":
+    main()
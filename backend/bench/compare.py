@@ -0,0 +1,47 @@
+"""Compare two bench.ingest JSON reports, e.g. from two commits.
+
+    python -m bench.compare before.json after.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+_FIELDS = ["throughput_rps", "p50_ms", "p95_ms", "p99_ms"]
+
+
+def _index(report: Dict[str, Any]) -> Dict[Tuple[int, str], Dict[str, Any]]:
+    return {(r["table_size"], r["endpoint"]): r for r in report.get("results", [])}
+
+
+def _pct(before: float, after: float) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100.0:+.1f}%"
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args(argv)
+
+    before = json.loads(Path(args.before).read_text(encoding="utf-8"))
+    after = json.loads(Path(args.after).read_text(encoding="utf-8"))
+    print(f"before: {before.get('commit')}  after: {after.get('commit')}")
+
+    b_idx, a_idx = _index(before), _index(after)
+    for key in sorted(set(b_idx) & set(a_idx)):
+        size, endpoint = key
+        cells = [
+            f"{field}={b_idx[key][field]}->{a_idx[key][field]} ({_pct(b_idx[key][field], a_idx[key][field])})"
+            for field in _FIELDS
+        ]
+        print(f"[{size:>8}] {endpoint:<26} " + "  ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Local stand-ins for Gemini, Jira and n8n so benchmarks never leave the box."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Type
+
+GEMINI_TRIAGE_JSON = {
+    "severity": "P3",
+    "confidence": 0.7,
+    "reasoning": "Synthetic benchmark response.",
+    "suggested_fixes": [
+        "Check application logs for errors.",
+        "Confirm scope of impact.",
+        "Roll back recent changes if needed.",
+    ],
+}
+
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency_s: float = 0.0
+
+    def setup(self) -> None:
+        super().setup()
+        # One handler instance per TCP connection, so this counts handshakes.
+        self.server.connection_count += 1  # type: ignore[attr-defined]
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - stdlib signature
+        return
+
+    def _read_json(self) -> Any:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            return json.loads(raw or b"{}")
+        except ValueError:
+            return {}
+
+    def _send_json(self, status: int, body: Any) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def handle_payload(self, payload: Any) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def do_POST(self) -> None:  # noqa: N802 - stdlib naming
+        payload = self._read_json()
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        self.server.request_count += 1  # type: ignore[attr-defined]
+        self._send_json(200, self.handle_payload(payload))
+
+
+class FakeGeminiHandler(_FakeHandler):
+    def handle_payload(self, payload: Any) -> Dict[str, Any]:
+        return {
+            "candidates": [
+                {
+                    "content": {"role": "model", "parts": [{"text": json.dumps(GEMINI_TRIAGE_JSON)}]},
+                    "finishReason": "STOP",
+                }
+            ]
+        }
+
+
+class FakeJiraHandler(_FakeHandler):
+    def handle_payload(self, payload: Any) -> Dict[str, Any]:
+        n = self.server.request_count  # type: ignore[attr-defined]
+        if self.path.rstrip("/").endswith("/issue/bulk"):
+            updates = payload.get("issueUpdates", []) if isinstance(payload, dict) else []
+            return {"issues": [{"key": f"BENCH-{n}-{i}"} for i in range(len(updates))], "errors": []}
+        return {"key": f"BENCH-{n}"}
+
+
+class FakeN8nHandler(_FakeHandler):
+    def handle_payload(self, payload: Any) -> Dict[str, Any]:
+        return {"ok": True}
+
+
+class FakeServer:
+    """A ThreadingHTTPServer on an ephemeral localhost port, run in a daemon thread."""
+
+    def __init__(self, handler: Type[_FakeHandler], latency_ms: float = 0.0) -> None:
+        handler_cls = type(handler.__name__, (handler,), {"latency_s": latency_ms / 1000.0})
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler_cls)
+        self.httpd.daemon_threads = True
+        self.httpd.request_count = 0  # type: ignore[attr-defined]
+        self.httpd.connection_count = 0  # type: ignore[attr-defined]
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def request_count(self) -> int:
+        return int(self.httpd.request_count)  # type: ignore[attr-defined]
+
+    @property
+    def connection_count(self) -> int:
+        return int(self.httpd.connection_count)  # type: ignore[attr-defined]
+
+    def start(self) -> "FakeServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
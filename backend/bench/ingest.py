@@ -0,0 +1,249 @@
+"""Throughput / latency benchmark for the ingestion and read paths.
+
+Run from the backend directory:
+
+    python -m bench.ingest --sizes 1000 100000 --out bench_results.json
+
+Each table size gets a fresh database (SQLite file by default, or a Postgres
+URL via --database-url which is truncated between sizes), bulk-loaded with
+synthetic tickets. The app is served by uvicorn in a subprocess wired to local
+fake Gemini / Jira / n8n servers, so results are reproducible and offline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from sqlalchemy import create_engine, text
+
+from bench.fakes import FakeGeminiHandler, FakeJiraHandler, FakeN8nHandler, FakeServer
+from bench.synthetic import bulk_load, datadog_payload, synthetic_ticket
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return int(s.getsockname()[1])
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except Exception:
+        return None
+
+
+def _percentile(sorted_vals: List[float], pct: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = max(0, min(len(sorted_vals) - 1, int(round(pct / 100.0 * (len(sorted_vals) - 1)))))
+    return sorted_vals[k]
+
+
+def _prepare_database(url: str, size: int) -> None:
+    from database import Base
+    import models  # noqa: F401 - registers tables on Base.metadata
+
+    engine = create_engine(url, future=True)
+    Base.metadata.create_all(bind=engine)
+    if not url.startswith("sqlite"):
+        with engine.begin() as conn:
+            tables = ", ".join(t.name for t in Base.metadata.sorted_tables)
+            conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY"))
+    started = time.perf_counter()
+    bulk_load(engine, size)
+    print(f"  loaded {size} tickets in {time.perf_counter() - started:.1f}s", flush=True)
+    engine.dispose()
+
+
+def _start_app(port: int, env: Dict[str, str], workers: int) -> subprocess.Popen:
+    cmd = [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--log-level", "warning",
+    ]
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env)
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/openapi.json", timeout=2).status_code == 200:
+                return proc
+        except requests.RequestException:
+            pass
+        if proc.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError("uvicorn did not become ready")
+
+
+def _run_load(
+    name: str,
+    send: Callable[[requests.Session, int], requests.Response],
+    total: int,
+    concurrency: int,
+    warmup: int,
+) -> Dict[str, Any]:
+    sessions = [requests.Session() for _ in range(concurrency)]
+
+    for i in range(warmup):
+        send(sessions[i % concurrency], -1 - i)
+
+    def one(i: int) -> tuple[float, bool]:
+        t0 = time.perf_counter()
+        try:
+            ok = send(sessions[i % concurrency], i).status_code < 400
+        except requests.RequestException:
+            ok = False
+        return (time.perf_counter() - t0) * 1000.0, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - started
+
+    errors = sum(1 for _, ok in samples if not ok)
+    lat = sorted(ms for ms, _ in samples)
+    return {
+        "endpoint": name,
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(lat), 2) if lat else 0.0,
+        "p50_ms": round(_percentile(lat, 50), 2),
+        "p95_ms": round(_percentile(lat, 95), 2),
+        "p99_ms": round(_percentile(lat, 99), 2),
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    gemini = FakeServer(FakeGeminiHandler, latency_ms=args.llm_latency_ms).start()
+    jira = FakeServer(FakeJiraHandler, latency_ms=args.jira_latency_ms).start()
+    n8n = FakeServer(FakeN8nHandler).start()
+    workdir = Path(tempfile.mkdtemp(prefix="triage-bench-"))
+
+    results: List[Dict[str, Any]] = []
+    try:
+        for size in args.sizes:
+            url = args.database_url or f"sqlite:///{workdir / f'bench_{size}.db'}"
+            print(f"[size={size}] preparing {url}", flush=True)
+            _prepare_database(url, size)
+
+            port = _free_port()
+            env = dict(os.environ)
+            env.update(
+                {
+                    "DATABASE_URL": url,
+                    "GEMINI_API_KEY": "bench-fake-key",
+                    "GEMINI_BASE_URL": gemini.url,
+                    "EMBEDDING_PROVIDER": "local",
+                    "JIRA_BASE_URL": jira.url,
+                    "JIRA_EMAIL": "bench@example.com",
+                    "JIRA_API_TOKEN": "bench",
+                    "JIRA_PROJECT_KEY": "BENCH",
+                    "N8N_WEBHOOK_URL": f"{n8n.url}/webhook/bench",
+                }
+            )
+            # Measure full triage latency, not load shedding, unless explicitly configured.
+            env.setdefault("ADMISSION_RATE_PER_SECOND", "0")
+            env.setdefault("ADMISSION_DEGRADE_QUEUE", "1000")
+            env.setdefault("ADMISSION_MAX_QUEUE", "1000")
+            proc = _start_app(port, env, args.workers)
+            base = f"http://127.0.0.1:{port}"
+            rng = random.Random(size)
+            try:
+                plan = [
+                    (
+                        "POST /tickets",
+                        lambda s, i: s.post(f"{base}/tickets", json=synthetic_ticket(rng, i), timeout=120),
+                        args.write_requests,
+                    ),
+                    (
+                        "POST /monitoring/datadog",
+                        lambda s, i: s.post(f"{base}/monitoring/datadog", json=datadog_payload(rng, i), timeout=120),
+                        args.write_requests,
+                    ),
+                    (
+                        "GET /tickets",
+                        lambda s, i: s.get(f"{base}/tickets", timeout=600),
+                        args.list_requests,
+                    ),
+                    (
+                        "GET /dashboard/metrics",
+                        lambda s, i: s.get(f"{base}/dashboard/metrics", timeout=600),
+                        args.read_requests,
+                    ),
+                ]
+                for name, send, total in plan:
+                    if total <= 0:
+                        continue
+                    res = _run_load(name, send, total, args.concurrency, args.warmup)
+                    res["table_size"] = size
+                    results.append(res)
+                    print(
+                        f"  {name:<26} {res['throughput_rps']:>8} rps  "
+                        f"p50={res['p50_ms']}ms p95={res['p95_ms']}ms p99={res['p99_ms']}ms errors={res['errors']}",
+                        flush=True,
+                    )
+            finally:
+                proc.terminate()
+                proc.wait(timeout=30)
+    finally:
+        gemini.stop()
+        jira.stop()
+        n8n.stop()
+
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {k: v for k, v in vars(args).items() if k != "out"},
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--database-url", default=None, help="Postgres URL; defaults to a temp SQLite file per size")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--write-requests", type=int, default=200)
+    parser.add_argument("--read-requests", type=int, default=100)
+    parser.add_argument("--list-requests", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="artificial fake Gemini latency")
+    parser.add_argument("--jira-latency-ms", type=float, default=0.0, help="artificial fake Jira latency")
+    parser.add_argument("--out", default="bench_results.json")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
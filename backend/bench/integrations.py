@@ -0,0 +1,146 @@
+"""Escalation client benchmark: fresh connections vs pooled sessions vs bulk Jira create.
+
+Run from the backend directory:
+
+    python -m bench.integrations --escalations 500 --latency-ms 5 --out bench_integrations.json
+
+Every mode creates the same number of Jira issues against a local fake Jira
+server; the server counts TCP connections, so the report shows how many
+handshakes each mode paid for as well as escalations per second.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from bench.fakes import FakeJiraHandler, FakeServer
+
+
+def _issue(i: int) -> Dict[str, Any]:
+    return {
+        "summary": f"[P1] Benchmark escalation {i}",
+        "description": "Synthetic escalation created by bench.integrations.",
+        "priority": "Highest",
+        "labels": ["escalated"],
+    }
+
+
+def _unpooled(n: int, concurrency: int, batch: int) -> None:
+    """The previous behaviour: module-level requests.post, a new connection per call."""
+    from integrations.jira import _endpoint, _issue_fields
+
+    url, auth = _endpoint("issue")
+
+    def one(i: int) -> None:
+        requests.post(url, json={"fields": _issue_fields(**_issue(i))}, auth=auth, timeout=15)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(n)))
+
+
+def _pooled(n: int, concurrency: int, batch: int) -> None:
+    from integrations.jira import create_jira_issue
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda i: create_jira_issue(**_issue(i)), range(n)))
+
+
+def _bulk(n: int, concurrency: int, batch: int) -> None:
+    from integrations.jira import create_jira_issues
+
+    batches = [[_issue(i) for i in range(start, min(n, start + batch))] for start in range(0, n, batch)]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(create_jira_issues, batches))
+
+
+def _async_pooled(n: int, concurrency: int, batch: int) -> None:
+    from integrations.clients import close_clients
+    from integrations.jira import acreate_jira_issue
+
+    async def run() -> None:
+        limit = asyncio.Semaphore(concurrency)
+
+        async def one(i: int) -> None:
+            async with limit:
+                await acreate_jira_issue(**_issue(i))
+
+        try:
+            await asyncio.gather(*(one(i) for i in range(n)))
+        finally:
+            await close_clients()
+
+    asyncio.run(run())
+
+
+MODES: Dict[str, Callable[[int, int, int], None]] = {
+    "unpooled": _unpooled,
+    "pooled": _pooled,
+    "bulk": _bulk,
+    "async_pooled": _async_pooled,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escalations", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch", type=int, default=10, help="issues per bulk request")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="fake Jira response latency")
+    parser.add_argument("--modes", nargs="+", choices=sorted(MODES), default=list(MODES))
+    parser.add_argument("--out", type=Path)
+    args = parser.parse_args(argv)
+
+    results: List[Dict[str, Any]] = []
+    for mode in args.modes:
+        jira = FakeServer(FakeJiraHandler, latency_ms=args.latency_ms).start()
+        os.environ.update(
+            {
+                "JIRA_BASE_URL": jira.url,
+                "JIRA_EMAIL": "bench@example.com",
+                "JIRA_API_TOKEN": "bench",
+                "JIRA_PROJECT_KEY": "BENCH",
+            }
+        )
+        try:
+            started = time.perf_counter()
+            MODES[mode](args.escalations, args.concurrency, args.batch)
+            elapsed = time.perf_counter() - started
+        finally:
+            jira.stop()
+
+        row = {
+            "mode": mode,
+            "escalations": args.escalations,
+            "seconds": round(elapsed, 3),
+            "escalations_per_s": round(args.escalations / elapsed, 1) if elapsed else None,
+            "http_requests": jira.request_count,
+            "connections": jira.connection_count,
+        }
+        results.append(row)
+        print(
+            f"{mode:<13} {row['escalations_per_s']:>9} esc/s  "
+            f"requests={row['http_requests']:<6} connections={row['connections']}",
+            flush=True,
+        )
+
+    baseline = next((r for r in results if r["mode"] == "unpooled"), None)
+    if baseline:
+        for r in results:
+            r["handshakes_saved"] = baseline["connections"] - r["connections"]
+
+    if args.out:
+        report = {"config": vars(args) | {"out": str(args.out)}, "results": results}
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
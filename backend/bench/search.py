@@ -0,0 +1,131 @@
+"""Ticket search benchmark: index build time and query latency at large table sizes.
+
+Run from the backend directory:
+
+    python -m bench.search --sizes 100000 1000000 --out bench_search.json
+
+Each size gets a fresh database bulk-loaded with synthetic tickets. The
+full-text index is built afterwards (timed), then keyword queries with and
+without filters/pagination and vector ("semantic") queries against the
+cluster centroids are timed in-process.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from bench.synthetic import bulk_load
+
+_TERMS = ["vpn", "database", "checkout", "password", "outage", "breach", "latency", "crash", "expense", "portal"]
+_FILTERS: List[Dict[str, Any]] = [
+    {},
+    {"severity": "P1"},
+    {"assigned_team": "Network Team", "lifecycle_status": "RESOLVED"},
+]
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000.0, 2)
+
+    return {
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "mean_ms": round(statistics.mean(ordered) * 1000.0, 2),
+    }
+
+
+def _time(queries: int, fn: Callable[[int], Any]) -> Dict[str, float]:
+    samples = []
+    for i in range(queries):
+        started = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - started)
+    return _percentiles(samples)
+
+
+def _prepare(url: str, size: int) -> Any:
+    from database import Base
+    import models  # noqa: F401 - registers tables on Base.metadata
+
+    engine = create_engine(url, future=True)
+    Base.metadata.create_all(bind=engine)
+    if not url.startswith("sqlite"):
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE tickets DROP COLUMN IF EXISTS search_vector"))
+            tables = ", ".join(t.name for t in Base.metadata.sorted_tables)
+            conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY"))
+    started = time.perf_counter()
+    bulk_load(engine, size)
+    print(f"  loaded {size} tickets in {time.perf_counter() - started:.1f}s", flush=True)
+    return engine
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--database-url", help="Postgres URL; defaults to a fresh SQLite file per size")
+    parser.add_argument("--out", type=Path)
+    args = parser.parse_args(argv)
+
+    from search import SearchFilters, ensure_search_index, keyword_search, search_by_vector
+
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="triage-search-bench-") as tmp:
+        for size in args.sizes:
+            url = args.database_url or f"sqlite:///{Path(tmp) / f'search_{size}.db'}"
+            print(f"[size={size}] preparing {url}", flush=True)
+            engine = _prepare(url, size)
+
+            started = time.perf_counter()
+            ensure_search_index(engine)
+            index_seconds = round(time.perf_counter() - started, 2)
+            print(f"  built search index in {index_seconds}s", flush=True)
+
+            db = sessionmaker(bind=engine, future=True)()
+            rng = random.Random(size)
+            np_rng = np.random.default_rng(size)
+            try:
+                cases: Dict[str, Callable[[int], Any]] = {
+                    "keyword": lambda i: keyword_search(db, rng.choice(_TERMS), SearchFilters()),
+                    "keyword_two_terms": lambda i: keyword_search(
+                        db, f"{rng.choice(_TERMS)} {rng.choice(_TERMS)}", SearchFilters()
+                    ),
+                    "keyword_filtered": lambda i: keyword_search(
+                        db, rng.choice(_TERMS), SearchFilters(**_FILTERS[i % len(_FILTERS)])
+                    ),
+                    "keyword_page_10": lambda i: keyword_search(db, rng.choice(_TERMS), SearchFilters(), offset=200),
+                    "semantic_vector": lambda i: search_by_vector(
+                        db, np_rng.standard_normal(384).astype(np.float32), SearchFilters()
+                    ),
+                }
+                for name, fn in cases.items():
+                    row = {"table_size": size, "case": name, "index_build_s": index_seconds, **_time(args.queries, fn)}
+                    results.append(row)
+                    print(f"  {name:<18} p50={row['p50_ms']}ms p95={row['p95_ms']}ms p99={row['p99_ms']}ms", flush=True)
+            finally:
+                db.close()
+                engine.dispose()
+
+    if args.out:
+        report = {"config": {"queries": args.queries}, "results": results}
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""GET /tickets serialization benchmark: ORM + pydantic (old path) vs column rows + orjson.
+
+Run from the backend directory:
+
+    python -m bench.serialization --rows 10000 --repeat 5 --out bench_serialization.json
+
+Both paths render the same tickets to JSON bytes in-process against a fresh
+SQLite database. Reports CPU time per response, peak traced memory, payload
+size and gzip / brotli compressed sizes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+def _measure(fn: Callable[[], bytes], repeat: int) -> Dict[str, Any]:
+    fn()  # warm-up (imports, statement caches)
+    cpu: List[float] = []
+    for _ in range(repeat):
+        started = time.process_time()
+        body = fn()
+        cpu.append(time.process_time() - started)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    sizes: Dict[str, Any] = {"bytes": len(body), "gzip_bytes": len(gzip.compress(body, compresslevel=6))}
+    try:
+        import brotli  # type: ignore
+
+        sizes["br_bytes"] = len(brotli.compress(body, quality=4))
+    except ImportError:
+        sizes["br_bytes"] = None
+
+    return {
+        "cpu_ms_min": round(min(cpu) * 1000.0, 1),
+        "cpu_ms_mean": round(sum(cpu) / len(cpu) * 1000.0, 1),
+        "peak_mem_mb": round(peak / 1e6, 1),
+        **sizes,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", type=Path)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="triage-serialization-bench-") as tmp:
+        # database.py reads DATABASE_URL at import time.
+        os.environ["DATABASE_URL"] = f"sqlite:///{Path(tmp) / 'serialization.db'}"
+
+        from fastapi.encoders import jsonable_encoder
+        from pydantic import TypeAdapter
+
+        from bench.synthetic import bulk_load
+        from database import Base, SessionLocal, engine
+        from main import _to_out
+        from models import Ticket
+        from schemas import TicketOut
+        from serialization import dumps, row_dicts, ticket_rows_query
+
+        Base.metadata.create_all(bind=engine)
+        bulk_load(engine, args.rows)
+        adapter = TypeAdapter(List[TicketOut])
+
+        def orm_pydantic() -> bytes:
+            # What FastAPI did: ORM objects -> TicketOut -> response_model validation -> jsonable -> json.
+            db = SessionLocal()
+            try:
+                tickets = db.query(Ticket).order_by(Ticket.created_at.desc()).all()
+                validated = adapter.validate_python([_to_out(t) for t in tickets])
+                content = jsonable_encoder(adapter.dump_python(validated))
+                return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            finally:
+                db.close()
+
+        def rows_orjson() -> bytes:
+            db = SessionLocal()
+            try:
+                return dumps(row_dicts(db.execute(ticket_rows_query()).all()))
+            finally:
+                db.close()
+
+        results = []
+        for name, fn in [("orm_pydantic", orm_pydantic), ("rows_orjson", rows_orjson)]:
+            row = {"path": name, "rows": args.rows, **_measure(fn, args.repeat)}
+            results.append(row)
+            print(
+                f"{name:<13} cpu={row['cpu_ms_mean']}ms peak_mem={row['peak_mem_mb']}MB "
+                f"size={row['bytes']} gzip={row['gzip_bytes']} br={row['br_bytes']}",
+                flush=True,
+            )
+        engine.dispose()
+
+    if args.out:
+        report = {"config": {"rows": args.rows, "repeat": args.repeat}, "results": results}
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Synthetic ticket generator built from the demo seed patterns."""
+
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+
+from models import IncidentCluster, Ticket
+from seed import DEMO_TICKETS
+
+_HOSTS = ["prod-api-01", "prod-api-02", "db-orders-1", "vpn-gw-eu", "k8s-node-17", "edge-lb-3"]
+_REGIONS = ["us-east-1", "eu-west-1", "ap-south-1"]
+_SUFFIXES = [
+    "Reported by several users this morning.",
+    "Started after the latest change window.",
+    "Seen again after restart.",
+    "Customer escalation pending.",
+    "Intermittent, roughly every few minutes.",
+]
+_SEVERITIES = ["P1", "P2", "P3", "P3", "P4", "P4"]
+_TEAMS = ["Network Team", "DevOps", "Application Support", "Database Team", "Security Team", "Access Management"]
+_STATUSES = ["TRIAGED", "TRIAGED", "ESCALATED", "RESOLVED", "RESOLVED"]
+
+
+def synthetic_ticket(rng: random.Random, i: int) -> Dict[str, str]:
+    base = DEMO_TICKETS[rng.randrange(len(DEMO_TICKETS))]
+    host = rng.choice(_HOSTS)
+    region = rng.choice(_REGIONS)
+    return {
+        "title": f"{base['title']} ({host})"[:255],
+        "description": f"{base['description']} Host: {host}. Region: {region}. {rng.choice(_SUFFIXES)} Ref #{i}.",
+        "reporter": base["reporter"],
+        "department": base["department"],
+    }
+
+
+def iter_tickets(n: int, seed: int = 42) -> Iterator[Dict[str, str]]:
+    rng = random.Random(seed)
+    for i in range(n):
+        yield synthetic_ticket(rng, i)
+
+
+def datadog_payload(rng: random.Random, i: int) -> Dict[str, Any]:
+    t = synthetic_ticket(rng, i)
+    return {
+        "title": t["title"],
+        "text": t["description"],
+        "alert_type": rng.choice(["warning", "info", "error"]),
+        "priority": rng.choice(["P2", "P3", "P4"]),
+        "host": rng.choice(_HOSTS),
+        "monitor_name": "Synthetic Monitor",
+        "monitor_id": 1000 + (i % 50),
+        "event_type": "recovered",
+    }
+
+
+def bulk_load(engine: Engine, n: int, dims: int = 384, chunk_size: int = 10_000, seed: int = 42) -> None:
+    """Insert `n` already-triaged tickets plus one incident cluster per ~25 tickets.
+
+    Expects empty tables with fresh id sequences. Tickets are stored without
+    per-row embeddings to keep 1M-row tables reasonable; duplicate detection
+    only reads cluster centroids.
+    """
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    n_clusters = max(1, n // 25)
+    start = datetime.utcnow() - timedelta(days=90)
+    step = timedelta(days=90) / max(n, 1)
+
+    with engine.begin() as conn:
+        for offset in range(0, n_clusters, chunk_size):
+            rows: List[Dict[str, Any]] = []
+            for c in range(offset, min(offset + chunk_size, n_clusters)):
+                vec = np_rng.standard_normal(dims).astype(np.float32)
+                vec /= np.linalg.norm(vec) + 1e-12
+                seen = start + step * (c * 25)
+                rows.append(
+                    {
+                        "title": f"Synthetic cluster {c + 1}",
+                        "representative_ticket_id": c * 25 + 1,
+                        "centroid": vec.tolist(),
+                        "size": 25,
+                        "first_seen_at": seen,
+                        "last_seen_at": seen + step * 24,
+                    }
+                )
+            conn.execute(insert(IncidentCluster.__table__), rows)
+
+        tickets = iter_tickets(n, seed)
+        for offset in range(0, n, chunk_size):
+            rows = []
+            for i in range(offset, min(offset + chunk_size, n)):
+                t = next(tickets)
+                cluster_id = i // 25 + 1 if i // 25 < n_clusters else n_clusters
+                is_dup = i % 25 != 0
+                rows.append(
+                    {
+                        **t,
+                        "severity": rng.choice(_SEVERITIES),
+                        "confidence": round(rng.uniform(0.5, 0.99), 2),
+                        "assigned_team": rng.choice(_TEAMS),
+                        "suggested_fixes": [],
+                        "is_duplicate": is_dup,
+                        "duplicate_ticket_id": (cluster_id - 1) * 25 + 1 if is_dup else None,
+                        "similarity_score": round(rng.uniform(0.86, 0.99), 3) if is_dup else 0.0,
+                        "incident_cluster_id": cluster_id,
+                        "escalated": False,
+                        "source": "datadog" if i % 7 == 0 else "manual",
+                        "lifecycle_status": rng.choice(_STATUSES),
+                        "created_at": start + step * i,
+                    }
+                )
+            conn.execute(insert(Ticket.__table__), rows)
@@ -0,0 +1,157 @@
+"""Oversized description benchmark: whole-text processing (old path) vs bounded text preparation.
+
+Run from the backend directory:
+
+    python -m bench.text_prep --tickets 20 --size-bytes 1000000 --out bench_text_prep.json
+
+Each synthetic ticket is a seed ticket followed by a ~1 MB log dump (INFO noise,
+repeated errors, Java stack traces, one P1 phrase buried in the middle). For
+both paths it reports rule matching time per ticket (admission check plus
+triage, as the API does), the characters sent to the LLM and to the embedding
+model, and peak traced memory. `--embed` also times the embeddings (needs
+sentence-transformers).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bench.synthetic import synthetic_ticket
+
+_NOISE = "{ts} INFO worker-{w} processed batch id={i} in {ms}ms"
+_ERROR = "{ts} ERROR request failed: connection refused to db-orders-{w}:5432"
+_TRACE = [
+    'Exception in thread "pool-{w}" java.lang.IllegalStateException: connection pool exhausted',
+    "    at com.example.orders.Repository.save(Repository.java:{i})",
+    "    at com.example.orders.Service.place(Service.java:88)",
+    "    at com.example.orders.Controller.post(Controller.java:41)",
+    "    at java.base/java.lang.Thread.run(Thread.java:833)",
+]
+
+
+def log_dump(rng: random.Random, size: int, buried: str) -> str:
+    lines: List[str] = []
+    total = 0
+    while total < size:
+        ts = f"2024-05-01T10:{rng.randrange(60):02d}:{rng.randrange(60):02d}Z"
+        fields = {"ts": ts, "w": rng.randrange(16), "i": rng.randrange(10**6), "ms": rng.randrange(900)}
+        r = rng.random()
+        block = [_NOISE.format(**fields)] if r < 0.85 else [_ERROR.format(**fields)] if r < 0.97 else [
+            line.format(**fields) for line in _TRACE
+        ]
+        lines.extend(block)
+        total += sum(len(line) + 1 for line in block)
+    lines.insert(len(lines) // 2, f"{lines[len(lines) // 2][:25]} WARN on-call note: {buried}")
+    return "\n".join(lines)
+
+
+def _legacy_rules(title: str, description: str, rulebook: dict) -> Tuple[Optional[str], Dict[str, List[str]]]:
+    """The rule scan as it was: the whole text lowercased and searched per call."""
+    text = f"{title}\n{description}".lower()
+    phrases = rulebook.get("overrides", {}).get("p1_phrases", []) or []
+    override = next((str(p) for p in phrases if str(p).lower() in text), None)
+    rules = (rulebook.get("routing", {}) or {}).get("rules", {}) or {}
+    hits = {str(t): [str(k) for k in (kws or []) if str(k).lower() in text] for t, kws in rules.items()}
+    signals = rulebook.get("severity", {}).get("signals", {}) or {}
+    hits.update({str(s): [str(k) for k in (kws or []) if str(k).lower() in text] for s, kws in signals.items()})
+    return override, hits
+
+
+def _measure(fn: Callable[[], Any], tickets: int) -> Dict[str, Any]:
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ms_per_ticket": round(elapsed / tickets * 1000.0, 2), "peak_mem_mb": round(peak / 1e6, 2), "result": result}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=20)
+    parser.add_argument("--size-bytes", type=int, default=1_000_000)
+    parser.add_argument("--embed", action="store_true", help="also time embeddings (sentence-transformers)")
+    parser.add_argument("--out", type=Path)
+    args = parser.parse_args(argv)
+
+    from ai_engine import has_p1_override, load_rulebook, match_rules
+    from text_prep import EMBED_CHUNK_CHARS, bounded_text, embedding_chunks, llm_excerpt
+
+    rulebook = load_rulebook()
+    buried = str((rulebook.get("overrides", {}).get("p1_phrases") or ["production down"])[0])
+    rng = random.Random(42)
+    tickets = []
+    for i in range(args.tickets):
+        base = synthetic_ticket(rng, i)
+        tickets.append((base["title"], f"{base['description']}\n{log_dump(rng, args.size_bytes, buried)}"))
+
+    def legacy_rules() -> int:
+        found = 0
+        for title, description in tickets:
+            _legacy_rules(title, description, rulebook)  # admission P1 check
+            override, _ = _legacy_rules(title, description, rulebook)  # triage
+            found += override is not None
+        return found
+
+    def prepared_rules() -> int:
+        bounded_text.cache_clear()
+        found = 0
+        for title, description in tickets:
+            has_p1_override(title, description)
+            found += match_rules(title, description, rulebook).override_phrase is not None
+        return found
+
+    rules = {"legacy": _measure(legacy_rules, args.tickets), "prepared": _measure(prepared_rules, args.tickets)}
+    excerpt = _measure(lambda: [len(llm_excerpt(d)) for _, d in tickets], args.tickets)
+    chunks = [embedding_chunks(f"{t}\n{d}") for t, d in tickets]
+
+    results: Dict[str, Any] = {
+        "rule_match": {
+            name: {"ms_per_ticket": r["ms_per_ticket"], "peak_mem_mb": r["peak_mem_mb"], "p1_found": r["result"]}
+            for name, r in rules.items()
+        },
+        "llm_prompt": {
+            "legacy_chars": sum(len(d) for _, d in tickets) // args.tickets,
+            "prepared_chars": sum(excerpt["result"]) // args.tickets,
+            "excerpt_ms_per_ticket": excerpt["ms_per_ticket"],
+        },
+        "embedding": {
+            # The model reads roughly one chunk; the rest of the old input was dropped silently.
+            "legacy_chars_read": EMBED_CHUNK_CHARS,
+            "prepared_chunks": sum(len(c) for c in chunks) / args.tickets,
+            "prepared_chars_read": sum(len(x) for c in chunks for x in c) // args.tickets,
+        },
+    }
+
+    if args.embed:
+        from similarity import embed_documents, embed_texts
+
+        texts = [f"{t}\n{d}" for t, d in tickets]
+        results["embedding"]["legacy_ms_per_ticket"] = _measure(lambda: embed_texts(texts) is not None, args.tickets)[
+            "ms_per_ticket"
+        ]
+        results["embedding"]["prepared_ms_per_ticket"] = _measure(
+            lambda: embed_documents(texts) is not None, args.tickets
+        )["ms_per_ticket"]
+
+    for name, r in results["rule_match"].items():
+        print(f"rule_match {name:<9} {r['ms_per_ticket']}ms/ticket peak_mem={r['peak_mem_mb']}MB p1_found={r['p1_found']}")
+    print(f"llm_prompt chars {results['llm_prompt']['legacy_chars']} -> {results['llm_prompt']['prepared_chars']}")
+    print(f"embedding  {results['embedding']}", flush=True)
+
+    if args.out:
+        report = {"config": {"tickets": args.tickets, "size_bytes": args.size_bytes}, "results": results}
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Global ticket change counter and the version-keyed response cache built on it.
+
+Every transaction that inserts, updates or deletes tickets bumps
+`change_counters.tickets` before it commits, so the counter is shared by all
+API and worker processes and never runs ahead of committed data. Read
+endpoints use it as an ETag and as the key of a small in-process cache.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from itertools import chain
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from sqlalchemy import event, insert, select, text, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from models import ChangeCounter, Ticket
+from settings import env_float
+
+TICKETS = "tickets"
+
+
+def ensure_counters(engine: Engine) -> None:
+    with engine.begin() as conn:
+        exists = conn.execute(select(ChangeCounter.name).where(ChangeCounter.name == TICKETS)).first()
+        if exists is None:
+            conn.execute(insert(ChangeCounter).values(name=TICKETS, value=0))
+
+
+def bump_change_counter(db: Union[Session, Connection], name: str = TICKETS) -> None:
+    """Bump explicitly after Core/bulk UPDATEs, which bypass the ORM flush hook."""
+    value = db.execute(
+        update(ChangeCounter)
+        .where(ChangeCounter.name == name)
+        .values(value=ChangeCounter.value + 1)
+        .returning(ChangeCounter.value)
+    ).scalar()
+    if isinstance(db, Session):
+        db.info["tickets_changed"] = True
+        db.info["tickets_version"] = int(value or 0)
+
+
+def committed_version(db: Session) -> Optional[int]:
+    """Ticket version written by this session's last commit that changed tickets.
+
+    The counter row stays locked until commit, so versions follow commit order;
+    events carry it so clients can skip deltas a metrics snapshot already holds.
+    """
+    return db.info.get("committed_tickets_version")
+
+
+def read_change_counter(db: Session, name: str = TICKETS) -> int:
+    return int(db.execute(select(ChangeCounter.value).where(ChangeCounter.name == name)).scalar() or 0)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_on_ticket_flush(session: Session, flush_context: Any) -> None:
+    changed = any(
+        isinstance(obj, Ticket) for obj in chain(session.new, session.deleted)
+    ) or any(isinstance(obj, Ticket) and session.is_modified(obj) for obj in session.dirty)
+    if changed and not session.info.get("tickets_changed"):
+        # Once per transaction is enough: the version only needs to differ.
+        value = session.connection().execute(
+            text("UPDATE change_counters SET value = value + 1 WHERE name = :name RETURNING value"), {"name": TICKETS}
+        ).scalar()
+        session.info["tickets_changed"] = True
+        session.info["tickets_version"] = int(value or 0)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_local_cache(session: Session) -> None:
+    if "tickets_version" in session.info:
+        session.info["committed_tickets_version"] = session.info.pop("tickets_version")
+    if session.info.pop("tickets_changed", False):
+        response_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _reset_flag(session: Session) -> None:
+    session.info.pop("tickets_changed", None)
+    session.info.pop("tickets_version", None)
+
+
+class ResponseCache:
+    """Rendered response bodies keyed by (endpoint, params) and the ticket version.
+
+    The version itself is re-read from the database at most every `ttl`
+    seconds, so within that window repeated requests cost no queries at all.
+    Writes committed by this process invalidate immediately; writes from other
+    processes are picked up within `ttl`.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 64) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._bodies: Dict[Tuple[Any, ...], Tuple[int, bytes]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, db: Session) -> int:
+        now = time.monotonic()
+        with self._lock:
+            if self._version is not None and now - self._checked_at < self.ttl:
+                return self._version
+        current = read_change_counter(db)
+        with self._lock:
+            if current != self._version:
+                self._bodies.clear()
+            self._version, self._checked_at = current, now
+        return current
+
+    def body(self, key: Tuple[Any, ...], version: int, build: Callable[[], bytes]) -> bytes:
+        with self._lock:
+            cached = self._bodies.get(key)
+            if cached is not None and cached[0] == version:
+                self.hits += 1
+                return cached[1]
+        self.misses += 1
+        rendered = build()
+        with self._lock:
+            if len(self._bodies) >= self.max_entries:
+                self._bodies.pop(next(iter(self._bodies)))
+            self._bodies[key] = (version, rendered)
+        return rendered
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version = None
+            self._bodies.clear()
+
+
+response_cache = ResponseCache(ttl=env_float("RESPONSE_CACHE_TTL_SECONDS", 2))
@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from models import IncidentCluster, Ticket
+from settings import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+
+def _active_cluster_limit() -> int:
+    return env_int("CLUSTER_ACTIVE_LIMIT", 500)
+
+
+def _normalize(vec: np.ndarray) -> np.ndarray:
+    vec = np.asarray(vec, dtype=np.float32)
+    return vec / (np.linalg.norm(vec) + 1e-12)
+
+
+def nearest_centroid(centroids: np.ndarray, vector: np.ndarray) -> Tuple[int, float]:
+    """Return (index, cosine similarity) of the closest unit-norm centroid."""
+    if centroids.size == 0:
+        return -1, 0.0
+    sims = centroids @ _normalize(vector)
+    best_idx = int(np.argmax(sims))
+    return best_idx, float(sims[best_idx])
+
+
+def rank_centroids(centroids: np.ndarray, vector: np.ndarray, k: int) -> List[Tuple[int, float]]:
+    """Return the `k` closest unit-norm centroids as (index, cosine similarity), best first."""
+    if centroids.size == 0 or k <= 0:
+        return []
+    sims = centroids @ _normalize(vector)
+    k = min(k, len(sims))
+    top = np.argpartition(-sims, k - 1)[:k]
+    return [(int(i), float(sims[i])) for i in top[np.argsort(-sims[top])]]
+
+
+def merge_centroid(centroid: np.ndarray, size: int, vector: np.ndarray) -> np.ndarray:
+    """Incremental mean update, re-normalized so dot products stay cosine similarities."""
+    merged = (np.asarray(centroid, dtype=np.float32) * size + _normalize(vector)) / float(size + 1)
+    return _normalize(merged)
+
+
+def find_nearest_cluster(db: Session, vector: np.ndarray) -> Tuple[Optional[IncidentCluster], float]:
+    clusters: List[IncidentCluster] = (
+        db.query(IncidentCluster)
+        .order_by(IncidentCluster.last_seen_at.desc())
+        .limit(_active_cluster_limit())
+        .all()
+    )
+    if not clusters:
+        return None, 0.0
+
+    centroids = np.asarray([c.centroid for c in clusters], dtype=np.float32)
+    best_idx, best_score = nearest_centroid(centroids, vector)
+    return clusters[best_idx], best_score
+
+
+class ColdClusterIndex:
+    """In-memory centroids of clusters outside the hot window searched by `find_nearest_cluster`.
+
+    Keeps old incidents, including ones whose tickets were moved to the archive,
+    available to duplicate detection without widening the per-ticket hot scan.
+    Rebuilt in a background thread when older than COLD_INDEX_REFRESH_SECONDS
+    (and after each archival run); lookups never wait for a rebuild.
+    """
+
+    def __init__(self) -> None:
+        self._ids = np.empty(0, dtype=np.int64)
+        self._centroids = np.empty((0, 0), dtype=np.float32)
+        self._built_at: Optional[float] = None
+        self._building = False
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return int(self._ids.size)
+
+    def rebuild(self, db: Session) -> int:
+        rows = db.execute(
+            select(IncidentCluster.id, IncidentCluster.centroid)
+            .order_by(IncidentCluster.last_seen_at.desc())
+            .offset(_active_cluster_limit())
+            .limit(env_int("COLD_INDEX_MAX_CLUSTERS", 50000))
+            .execution_options(yield_per=2000)
+        )
+        ids: List[int] = []
+        vectors: List[np.ndarray] = []
+        for cluster_id, centroid in rows:
+            ids.append(int(cluster_id))
+            vectors.append(np.asarray(centroid, dtype=np.float32))
+
+        centroids = np.vstack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+        with self._lock:
+            self._ids = np.asarray(ids, dtype=np.int64)
+            self._centroids = centroids
+            self._built_at = time.monotonic()
+        return len(ids)
+
+    def _rebuild_in_background(self) -> None:
+        from database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            self.rebuild(db)
+        except Exception:
+            logger.exception("Cold cluster index rebuild failed")
+        finally:
+            db.close()
+            with self._lock:
+                self._building = False
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._built_at = None
+
+    def _current(self) -> Tuple[np.ndarray, np.ndarray]:
+        """The built ids and centroids, scheduling a background rebuild when stale."""
+        refresh = env_float("COLD_INDEX_REFRESH_SECONDS", 3600)
+        with self._lock:
+            stale = self._built_at is None or time.monotonic() - self._built_at > refresh
+            if stale and not self._building:
+                self._building = True
+                threading.Thread(target=self._rebuild_in_background, daemon=True).start()
+            return self._ids, self._centroids
+
+    def nearest(self, vector: np.ndarray) -> Tuple[Optional[int], float]:
+        """(cluster id, cosine similarity) of the closest cold centroid, or (None, 0.0)."""
+        ids, centroids = self._current()
+        if ids.size == 0:
+            return None, 0.0
+        idx, score = nearest_centroid(centroids, vector)
+        return int(ids[idx]), score
+
+    def top(self, vector: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """(cluster id, cosine similarity) of the `k` closest cold centroids, best first."""
+        ids, centroids = self._current()
+        if ids.size == 0:
+            return []
+        return [(int(ids[i]), score) for i, score in rank_centroids(centroids, vector, k)]
+
+
+cold_index = ColdClusterIndex()
+
+
+def rank_clusters(db: Session, vector: np.ndarray, k: int) -> List[Tuple[int, float]]:
+    """(cluster id, cosine similarity) of the `k` closest clusters across all of them, best first.
+
+    The active window is read fresh; older clusters come from `cold_index`, so a
+    query never decodes more than CLUSTER_ACTIVE_LIMIT centroids from the database.
+    """
+    hot = db.execute(
+        select(IncidentCluster.id, IncidentCluster.centroid)
+        .order_by(IncidentCluster.last_seen_at.desc())
+        .limit(_active_cluster_limit())
+    ).all()
+    scores: Dict[int, float] = {}
+    if hot:
+        centroids = np.asarray([c.centroid for c in hot], dtype=np.float32)
+        scores = {int(hot[i].id): score for i, score in rank_centroids(centroids, vector, k)}
+    hot_ids = {int(c.id) for c in hot}
+    # A cluster that became active again since the cold index was built is scored from the hot window.
+    for cluster_id, score in cold_index.top(vector, k + len(hot_ids)):
+        if cluster_id not in hot_ids:
+            scores[cluster_id] = score
+    return sorted(scores.items(), key=lambda item: -item[1])[:k]
+
+
+def _merge_into(
+    db: Session, cluster: IncidentCluster, vector: np.ndarray, seen_at: datetime, attempts: int = 5
+) -> None:
+    """Fold `vector` into the cluster centroid without losing concurrent merges.
+
+    The centroid is computed from the size read here and written only if the size
+    is still the same (optimistic compare-and-set); otherwise the row is re-read
+    and the merge retried, so API threads and worker processes matching the same
+    cluster never overwrite each other.
+    """
+    for _ in range(attempts):
+        size = int(cluster.size)
+        merged = merge_centroid(np.asarray(cluster.centroid), size, vector).tolist()
+        result = db.execute(
+            update(IncidentCluster)
+            .where(IncidentCluster.id == cluster.id, IncidentCluster.size == size)
+            .values(centroid=merged, size=size + 1, last_seen_at=max(cluster.last_seen_at, seen_at))
+            .execution_options(synchronize_session=False)
+        )
+        db.expire(cluster, ["centroid", "size", "last_seen_at"])
+        if result.rowcount == 1:
+            return
+    raise RuntimeError(f"Cluster {cluster.id} kept changing; merge abandoned after {attempts} attempts")
+
+
+def assign_to_cluster(
+    db: Session,
+    ticket: Ticket,
+    vector: np.ndarray,
+    cluster: Optional[IncidentCluster] = None,
+) -> IncidentCluster:
+    """Attach a flushed ticket to `cluster`, or open a new cluster around it.
+
+    The caller owns the transaction; nothing is committed here.
+    """
+    seen_at = ticket.created_at or datetime.utcnow()
+
+    if cluster is None:
+        cluster = IncidentCluster(
+            title=ticket.title,
+            representative_ticket_id=ticket.id,
+            centroid=_normalize(vector).tolist(),
+            size=1,
+            first_seen_at=seen_at,
+            last_seen_at=seen_at,
+        )
+        db.add(cluster)
+        db.flush()
+    else:
+        _merge_into(db, cluster, vector, seen_at)
+
+    ticket.incident_cluster_id = cluster.id
+    ticket.embedding = _normalize(vector).tolist()
+    db.add(ticket)
+    return cluster
+
+
+def backfill_clusters(db: Session, threshold: float = 0.85, limit: int = 200) -> int:
+    """Cluster the `limit` most recent tickets stored without going through triage
+    (seed data, tickets created before clustering existed), oldest first."""
+    from similarity import embed_documents
+
+    pending: List[Ticket] = (
+        db.query(Ticket)
+        .filter(Ticket.incident_cluster_id.is_(None))
+        .order_by(Ticket.created_at.desc(), Ticket.id.desc())
+        .limit(limit)
+        .all()
+    )[::-1]
+    if not pending:
+        return 0
+
+    vectors = embed_documents([f"{t.title}\n{t.description}".strip() for t in pending])
+    for ticket, vec in zip(pending, vectors):
+        cluster, score = find_nearest_cluster(db, vec)
+        # Same duplicate fields as live triage (`similarity.detect_duplicate`), so
+        # backfilled members count in duplicate metrics and status cascades.
+        joined = cluster is not None and score >= threshold
+        ticket.is_duplicate = joined
+        ticket.duplicate_ticket_id = cluster.representative_ticket_id if joined else None
+        ticket.similarity_score = float(score)
+        assign_to_cluster(db, ticket, vec, cluster if joined else None)
+
+    db.commit()
+    return len(pending)
+
+
+def backfill_on_startup() -> None:
+    """Give recent pre-clustering tickets a cluster so duplicate detection does not start empty.
+
+    Runs in a background thread from the API lifespan; a no-op once every recent
+    ticket is clustered. CLUSTER_BACKFILL_LIMIT=0 disables it.
+    """
+    from database import SessionLocal
+
+    limit = env_int("CLUSTER_BACKFILL_LIMIT", 200)
+    if limit <= 0:
+        return
+    db = SessionLocal()
+    try:
+        done = backfill_clusters(db, limit=limit)
+        if done:
+            logger.info("Backfilled incident clusters for %d tickets", done)
+    except Exception:
+        logger.exception("Incident cluster backfill failed")
+        db.rollback()
+    finally:
+        db.close()
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Iterable
+
+from starlette.middleware.gzip import GZipMiddleware
+
+from settings import env_int
+
+try:
+    from brotli_asgi import BrotliMiddleware  # type: ignore
+except ImportError:  # optional: gzip only
+    BrotliMiddleware = None
+
+COMPRESSION_MIN_SIZE = env_int("COMPRESSION_MIN_SIZE", 1024)
+
+
+class CompressionMiddleware:
+    """Brotli (when brotli-asgi is installed) or gzip for large responses.
+
+    Streams that must be delivered promptly (server-sent events) bypass the
+    compressor entirely: the compressors buffer output until enough bytes
+    accumulate, which would hold events back.
+    """
+
+    def __init__(self, app: Callable, exclude_paths: Iterable[str] = ("/events/stream",)) -> None:
+        self.app = app
+        self.exclude_paths = frozenset(exclude_paths)
+        if BrotliMiddleware is not None:
+            self.compressed = BrotliMiddleware(app, minimum_size=COMPRESSION_MIN_SIZE, gzip_fallback=True)
+        else:
+            self.compressed = GZipMiddleware(app, minimum_size=COMPRESSION_MIN_SIZE)
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> Any:
+        if scope["type"] != "http" or scope.get("path") in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+        await self.compressed(scope, receive, send)
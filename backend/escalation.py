@@ -1,12 +1,20 @@
 from __future__ import annotations
 
-from typing import List
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
 
 from sqlalchemy.orm import Session
 
-from integrations.jira import create_jira_issue
+from changes import committed_version
+from events import TICKET_ESCALATED, bus, ticket_summary
+from integrations.jira import create_jira_issue, create_jira_issues
 from integrations.n8n import trigger_n8n
 from models import Ticket
+from settings import env_int
+from telemetry import stage
+
+# How long the process that triaged a P1 has to escalate it before others may retry.
+ESCALATION_LEASE_SECONDS = env_int("ESCALATION_LEASE_SECONDS", 120)
 
 
 def _priority_from_severity(severity: str) -> str:
@@ -19,36 +27,111 @@ def _priority_from_severity(severity: str) -> str:
     return "Low"
 
 
+def _jira_issue(ticket: Ticket) -> Dict[str, Any]:
+    labels: List[str] = ["escalated"]
+    if ticket.is_duplicate:
+        labels.append("duplicate")
+    return {
+        "summary": f"[{ticket.severity}] {ticket.title}",
+        "description": ticket.description,
+        "priority": _priority_from_severity(ticket.severity),
+        "labels": labels,
+    }
+
+
+def _n8n_payload(ticket: Ticket) -> Dict[str, Any]:
+    return {
+        "ticket_id": ticket.id,
+        "severity": ticket.severity,
+        "assigned_team": ticket.assigned_team,
+        "escalated": ticket.escalated,
+        "jira_issue_key": ticket.jira_issue_key,
+    }
+
+
+def _publish(db: Session, ticket: Ticket) -> None:
+    bus.publish(
+        TICKET_ESCALATED,
+        {
+            "ticket": ticket_summary(ticket),
+            "metrics_delta": {"escalated_tickets": 1},
+            "version": committed_version(db),
+        },
+    )
+
+
+def defer_escalation(ticket: Ticket) -> None:
+    """Mark `ticket` as owing an escalation, in the caller's (triage) transaction.
+
+    The lease keeps other processes off it while this one escalates; if this one
+    dies first, the lease expires and `workers.claim_pending_escalations` retries.
+    """
+    ticket.escalation_pending = True
+    ticket.lease_expires_at = datetime.utcnow() + timedelta(seconds=ESCALATION_LEASE_SECONDS)
+
+
+def _settle(ticket: Ticket) -> None:
+    ticket.escalation_pending = False
+    ticket.lease_owner = None
+    ticket.lease_expires_at = None
+
+
 def escalate_if_needed(db: Session, ticket: Ticket) -> Ticket:
-    if ticket.severity != "P1":
+    # Already escalated (e.g. by the provisional P1 override): never open a second Jira issue.
+    if ticket.severity != "P1" or ticket.escalated:
+        if ticket.escalation_pending:
+            _settle(ticket)
+            db.commit()
         return ticket
 
     ticket.escalated = True
     ticket.lifecycle_status = "ESCALATED"
 
-    labels: List[str] = ["escalated"]
-    if ticket.is_duplicate:
-        labels.append("duplicate")
-
-    jira_key = create_jira_issue(
-        summary=f"[{ticket.severity}] {ticket.title}",
-        description=ticket.description,
-        priority=_priority_from_severity(ticket.severity),
-        labels=labels,
-    )
+    with stage("jira"):
+        jira_key = create_jira_issue(**_jira_issue(ticket))
     ticket.jira_issue_key = jira_key
 
-    trigger_n8n(
-        {
-            "ticket_id": ticket.id,
-            "severity": ticket.severity,
-            "assigned_team": ticket.assigned_team,
-            "escalated": ticket.escalated,
-            "jira_issue_key": ticket.jira_issue_key,
-        }
-    )
+    with stage("n8n"):
+        trigger_n8n(_n8n_payload(ticket))
 
+    _settle(ticket)
     db.add(ticket)
-    db.commit()
+    with stage("db_commit"):
+        db.commit()
     db.refresh(ticket)
+
+    _publish(db, ticket)
     return ticket
+
+
+def escalate_many(db: Session, tickets: List[Ticket]) -> List[Ticket]:
+    """Escalate several P1 tickets at once: one bulk Jira request and one commit."""
+    pending = [t for t in tickets if t.severity == "P1" and not t.escalated]
+    # Flagged, but no longer owing an escalation (re-triaged or escalated meanwhile).
+    for ticket in tickets:
+        if ticket.escalation_pending and ticket not in pending:
+            _settle(ticket)
+    if len(pending) <= 1:
+        db.commit()
+        return [escalate_if_needed(db, t) for t in pending]
+
+    with stage("jira"):
+        keys = create_jira_issues([_jira_issue(t) for t in pending])
+
+    for ticket, key in zip(pending, keys):
+        ticket.escalated = True
+        ticket.lifecycle_status = "ESCALATED"
+        ticket.jira_issue_key = key
+        _settle(ticket)
+
+    with stage("n8n"):
+        for ticket in pending:
+            trigger_n8n(_n8n_payload(ticket))
+
+    db.add_all(pending)
+    with stage("db_commit"):
+        db.commit()
+    for ticket in pending:
+        db.refresh(ticket)
+        _publish(db, ticket)
+    return pending
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from models import Ticket
+from settings import env_float
+
+TICKET_CREATED = "ticket.created"
+TICKET_TRIAGED = "ticket.triaged"
+TICKET_REFINED = "ticket.refined"
+TICKET_STATUS_CHANGED = "ticket.status_changed"
+TICKET_ESCALATED = "ticket.escalated"
+RESYNC = "resync"
+
+
+def hours_per_duplicate() -> float:
+    return env_float("HOURS_SAVED_PER_DUPLICATE", 1.5)
+
+
+def ticket_summary(ticket: Ticket) -> Dict[str, Any]:
+    return {
+        "id": ticket.id,
+        "title": ticket.title,
+        "source": ticket.source,
+        "severity": ticket.severity,
+        "assigned_team": ticket.assigned_team,
+        "is_duplicate": ticket.is_duplicate,
+        "duplicate_ticket_id": ticket.duplicate_ticket_id,
+        "incident_cluster_id": ticket.incident_cluster_id,
+        "escalated": ticket.escalated,
+        "jira_issue_key": ticket.jira_issue_key,
+        "lifecycle_status": ticket.lifecycle_status,
+        "created_at": ticket.created_at.isoformat() if ticket.created_at else None,
+    }
+
+
+def created_metrics_delta(ticket: Ticket) -> Dict[str, Any]:
+    """Change to `/dashboard/metrics` caused by inserting `ticket` (escalation is its own event)."""
+    dup = 1 if ticket.is_duplicate else 0
+    return {
+        "total_tickets": 1,
+        "duplicate_tickets": dup,
+        "duplicate_tickets_prevented": dup,
+        "monitoring_tickets": 1 if ticket.source == "datadog" else 0,
+        "estimated_engineer_hours_saved": round(dup * hours_per_duplicate(), 2),
+        "by_severity": {ticket.severity: 1},
+        "by_team": {ticket.assigned_team: 1},
+    }
+
+
+def triaged_metrics_delta(before: Dict[str, Any], ticket: Ticket) -> Dict[str, Any]:
+    """Change caused by (re-)triaging a ticket whose fields were `before`.
+
+    RECEIVED tickets are not in the dashboard aggregates, so triaging one adds it.
+    """
+    if before.get("lifecycle_status") == "RECEIVED":
+        return created_metrics_delta(ticket)
+    dup = int(bool(ticket.is_duplicate)) - int(bool(before.get("is_duplicate")))
+    by_severity: Dict[str, int] = {}
+    by_team: Dict[str, int] = {}
+    if before["severity"] != ticket.severity:
+        by_severity = {before["severity"]: -1, ticket.severity: 1}
+    if before["assigned_team"] != ticket.assigned_team:
+        by_team = {before["assigned_team"]: -1, ticket.assigned_team: 1}
+    return {
+        "duplicate_tickets": dup,
+        "duplicate_tickets_prevented": dup,
+        "estimated_engineer_hours_saved": round(dup * hours_per_duplicate(), 2),
+        "by_severity": by_severity,
+        "by_team": by_team,
+    }
+
+
+class _Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_pending: int) -> None:
+        self.loop = loop
+        self.queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue(maxsize=max_pending)
+        self.overflowed = False
+
+    def deliver(self, event: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class EventBus:
+    """In-process fan-out of ticket events with a bounded replay buffer.
+
+    `publish` is safe to call from worker threads; delivery hops onto each
+    subscriber's event loop. Each API process has its own bus, so clients of a
+    multi-worker deployment only see events raised in the process they hit.
+    """
+
+    def __init__(self, history: int = 1000, max_pending: int = 1000) -> None:
+        self._ids = itertools.count(1)
+        self._last_id = 0
+        self._history: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self._subscribers: List[_Subscriber] = []
+        self._lock = threading.Lock()
+        self._max_pending = max_pending
+        self._forward: Optional[Callable[[str, Dict[str, Any]], None]] = None
+
+    def forward_to(self, forward: Callable[[str, Dict[str, Any]], None]) -> None:
+        """Send every event to `forward` instead (used by triage worker processes)."""
+        self._forward = forward
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> int:
+        if self._forward is not None:
+            self._forward(event_type, data)
+            return 0
+
+        with self._lock:
+            event = {"id": next(self._ids), "type": event_type, "data": data}
+            self._last_id = int(event["id"])
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub.deliver, event)
+            except RuntimeError:
+                # Loop already closed; the stream's finally block will unsubscribe it.
+                pass
+        return int(event["id"])
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def subscribe(self) -> _Subscriber:
+        sub = _Subscriber(asyncio.get_running_loop(), self._max_pending)
+        with self._lock:
+            self._subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: _Subscriber) -> None:
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    def replay_since(self, last_id: int) -> Optional[List[Dict[str, Any]]]:
+        """Events after `last_id`, or None if the client must resync (evicted or from before a restart)."""
+        with self._lock:
+            history = list(self._history)
+            last_published = self._last_id
+        if last_id > last_published:
+            return None
+        if history and last_id < history[0]["id"] - 1:
+            return None
+        return [e for e in history if e["id"] > last_id]
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+
+bus = EventBus()
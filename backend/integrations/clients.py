@@ -0,0 +1,67 @@
+"""Long-lived, pooled HTTP clients shared by the outbound integrations (Jira, n8n)."""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from settings import env_float, env_int
+
+
+POOL_SIZE = env_int("INTEGRATION_HTTP_POOL_SIZE", 16)
+KEEPALIVE_SECONDS = env_float("INTEGRATION_HTTP_KEEPALIVE_SECONDS", 60)
+
+_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+_session_pid: Optional[int] = None
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+def session() -> requests.Session:
+    """Process-wide requests.Session with keep-alive connection pools (one pool per host).
+
+    Rebuilt after a fork so worker processes never share sockets with the parent.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _lock:
+            if _session is None or _session_pid != pid:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+                s.mount("http://", adapter)
+                s.mount("https://", adapter)
+                s.headers.update({"Accept": "application/json"})
+                _session, _session_pid = s, pid
+    return _session
+
+
+def async_client() -> httpx.AsyncClient:
+    """Shared httpx.AsyncClient; use it from a single event loop (the API's)."""
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            headers={"Accept": "application/json"},
+            limits=httpx.Limits(
+                max_connections=POOL_SIZE,
+                max_keepalive_connections=POOL_SIZE,
+                keepalive_expiry=KEEPALIVE_SECONDS,
+            ),
+        )
+    return _async_client
+
+
+async def close_clients() -> None:
+    global _session, _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-import requests
+from integrations.clients import async_client, session
+
+MOCK_KEY = "MOCK-TRIAGE-1"
+# Jira Cloud accepts at most 50 issues per bulk create request.
+BULK_LIMIT = 50
 
 
 def _configured() -> bool:
@@ -12,6 +16,45 @@ def _configured() -> bool:
     )
 
 
+def _endpoint(path: str) -> Tuple[str, Tuple[str, str]]:
+    base_url = os.getenv("JIRA_BASE_URL", "").rstrip("/")
+    auth = (os.getenv("JIRA_EMAIL", ""), os.getenv("JIRA_API_TOKEN", ""))
+    return f"{base_url}/rest/api/3/{path}", auth
+
+
+def _issue_fields(summary: str, description: str, priority: str, labels: List[str]) -> Dict[str, Any]:
+    return {
+        "project": {"key": os.getenv("JIRA_PROJECT_KEY", "")},
+        "summary": summary,
+        "description": {
+            "type": "doc",
+            "version": 1,
+            "content": [
+                {
+                    "type": "paragraph",
+                    "content": [{"type": "text", "text": description}],
+                }
+            ],
+        },
+        "issuetype": {"name": "Task"},
+        "priority": {"name": priority},
+        "labels": labels,
+    }
+
+
+def _bulk_keys(data: Dict[str, Any], count: int) -> List[str]:
+    """Map a bulk response back to request order; failed elements get the mock key."""
+    failed = {int(e.get("failedElementNumber", -1)) for e in data.get("errors") or []}
+    created = iter(data.get("issues") or [])
+    keys: List[str] = []
+    for i in range(count):
+        if i in failed:
+            keys.append(MOCK_KEY)
+        else:
+            keys.append((next(created, None) or {}).get("key") or MOCK_KEY)
+    return keys
+
+
 def create_jira_issue(
     summary: str,
     description: str,
@@ -19,45 +62,65 @@ def create_jira_issue(
     labels: List[str],
 ) -> Optional[str]:
     if not _configured():
-        return "MOCK-TRIAGE-1"
+        return MOCK_KEY
 
-    base_url = os.getenv("JIRA_BASE_URL", "").rstrip("/")
-    email = os.getenv("JIRA_EMAIL", "")
-    token = os.getenv("JIRA_API_TOKEN", "")
-    project = os.getenv("JIRA_PROJECT_KEY", "")
-
-    url = f"{base_url}/rest/api/3/issue"
-    payload: Dict[str, Any] = {
-        "fields": {
-            "project": {"key": project},
-            "summary": summary,
-            "description": {
-                "type": "doc",
-                "version": 1,
-                "content": [
-                    {
-                        "type": "paragraph",
-                        "content": [{"type": "text", "text": description}],
-                    }
-                ],
-            },
-            "issuetype": {"name": "Task"},
-            "priority": {"name": priority},
-            "labels": labels,
-        }
-    }
+    url, auth = _endpoint("issue")
+    payload = {"fields": _issue_fields(summary, description, priority, labels)}
+
+    try:
+        resp = session().post(url, json=payload, auth=auth, timeout=15)
+        if resp.status_code >= 300:
+            return MOCK_KEY
+        data = resp.json()
+        return data.get("key") or MOCK_KEY
+    except Exception:
+        return MOCK_KEY
+
+
+def create_jira_issues(issues: List[Dict[str, Any]]) -> List[str]:
+    """Create several issues via the bulk API, 50 per request.
+
+    `issues` are dicts of `create_jira_issue` keyword arguments. Returns one key
+    per issue, in order.
+    """
+    if not _configured():
+        return [MOCK_KEY] * len(issues)
+    if len(issues) == 1:
+        return [create_jira_issue(**issues[0]) or MOCK_KEY]
+
+    url, auth = _endpoint("issue/bulk")
+    keys: List[str] = []
+    for start in range(0, len(issues), BULK_LIMIT):
+        chunk = issues[start : start + BULK_LIMIT]
+        payload = {"issueUpdates": [{"fields": _issue_fields(**issue)} for issue in chunk]}
+        try:
+            resp = session().post(url, json=payload, auth=auth, timeout=30)
+            # 201 = all created; 400 may still carry partial successes.
+            data = resp.json() if resp.status_code < 300 or resp.status_code == 400 else {}
+            keys.extend(_bulk_keys(data, len(chunk)) if data else [MOCK_KEY] * len(chunk))
+        except Exception:
+            keys.extend([MOCK_KEY] * len(chunk))
+    return keys
+
+
+async def acreate_jira_issue(
+    summary: str,
+    description: str,
+    priority: str,
+    labels: List[str],
+) -> Optional[str]:
+    """Async variant of `create_jira_issue` for callers on the event loop."""
+    if not _configured():
+        return MOCK_KEY
+
+    url, auth = _endpoint("issue")
+    payload = {"fields": _issue_fields(summary, description, priority, labels)}
 
     try:
-        resp = requests.post(
-            url,
-            json=payload,
-            auth=(email, token),
-            headers={"Accept": "application/json", "Content-Type": "application/json"},
-            timeout=15,
-        )
+        resp = await async_client().post(url, json=payload, auth=auth, timeout=15)
         if resp.status_code >= 300:
-            return "MOCK-TRIAGE-1"
+            return MOCK_KEY
         data = resp.json()
-        return data.get("key") or "MOCK-TRIAGE-1"
+        return data.get("key") or MOCK_KEY
     except Exception:
-        return "MOCK-TRIAGE-1"
+        return MOCK_KEY
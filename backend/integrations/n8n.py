@@ -3,7 +3,7 @@ from __future__ import annotations
 import os
 from typing import Any, Dict
 
-import requests
+from integrations.clients import async_client, session
 
 
 def trigger_n8n(payload: Dict[str, Any]) -> bool:
@@ -12,7 +12,20 @@ def trigger_n8n(payload: Dict[str, Any]) -> bool:
         return False
 
     try:
-        resp = requests.post(url, json=payload, timeout=10)
+        resp = session().post(url, json=payload, timeout=10)
+        return resp.status_code < 300
+    except Exception:
+        return False
+
+
+async def atrigger_n8n(payload: Dict[str, Any]) -> bool:
+    """Async variant of `trigger_n8n` for callers on the event loop."""
+    url = os.getenv("N8N_WEBHOOK_URL", "").strip()
+    if not url:
+        return False
+
+    try:
+        resp = await async_client().post(url, json=payload, timeout=10)
         return resp.status_code < 300
     except Exception:
         return False
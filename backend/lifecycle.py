@@ -0,0 +1,82 @@
+"""Set-based lifecycle transitions for many tickets at once."""
+
+from __future__ import annotations
+
+from typing import Any, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session, aliased
+
+from changes import bump_change_counter, committed_version
+from events import RESYNC, TICKET_STATUS_CHANGED, bus, ticket_summary
+from models import Ticket
+from search import SearchFilters, filter_conditions
+
+LIFECYCLE_STATUSES = frozenset({"RECEIVED", "TRIAGED", "ESCALATED", "RESOLVED"})
+
+# Up to this many changed tickets are announced one by one; beyond it clients get a single resync.
+EVENT_LIMIT = 100
+
+
+class BulkStatusOutcome(NamedTuple):
+    matched: int
+    cascaded: int
+    updated: int
+
+
+def _count(db: Session, ids: Any) -> int:
+    return int(db.execute(select(func.count()).select_from(ids.subquery())).scalar() or 0)
+
+
+def bulk_update_status(
+    db: Session,
+    status: str,
+    ids: Optional[Sequence[int]] = None,
+    filters: Optional[SearchFilters] = None,
+    cascade_duplicates: bool = False,
+) -> BulkStatusOutcome:
+    """Move the tickets selected by `ids` and/or `filters` (both must match) to `status`
+    in one transaction, optionally with every ticket that is transitively a duplicate of one.
+
+    Tickets already in `status` are counted as matched but not updated.
+    """
+    conds: List[Any] = filter_conditions(filters) if filters is not None else []
+    if ids is not None:
+        conds.append(Ticket.id.in_(list(ids)))
+    selected = select(Ticket.id).where(*conds)
+
+    matched = _count(db, selected)
+    targets = selected
+    if cascade_duplicates:
+        # Duplicates point at the cluster representative, but older data can hold chains;
+        # UNION (not UNION ALL) also stops on cycles. Nested inside the subquery because
+        # pysqlite reports no rowcount for a statement that starts with WITH.
+        tree = selected.cte("cascade", recursive=True, nesting=True)
+        dup = aliased(Ticket)
+        tree = tree.union(select(dup.id).join(tree, dup.duplicate_ticket_id == tree.c.id))
+        targets = select(tree.c.id)
+    total = _count(db, targets) if cascade_duplicates else matched
+
+    changing = Ticket.id.in_(targets.scalar_subquery()) & (Ticket.lifecycle_status != status)
+    before = db.execute(select(Ticket.id, Ticket.lifecycle_status).where(changing).limit(EVENT_LIMIT + 1)).all()
+
+    updated = 0
+    if before:
+        result = db.execute(
+            update(Ticket).where(changing).values(lifecycle_status=status).execution_options(synchronize_session=False)
+        )
+        updated = int(result.rowcount or 0)
+        bump_change_counter(db)
+    db.commit()
+
+    if 0 < updated <= EVENT_LIMIT:
+        previous = {int(row[0]): row[1] for row in before}
+        for t in db.query(Ticket).filter(Ticket.id.in_(list(previous))).all():
+            bus.publish(
+                TICKET_STATUS_CHANGED,
+                {"ticket": ticket_summary(t), "previous_status": previous[t.id], "version": committed_version(db)},
+            )
+    elif updated:
+        bus.publish(RESYNC, {"reason": "bulk_status", "updated": updated})
+
+    return BulkStatusOutcome(matched=matched, cascaded=total - matched, updated=updated)
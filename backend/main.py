@@ -1,23 +1,58 @@
 from __future__ import annotations
 
+import asyncio
 import os
+import secrets
 from collections import Counter
-from typing import Any, List, Optional
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, List, Optional
 
 from dotenv import load_dotenv
-from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import text
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, PlainTextResponse, Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from sqlalchemy import case, func, select, text
 from sqlalchemy.orm import Session
 
-from ai_engine import load_rulebook, triage_ticket
-from database import Base, engine, get_db
-from escalation import escalate_if_needed
+from admission import AdmissionRejected
+from admission import controller as admission
+from ai_engine import has_p1_override
+from archival import Archiver, ensure_archive_metrics, read_archive_metrics
+from changes import committed_version, ensure_counters, read_change_counter, response_cache
+from clustering import backfill_on_startup
+from compression import CompressionMiddleware
+from database import Base, SessionLocal, engine, get_db
+from events import RESYNC, TICKET_STATUS_CHANGED, bus, format_sse, hours_per_duplicate, ticket_summary
+from integrations.clients import close_clients
+from lifecycle import LIFECYCLE_STATUSES, bulk_update_status
 from monitoring import MonitoringPayloadError, parse_datadog_alert
-from models import Ticket
-from schemas import DashboardMetrics, SeedResponse, TicketCreate, TicketOut, TicketStatusUpdate
+from models import ArchivedTicket, IncidentCluster, Ticket, TicketColumns
+from pipeline import PROVISIONAL, REFINING, process_ticket, receive_ticket, resume_pending_refinements
+from profiling import PROFILING_ENABLED, ProfilingMiddleware, get_profile, list_profiles, profiled
+from schemas import (
+    AdmissionStats,
+    BulkStatusResult,
+    BulkStatusUpdate,
+    DashboardMetrics,
+    IncidentClusterOut,
+    LlmGatingReport,
+    ProfileSummary,
+    RefinementReport,
+    SeedResponse,
+    TicketCreate,
+    TicketOut,
+    TicketSearchResults,
+    TicketStatusUpdate,
+)
+from search import SearchFilters, SearchUnavailable, ensure_search_index, keyword_search, semantic_search
 from seed import seed_demo_tickets
-from similarity import detect_duplicate
+from serialization import FastJSONResponse, dumps, ndjson_lines, row_dicts, ticket_rows_query
+from settings import env_bool, env_float, env_int
+from telemetry import current_timings, start_request_timings, trace_timings_enabled
+from workers import ExternalTriageWatcher, WorkerPool, resume_pending_escalations
 
 load_dotenv()
 
@@ -47,13 +82,118 @@ def _migrate_sqlite() -> None:
             conn.execute(text("ALTER TABLE tickets ADD COLUMN metadata JSON"))
             conn.commit()
 
+        if "incident_cluster_id" not in col_names:
+            conn.execute(text("ALTER TABLE tickets ADD COLUMN incident_cluster_id INTEGER"))
+            conn.execute(
+                text("CREATE INDEX IF NOT EXISTS ix_tickets_incident_cluster_id ON tickets (incident_cluster_id)")
+            )
+            conn.commit()
+
+        if "embedding" not in col_names:
+            conn.execute(text("ALTER TABLE tickets ADD COLUMN embedding JSON"))
+            conn.commit()
+
+        if "lease_owner" not in col_names:
+            conn.execute(text("ALTER TABLE tickets ADD COLUMN lease_owner VARCHAR(64)"))
+            conn.execute(text("ALTER TABLE tickets ADD COLUMN lease_expires_at DATETIME"))
+            conn.commit()
+
+        if "escalation_pending" not in col_names:
+            conn.execute(text("ALTER TABLE tickets ADD COLUMN escalation_pending BOOLEAN NOT NULL DEFAULT 0"))
+            conn.execute(
+                text("CREATE INDEX IF NOT EXISTS ix_tickets_escalation_pending ON tickets (escalation_pending)")
+            )
+            conn.commit()
+
+        archive_cols = {row[1] for row in conn.execute(text("PRAGMA table_info(tickets_archive)")).fetchall()}
+        if "escalation_pending" not in archive_cols:
+            conn.execute(
+                text("ALTER TABLE tickets_archive ADD COLUMN escalation_pending BOOLEAN NOT NULL DEFAULT 0")
+            )
+            conn.commit()
+
+        if "triage_source" not in col_names:
+            conn.execute(text("ALTER TABLE tickets ADD COLUMN triage_source VARCHAR(40)"))
+            conn.execute(text("ALTER TABLE tickets ADD COLUMN provisional_result JSON"))
+            conn.execute(text("ALTER TABLE tickets ADD COLUMN refined_at DATETIME"))
+            conn.commit()
+
+        if "gate_score" not in col_names:
+            conn.execute(text("ALTER TABLE tickets ADD COLUMN gate_score FLOAT"))
+            conn.execute(text("ALTER TABLE tickets ADD COLUMN shadow_result JSON"))
+            conn.commit()
+
+        if "decision_trace" not in col_names:
+            conn.execute(text("ALTER TABLE tickets ADD COLUMN ai_reasoning TEXT"))
+            conn.execute(text("ALTER TABLE tickets ADD COLUMN decision_trace JSON"))
+            conn.commit()
+
+        conn.execute(
+            text("CREATE INDEX IF NOT EXISTS ix_tickets_lifecycle_status ON tickets (lifecycle_status)")
+        )
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tickets_triage_source ON tickets (triage_source)"))
+        conn.execute(
+            text("CREATE INDEX IF NOT EXISTS ix_tickets_status_created ON tickets (lifecycle_status, created_at)")
+        )
+        conn.execute(
+            text("CREATE INDEX IF NOT EXISTS ix_tickets_duplicate_ticket_id ON tickets (duplicate_ticket_id)")
+        )
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_tickets_archive_duplicate_ticket_id "
+                "ON tickets_archive (duplicate_ticket_id)"
+            )
+        )
+        conn.commit()
+
 
 _migrate_sqlite()
+ensure_search_index(engine)
+ensure_counters(engine)
+ensure_archive_metrics(engine)
+
+# sync: triage inside the request. async: store as RECEIVED, return 202, triage in worker processes.
+# two_phase: return the rulebook answer immediately, refine with the LLM in the background.
+TRIAGE_MODE = os.getenv("TRIAGE_MODE", "sync").strip().lower()
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    pool = None
+    workers = env_int("TRIAGE_WORKERS", 2)
+    watcher = None
+    if TRIAGE_MODE == "async" and workers > 0:
+        pool = WorkerPool(workers).start()
+    elif TRIAGE_MODE == "async":
+        # Standalone workers publish to their own bus; tell dashboards to refetch instead.
+        watcher = ExternalTriageWatcher().start()
+    if TRIAGE_MODE == "two_phase":
+        resume_pending_refinements()
+    # P1s whose escalation was lost between the triage commit and the Jira call.
+    asyncio.get_running_loop().run_in_executor(None, resume_pending_escalations)
+    # Tickets stored before clustering (or by a bulk import) get clusters without blocking startup.
+    asyncio.get_running_loop().run_in_executor(None, backfill_on_startup)
+    archiver = None
+    archive_after_days = env_float("ARCHIVE_AFTER_DAYS", 0)
+    if archive_after_days > 0:
+        archiver = Archiver(archive_after_days).start()
+    try:
+        yield
+    finally:
+        if pool is not None:
+            pool.stop()
+        if watcher is not None:
+            watcher.stop()
+        if archiver is not None:
+            archiver.stop()
+        await close_clients()
+
 
 app = FastAPI(
     title="Smart Incident Triage Agent",
     version="1.0.0",
     description="Enterprise-grade AI triage for IT support tickets (severity, routing, duplicates, escalation, Jira, n8n).",
+    lifespan=lifespan,
 )
 
 cors_origins = os.getenv("CORS_ORIGINS", "http://localhost:5173").split(",")
@@ -65,8 +205,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "").strip() or None
+
+if env_bool("COMPRESSION_ENABLED", default=True):
+    app.add_middleware(CompressionMiddleware)
+
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware, admin_token=ADMIN_TOKEN)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    # Fail closed: without a configured ADMIN_TOKEN the admin endpoints are disabled.
+    if not ADMIN_TOKEN or not secrets.compare_digest(x_admin_token or "", ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
 
-def _to_out(ticket: Ticket, ai_reasoning: Optional[str] = None, decision_trace: Optional[Any] = None) -> TicketOut:
+
+def _to_out(ticket: TicketColumns, decision_trace: Optional[Any] = None) -> TicketOut:
     return TicketOut(
         id=ticket.id,
         title=ticket.title,
@@ -83,125 +237,203 @@ def _to_out(ticket: Ticket, ai_reasoning: Optional[str] = None, decision_trace:
         is_duplicate=ticket.is_duplicate,
         duplicate_ticket_id=ticket.duplicate_ticket_id,
         similarity_score=ticket.similarity_score,
+        incident_cluster_id=ticket.incident_cluster_id,
         escalated=ticket.escalated,
         jira_issue_key=ticket.jira_issue_key,
         lifecycle_status=ticket.lifecycle_status,
         created_at=ticket.created_at,
-        ai_reasoning=ai_reasoning,
-        decision_trace=decision_trace,
+        triage_source=ticket.triage_source,
+        provisional_result=ticket.provisional_result,
+        ai_reasoning=ticket.ai_reasoning,
+        decision_trace=decision_trace if decision_trace is not None else ticket.decision_trace,
     )
 
 
-def _match_any(text_lower: str, phrases: list[str]) -> Optional[str]:
-    for p in phrases:
-        if p and str(p).lower() in text_lower:
-            return str(p)
-    return None
-
-
-def _build_decision_trace(
-    title: str,
-    description: str,
-    assigned_team: str,
-    severity: str,
-    similarity_score: float,
-    escalated: bool,
-    triage_source: Optional[str] = None,
-) -> dict:
-    rb = load_rulebook()
-    text_lower = f"{title}\n{description}".lower()
-
-    override_phrase = _match_any(text_lower, [str(x) for x in (rb.get("overrides", {}).get("p1_phrases", []) or [])])
-
-    routing_rules = (rb.get("routing", {}) or {}).get("rules", {}) or {}
-    routing_keywords = [str(x) for x in (routing_rules.get(assigned_team, []) or [])]
-    routing_match = _match_any(text_lower, routing_keywords)
-
-    signals = (rb.get("severity", {}) or {}).get("signals", {}) or {}
-    severity_keywords = [str(x) for x in (signals.get(severity, []) or [])]
-    severity_match = _match_any(text_lower, severity_keywords)
-
-    if override_phrase:
-        severity_logic = "P1 override"
-        signals_detected = override_phrase
-    elif severity_match:
-        severity_logic = f"Matched {severity} signal"
-        signals_detected = severity_match
-    else:
-        severity_logic = "AI classification"
-        signals_detected = None
+def _versioned_response(
+    request: Request,
+    db: Session,
+    key: tuple,
+    build: Callable[[], bytes],
+    cache: bool = True,
+) -> Response:
+    """JSON response tagged with the global ticket version: 304 on a matching If-None-Match,
+    otherwise the cached body for this version (rendered on first use)."""
+    version = response_cache.version(db)
+    etag = f'"{key[0]}-{version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}:
+        return Response(status_code=304, headers=headers)
 
-    return {
-        "triage_source": triage_source,
-        "signals_detected": signals_detected,
-        "severity_logic": severity_logic,
-        "routing_logic": f"Matched {assigned_team} keywords" if routing_match else f"Defaulted to {assigned_team}",
-        "routing_match": routing_match,
-        "duplicate_score": float(similarity_score),
-        "escalation_triggered": bool(escalated),
-    }
+    body = response_cache.body(key, version, build) if cache else build()
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics() -> Response:
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 
 @app.get("/tickets", response_model=List[TicketOut])
-def list_tickets(db: Session = Depends(get_db)) -> List[TicketOut]:
-    tickets = db.query(Ticket).order_by(Ticket.created_at.desc()).all()
-    return [_to_out(t) for t in tickets]
+@profiled
+def list_tickets(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=10_000),
+    offset: int = Query(0, ge=0),
+    include_archived: bool = False,
+    db: Session = Depends(get_db),
+) -> Response:
+    # Rows go straight to orjson; response_model is documentation only here.
+    def build() -> bytes:
+        return dumps(row_dicts(db.execute(ticket_rows_query(limit, offset, include_archived)).all()))
+
+    # Only bounded first pages are kept in memory; every listing still gets an ETag.
+    cacheable = offset == 0 and limit is not None
+    key = ("tickets", limit, offset, include_archived)
+    return _versioned_response(request, db, key, build, cache=cacheable)
+
+
+@app.get("/tickets/export", response_class=StreamingResponse)
+def export_tickets(include_archived: bool = False) -> StreamingResponse:
+    """All tickets as newline-delimited JSON, streamed from a server-side cursor."""
+
+    def generate() -> Any:
+        # Own session: dependency teardown runs before a streamed body is sent.
+        db = SessionLocal()
+        try:
+            stmt = ticket_rows_query(include_archived=include_archived).execution_options(yield_per=1000)
+            yield from ndjson_lines(db.execute(stmt))
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="tickets.ndjson"'},
+    )
+
+
+# Declared before /tickets/{ticket_id} so "search" is not parsed as an id.
+@app.get("/tickets/search", response_model=TicketSearchResults)
+@profiled
+def search_tickets(
+    q: str = Query(..., min_length=1, max_length=500),
+    mode: str = Query("keyword", pattern="^(keyword|semantic)$"),
+    severity: Optional[str] = None,
+    assigned_team: Optional[str] = None,
+    source: Optional[str] = None,
+    lifecycle_status: Optional[str] = None,
+    is_duplicate: Optional[bool] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10_000),
+    include_archived: bool = False,
+    db: Session = Depends(get_db),
+) -> TicketSearchResults:
+    filters = SearchFilters(
+        severity=severity,
+        assigned_team=assigned_team,
+        source=source,
+        lifecycle_status=lifecycle_status.upper() if lifecycle_status else None,
+        is_duplicate=is_duplicate,
+        created_after=created_after,
+        created_before=created_before,
+    )
+    try:
+        if mode == "semantic":
+            page = semantic_search(db, q, filters, limit, offset, include_archived)
+        else:
+            page = keyword_search(db, q, filters, limit, offset, include_archived)
+    except SearchUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return TicketSearchResults(query=q, mode=mode, total=page.total, limit=limit, offset=offset, results=page.hits)
 
 
 @app.get("/tickets/{ticket_id}", response_model=TicketOut)
-def get_ticket(ticket_id: int, db: Session = Depends(get_db)) -> TicketOut:
+@profiled
+def get_ticket(ticket_id: int, include_archived: bool = False, db: Session = Depends(get_db)) -> TicketOut:
     t = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    if not t and include_archived:
+        t = db.get(ArchivedTicket, ticket_id)
     if not t:
         raise HTTPException(status_code=404, detail="Ticket not found")
     return _to_out(t)
 
 
-@app.post("/tickets", response_model=TicketOut)
-def create_ticket(payload: TicketCreate, db: Session = Depends(get_db)) -> TicketOut:
+def _async_intake() -> bool:
+    return TRIAGE_MODE == "async"
+
+
+def _two_phase() -> bool:
+    return TRIAGE_MODE == "two_phase"
+
+
+def _accepted(response: Response, ticket: Ticket) -> TicketOut:
+    response.status_code = 202
+    response.headers["Location"] = f"/tickets/{ticket.id}"
+    return _to_out(ticket)
+
+
+def _created(ticket: Ticket) -> TicketOut:
+    decision_trace = ticket.decision_trace
+    if decision_trace is not None and trace_timings_enabled():
+        decision_trace = {**decision_trace, "stage_timings_ms": current_timings()}
+    return _to_out(ticket, decision_trace=decision_trace)
+
+
+@profiled
+def _admit_and_process(db: Session, ticket: Ticket, priority: bool, key: str) -> dict:
+    """Run triage behind admission control; 429 with Retry-After when the normal lane is saturated.
+
+    Profiled here rather than on the async Datadog endpoint, whose triage runs in the
+    threadpool where an event-loop profiler cannot see it. Inside a profiled sync
+    endpoint this is a no-op (one profile at a time).
+    """
+    try:
+        with admission.admit(priority, key) as slot:
+            return process_ticket(db, ticket, provisional=_two_phase(), degraded=slot.degraded)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Triage capacity exceeded ({e.reason}); retry later",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+@app.post("/tickets", response_model=TicketOut, responses={202: {"model": TicketOut}})
+@profiled
+def create_ticket(
+    payload: TicketCreate, request: Request, response: Response, db: Session = Depends(get_db)
+) -> TicketOut:
+    start_request_timings()
     reporter = (payload.reporter or "").strip() or "Unknown"
     department = (payload.department or "").strip() or "Unknown"
-    ai = triage_ticket(payload.title, payload.description)
-
-    is_dup, dup_id, sim = detect_duplicate(db, payload.title, payload.description, threshold=0.85)
 
     ticket = Ticket(
         title=payload.title,
         description=payload.description,
         reporter=reporter,
         department=department,
-        severity=ai["severity"],
-        confidence=float(ai["confidence"]),
-        assigned_team=ai["assigned_team"],
-        suggested_fixes=ai["suggested_fixes"],
-        is_duplicate=bool(is_dup),
-        duplicate_ticket_id=dup_id,
-        similarity_score=float(sim),
-        escalated=False,
-        jira_issue_key=None,
-        lifecycle_status="TRIAGED",
     )
 
-    db.add(ticket)
-    db.commit()
-    db.refresh(ticket)
-
-    ticket = escalate_if_needed(db, ticket)
+    if _async_intake():
+        return _accepted(response, receive_ticket(db, ticket))
 
-    decision_trace = _build_decision_trace(
-        title=ticket.title,
-        description=ticket.description,
-        assigned_team=ticket.assigned_team,
-        severity=ticket.severity,
-        similarity_score=ticket.similarity_score,
-        escalated=ticket.escalated,
-        triage_source=str(ai.get("triage_source", "")) or None,
-    )
-
-    return _to_out(ticket, ai_reasoning=str(ai.get("reasoning", "")), decision_trace=decision_trace)
+    priority = has_p1_override(ticket.title, ticket.description)
+    if (payload.reporter or "").strip():
+        key = f"manual:{reporter.lower()}"
+    else:
+        # Anonymous reporters are told apart by client address, not pooled in one bucket.
+        key = f"manual-ip:{request.client.host if request.client else 'unknown'}"
+    _admit_and_process(db, ticket, priority, key=key)
+    return _created(ticket)
 
 
-@app.post("/monitoring/datadog", response_model=TicketOut)
-async def ingest_datadog_alert(request: Request, db: Session = Depends(get_db)) -> TicketOut:
+@app.post("/monitoring/datadog", response_model=TicketOut, responses={202: {"model": TicketOut}})
+async def ingest_datadog_alert(request: Request, response: Response, db: Session = Depends(get_db)) -> TicketOut:
     try:
         payload = await request.json()
     except Exception:
@@ -217,108 +449,318 @@ async def ingest_datadog_alert(request: Request, db: Session = Depends(get_db))
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid Datadog payload")
 
-    try:
-        ai = triage_ticket(title, description)
-    except Exception:
-        raise HTTPException(status_code=500, detail="Triage failed")
-
-    if force_p1:
-        ai = dict(ai)
-        ai["severity"] = "P1"
-        ai["confidence"] = max(float(ai.get("confidence", 0.75)), 0.9)
-        ai["reasoning"] = "Datadog P1 override: critical monitoring alert triggered."
-
-    is_dup, dup_id, sim = detect_duplicate(db, title, description, threshold=0.85)
-
+    start_request_timings()
     ticket = Ticket(
         title=title,
         description=description,
         reporter="Datadog Monitor",
         department="Infrastructure",
-        severity=ai["severity"],
-        confidence=float(ai["confidence"]),
-        assigned_team=ai["assigned_team"],
-        suggested_fixes=ai["suggested_fixes"],
-        is_duplicate=bool(is_dup),
-        duplicate_ticket_id=dup_id,
-        similarity_score=float(sim),
-        escalated=False,
-        jira_issue_key=None,
-        lifecycle_status="TRIAGED",
         source="datadog",
-        alert_metadata=metadata,
+        alert_metadata={**metadata, "force_p1": force_p1},
     )
 
-    db.add(ticket)
-    db.commit()
-    db.refresh(ticket)
+    if _async_intake():
+        return _accepted(response, receive_ticket(db, ticket))
 
-    if ticket.severity == "P1" and not ticket.is_duplicate:
-        ticket = escalate_if_needed(db, ticket)
+    priority = force_p1 or has_p1_override(title, description)
+    key = f"datadog:{metadata.get('host') or 'unknown'}"
+    try:
+        await run_in_threadpool(_admit_and_process, db, ticket, priority, key)
+    except HTTPException:
+        raise
+    except Exception:
+        raise HTTPException(status_code=500, detail="Triage failed")
+    return _created(ticket)
 
-    decision_trace = _build_decision_trace(
-        title=ticket.title,
-        description=ticket.description,
-        assigned_team=ticket.assigned_team,
-        severity=ticket.severity,
-        similarity_score=ticket.similarity_score,
-        escalated=ticket.escalated,
-        triage_source=str(ai.get("triage_source", "")) or None,
-    )
 
-    return _to_out(ticket, ai_reasoning=str(ai.get("reasoning", "")), decision_trace=decision_trace)
+@app.patch("/tickets/status", response_model=BulkStatusResult)
+@profiled
+def bulk_update_ticket_status(payload: BulkStatusUpdate, db: Session = Depends(get_db)) -> BulkStatusResult:
+    """Move every ticket selected by `ids` and/or `filter` to one lifecycle status; returns counts only."""
+    status = payload.lifecycle_status.strip().upper()
+    if status not in LIFECYCLE_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Invalid lifecycle_status. Allowed: {sorted(LIFECYCLE_STATUSES)}")
+
+    filters = None
+    if payload.filter is not None:
+        values = payload.filter.model_dump()
+        if values["lifecycle_status"]:
+            values["lifecycle_status"] = values["lifecycle_status"].upper()
+        filters = SearchFilters(**values)
+    if payload.ids is None and (filters is None or not any(v is not None for v in filters)):
+        raise HTTPException(status_code=400, detail="Provide ids or at least one filter field")
+
+    outcome = bulk_update_status(db, status, payload.ids, filters, payload.cascade_duplicates)
+    return BulkStatusResult(lifecycle_status=status, **outcome._asdict())
 
 
 @app.patch("/tickets/{ticket_id}/status", response_model=TicketOut)
+@profiled
 def update_ticket_status(ticket_id: int, payload: TicketStatusUpdate, db: Session = Depends(get_db)) -> TicketOut:
     t = db.query(Ticket).filter(Ticket.id == ticket_id).first()
     if not t:
         raise HTTPException(status_code=404, detail="Ticket not found")
 
     status = payload.lifecycle_status.strip().upper()
-    allowed = {"RECEIVED", "TRIAGED", "ESCALATED", "RESOLVED"}
-    if status not in allowed:
-        raise HTTPException(status_code=400, detail=f"Invalid lifecycle_status. Allowed: {sorted(allowed)}")
+    if status not in LIFECYCLE_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Invalid lifecycle_status. Allowed: {sorted(LIFECYCLE_STATUSES)}")
 
+    previous = t.lifecycle_status
     t.lifecycle_status = status
     db.add(t)
     db.commit()
     db.refresh(t)
+
+    if previous != status:
+        bus.publish(
+            TICKET_STATUS_CHANGED,
+            {"ticket": ticket_summary(t), "previous_status": previous, "version": committed_version(db)},
+        )
     return _to_out(t)
 
 
 @app.get("/dashboard/metrics", response_model=DashboardMetrics)
-def dashboard_metrics(db: Session = Depends(get_db)) -> DashboardMetrics:
-    tickets = db.query(Ticket).all()
-
-    total = len(tickets)
-    escalated = sum(1 for t in tickets if t.escalated)
-    duplicates = sum(1 for t in tickets if t.is_duplicate)
-    monitoring = sum(1 for t in tickets if getattr(t, "source", "manual") == "datadog")
-
-    severity_counts = Counter([t.severity for t in tickets])
-    team_counts = Counter([t.assigned_team for t in tickets])
-
-    by_severity = [{"name": k, "value": int(v)} for k, v in sorted(severity_counts.items())]
-    by_team = [{"name": k, "value": int(v)} for k, v in sorted(team_counts.items())]
-
-    prevented = duplicates
-    hours_per_duplicate = float(os.getenv("HOURS_SAVED_PER_DUPLICATE", "1.5"))
-    hours_saved = round(prevented * hours_per_duplicate, 2)
-
-    return DashboardMetrics(
-        total_tickets=total,
-        escalated_tickets=escalated,
-        duplicate_tickets=duplicates,
-        monitoring_tickets=monitoring,
-        duplicate_tickets_prevented=prevented,
-        estimated_engineer_hours_saved=hours_saved,
-        by_severity=by_severity,
-        by_team=by_team,
+@profiled
+def dashboard_metrics(request: Request, db: Session = Depends(get_db)) -> Response:
+    """Metrics snapshot tied to the event stream.
+
+    `snapshot_event_id` is the last event published before the snapshot was read,
+    so `/events/stream?since=<id>` replays everything the snapshot may miss.
+    `snapshot_version` is the ticket version the aggregates reflect exactly; an
+    event whose `version` is not above it is already counted and is skipped.
+    """
+
+    # RECEIVED tickets still carry placeholder severity/team until a worker triages them.
+    triaged = Ticket.lifecycle_status != "RECEIVED"
+
+    def aggregates() -> tuple:
+        totals = db.execute(
+            select(
+                func.count(Ticket.id),
+                func.coalesce(func.sum(case((Ticket.escalated.is_(True), 1), else_=0)), 0),
+                func.coalesce(func.sum(case((Ticket.is_duplicate.is_(True), 1), else_=0)), 0),
+                func.coalesce(func.sum(case((Ticket.source == "datadog", 1), else_=0)), 0),
+            ).where(triaged)
+        ).one()
+        severity_counts = Counter(
+            dict(db.execute(select(Ticket.severity, func.count()).where(triaged).group_by(Ticket.severity)).all())
+        )
+        team_counts = Counter(
+            dict(
+                db.execute(
+                    select(Ticket.assigned_team, func.count()).where(triaged).group_by(Ticket.assigned_team)
+                ).all()
+            )
+        )
+        return totals, severity_counts, team_counts, read_archive_metrics(db)
+
+    def build() -> bytes:
+        event_id = bus.last_id
+        # The aggregates take several statements; accept them only if no ticket write
+        # committed in between, so they match `version` exactly.
+        for _ in range(3):
+            version = read_change_counter(db)
+            (total, escalated, duplicates, monitoring), severity_counts, team_counts, archived = aggregates()
+            if read_change_counter(db) == version:
+                break
+
+        # Archived tickets still count: their aggregates were set aside as they were archived.
+        total += archived.get(("total", ""), 0)
+        escalated += archived.get(("escalated", ""), 0)
+        duplicates += archived.get(("duplicates", ""), 0)
+        monitoring += archived.get(("monitoring", ""), 0)
+        for (dimension, key), n in archived.items():
+            if dimension == "severity":
+                severity_counts[key] += n
+            elif dimension == "team":
+                team_counts[key] += n
+
+        by_severity = [{"name": k, "value": int(v)} for k, v in sorted(severity_counts.items())]
+        by_team = [{"name": k, "value": int(v)} for k, v in sorted(team_counts.items())]
+
+        prevented = int(duplicates)
+        hours_saved = round(prevented * hours_per_duplicate(), 2)
+
+        metrics = DashboardMetrics(
+            total_tickets=int(total),
+            escalated_tickets=int(escalated),
+            duplicate_tickets=int(duplicates),
+            monitoring_tickets=int(monitoring),
+            duplicate_tickets_prevented=prevented,
+            estimated_engineer_hours_saved=hours_saved,
+            by_severity=by_severity,
+            by_team=by_team,
+            snapshot_event_id=event_id,
+            snapshot_version=version,
+        )
+        return dumps(metrics.model_dump())
+
+    return _versioned_response(request, db, ("dashboard-metrics",), build)
+
+
+@app.get("/admission/stats", response_model=AdmissionStats)
+def admission_stats() -> AdmissionStats:
+    return AdmissionStats(**admission.stats())
+
+
+@app.get("/reports/refinement", response_model=RefinementReport)
+def refinement_report(db: Session = Depends(get_db)) -> RefinementReport:
+    """How often the background LLM refinement changed the provisional rulebook answer."""
+    pending = db.query(Ticket).filter(Ticket.triage_source.in_([PROVISIONAL, REFINING])).count()
+    rows = (
+        db.query(Ticket.provisional_result, Ticket.severity, Ticket.triage_source, Ticket.escalated)
+        .filter(Ticket.refined_at.isnot(None))
+        .all()
     )
 
+    transitions: Counter = Counter()
+    changed = 0
+    llm_unavailable = 0
+    escalated_after_refinement = 0
+    for provisional, severity, triage_source, escalated in rows:
+        before = str((provisional or {}).get("severity") or "")
+        if triage_source == "rulebook_final":
+            llm_unavailable += 1
+        if before != severity:
+            changed += 1
+            transitions[f"{before}->{severity}"] += 1
+            if severity == "P1" and escalated:
+                escalated_after_refinement += 1
+
+    refined = len(rows)
+    return RefinementReport(
+        refined_tickets=refined,
+        pending_refinements=pending,
+        llm_unavailable=llm_unavailable,
+        severity_changed=changed,
+        severity_change_rate=round(changed / refined, 4) if refined else 0.0,
+        transitions=dict(transitions),
+        escalated_after_refinement=escalated_after_refinement,
+    )
+
+
+@app.get("/reports/llm-gating", response_model=LlmGatingReport)
+def llm_gating_report(db: Session = Depends(get_db)) -> LlmGatingReport:
+    """Share of LLM-eligible tickets answered by the rulebook alone, and shadow-mode agreement."""
+    eligible = db.query(Ticket).filter(Ticket.gate_score.isnot(None)).count()
+    skipped = db.query(Ticket).filter(Ticket.triage_source == "rulebook_gated").count()
+    shadows = db.query(Ticket.shadow_result, Ticket.severity).filter(Ticket.shadow_result.isnot(None)).all()
+
+    agreed = 0
+    disagreements: Counter = Counter()
+    sampled = 0
+    for shadow, severity in shadows:
+        if not shadow:
+            continue
+        sampled += 1
+        if shadow.get("severity") == severity:
+            agreed += 1
+        else:
+            disagreements[f"{severity}->{shadow.get('severity')}"] += 1
+
+    return LlmGatingReport(
+        threshold=env_float("LLM_SKIP_THRESHOLD", 0.8),
+        eligible_tickets=eligible,
+        llm_skipped=skipped,
+        skip_rate=round(skipped / eligible, 4) if eligible else 0.0,
+        shadow_sampled=sampled,
+        shadow_agreement_rate=round(agreed / sampled, 4) if sampled else None,
+        shadow_disagreements=dict(disagreements),
+    )
+
+
+@app.get("/clusters", response_model=List[IncidentClusterOut])
+def list_clusters(
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+) -> Response:
+    # Never load centroids (hundreds of floats each) just to list clusters.
+    rows = db.execute(
+        select(
+            IncidentCluster.id,
+            IncidentCluster.title,
+            IncidentCluster.representative_ticket_id,
+            IncidentCluster.size,
+            IncidentCluster.first_seen_at,
+            IncidentCluster.last_seen_at,
+        )
+        .order_by(IncidentCluster.last_seen_at.desc())
+        .limit(limit)
+    ).all()
+    return FastJSONResponse(row_dicts(rows))
+
+
+@app.get("/events/stream", include_in_schema=False)
+async def event_stream(
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    since: Optional[int] = Query(None, ge=0),
+) -> StreamingResponse:
+    """Server-sent events for ticket.created / ticket.status_changed / ticket.escalated.
+
+    Each event carries a `metrics_delta` to apply to `/dashboard/metrics`. Reconnects
+    resume from `Last-Event-ID` (sent automatically by EventSource); if the gap is no
+    longer buffered a `resync` event tells the client to refetch.
+    """
+    sub = bus.subscribe()
+    resume_from = since
+    if last_event_id and last_event_id.strip().isdigit():
+        resume_from = int(last_event_id.strip())
+    backlog = bus.replay_since(resume_from) if resume_from is not None else []
+
+    async def stream():
+        last_sent = resume_from or 0
+        try:
+            yield "retry: 3000\n\n"
+            if backlog is None:
+                last_sent = bus.last_id
+                yield format_sse({"id": last_sent, "type": RESYNC, "data": {"reason": "gap"}})
+            else:
+                for event in backlog:
+                    last_sent = event["id"]
+                    yield format_sse(event)
+
+            while not await request.is_disconnected():
+                if sub.overflowed:
+                    yield format_sse({"id": last_sent, "type": RESYNC, "data": {"reason": "slow_consumer"}})
+                    break
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event["id"] <= last_sent:
+                    continue
+                last_sent = event["id"]
+                yield format_sse(event)
+        finally:
+            bus.unsubscribe(sub)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/admin/profiles", response_model=List[ProfileSummary], dependencies=[Depends(require_admin)])
+def list_request_profiles() -> List[ProfileSummary]:
+    return [ProfileSummary(**p) for p in list_profiles()]
+
+
+@app.get("/admin/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+def get_request_profile(profile_id: str) -> Response:
+    p = get_profile(profile_id)
+    if not p:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if p["format"] == "html":
+        return HTMLResponse(p["content"])
+    return PlainTextResponse(p["content"])
+
 
 @app.post("/seed", response_model=SeedResponse)
 def seed(db: Session = Depends(get_db)) -> SeedResponse:
     inserted = seed_demo_tickets(db)
+    if inserted:
+        bus.publish(RESYNC, {"reason": "seed"})
     return SeedResponse(inserted=inserted)
@@ -3,15 +3,15 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any, Optional
 
-from sqlalchemy import Boolean, DateTime, Float, Integer, String, Text
+from sqlalchemy import Boolean, DateTime, Float, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.types import JSON
 
 from database import Base
 
 
-class Ticket(Base):
-    __tablename__ = "tickets"
+class TicketColumns:
+    """Columns shared by the hot `tickets` table and `tickets_archive`."""
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
 
@@ -27,15 +27,89 @@ class Ticket(Base):
     suggested_fixes: Mapped[Any] = mapped_column(JSON, nullable=False, default=list)
 
     is_duplicate: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
-    duplicate_ticket_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    duplicate_ticket_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, index=True)
     similarity_score: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
 
+    incident_cluster_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, index=True)
+    embedding: Mapped[Optional[Any]] = mapped_column(JSON, nullable=True, default=None)
+
     escalated: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     jira_issue_key: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    # Set in the triage transaction of a P1 and cleared by its escalation, so a crash
+    # in between leaves the ticket to `workers.claim_pending_escalations`.
+    escalation_pending: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, index=True)
 
     source: Mapped[str] = mapped_column(String(30), nullable=False, default="manual")
     alert_metadata: Mapped[Optional[Any]] = mapped_column("metadata", JSON, nullable=True, default=None)
 
-    lifecycle_status: Mapped[str] = mapped_column(String(20), nullable=False, default="RECEIVED")
+    lifecycle_status: Mapped[str] = mapped_column(String(20), nullable=False, default="RECEIVED", index=True)
+
+    triage_source: Mapped[Optional[str]] = mapped_column(String(40), nullable=True, index=True)
+    # Explainability, computed once during triage and served from reads.
+    ai_reasoning: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    decision_trace: Mapped[Optional[Any]] = mapped_column(JSON, nullable=True, default=None)
+    # Two-phase triage: the instant rulebook answer, kept after the LLM refines the ticket.
+    provisional_result: Mapped[Optional[Any]] = mapped_column(JSON, nullable=True, default=None)
+    refined_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    # LLM gating: rulebook match strength, and the sampled shadow LLM answer for skipped tickets.
+    gate_score: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    shadow_result: Mapped[Optional[Any]] = mapped_column(JSON, nullable=True, default=None)
+
+    # Set while a triage worker owns a RECEIVED ticket, a refiner a REFINING one, or
+    # the triaging process a pending escalation.
+    lease_owner: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class Ticket(TicketColumns, Base):
+    __tablename__ = "tickets"
+    # Archival scans RESOLVED tickets by age.
+    __table_args__ = (Index("ix_tickets_status_created", "lifecycle_status", "created_at"),)
+
+
+class ArchivedTicket(TicketColumns, Base):
+    """RESOLVED tickets moved out of the hot table by `archival.py`; ids are preserved."""
+
+    __tablename__ = "tickets_archive"
+
+    archived_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+
+class ArchiveMetric(Base):
+    """Dashboard aggregates of archived tickets, added to by `archival.archive_batch` as rows move.
+
+    `dimension` is total/escalated/duplicates/monitoring (empty `key`) or severity/team.
+    """
+
+    __tablename__ = "archive_metrics"
+
+    dimension: Mapped[str] = mapped_column(String(20), primary_key=True)
+    key: Mapped[str] = mapped_column(String(120), primary_key=True, default="")
+    value: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class IncidentCluster(Base):
+    __tablename__ = "incident_clusters"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    representative_ticket_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+    centroid: Mapped[Any] = mapped_column(JSON, nullable=False)
+    size: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    first_seen_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    last_seen_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+
+class ChangeCounter(Base):
+    """Monotonic per-resource version, bumped in the same transaction as the change it counts."""
+
+    __tablename__ = "change_counters"
+
+    name: Mapped[str] = mapped_column(String(40), primary_key=True)
+    value: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
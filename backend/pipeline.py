@@ -0,0 +1,373 @@
+from __future__ import annotations
+
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+import changes  # noqa: F401 - registers the ticket change-counter flush hook (API and worker processes)
+from ai_engine import (
+    apply_p1_override,
+    build_decision_trace,
+    forces_p1,
+    refine_with_llm,
+    triage_rulebook,
+    triage_ticket,
+)
+from changes import bump_change_counter, committed_version
+from clustering import assign_to_cluster
+from database import SessionLocal
+from escalation import defer_escalation, escalate_if_needed
+from events import (
+    TICKET_CREATED,
+    TICKET_REFINED,
+    TICKET_TRIAGED,
+    bus,
+    created_metrics_delta,
+    ticket_summary,
+    triaged_metrics_delta,
+)
+from models import Ticket
+from settings import env_int
+from similarity import detect_duplicate
+from telemetry import record_outcome, stage
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_THRESHOLD = 0.85
+PROVISIONAL = "rulebook_provisional"
+REFINING = "rulebook_refining"
+DEGRADED = "rulebook_degraded"
+# A refiner that has not finished within this many seconds is presumed dead.
+REFINEMENT_LEASE_SECONDS = env_int("REFINEMENT_LEASE_SECONDS", 300)
+
+_background = ThreadPoolExecutor(
+    max_workers=env_int("REFINEMENT_WORKERS", 4),
+    thread_name_prefix="triage-refine",
+)
+
+
+def should_escalate(ticket: Ticket) -> bool:
+    if ticket.severity != "P1" or ticket.escalated:
+        return False
+    # Repeated monitoring alerts for an already-open incident are not re-escalated.
+    return not (ticket.source == "datadog" and ticket.is_duplicate)
+
+
+def _force_p1(ticket: Ticket) -> bool:
+    return forces_p1(ticket.source, ticket.alert_metadata)
+
+
+def _snapshot(ticket: Ticket) -> Dict[str, Any]:
+    return {
+        "severity": ticket.severity,
+        "assigned_team": ticket.assigned_team,
+        "is_duplicate": ticket.is_duplicate,
+        "lifecycle_status": ticket.lifecycle_status,
+    }
+
+
+def _decision_trace(ticket: Ticket, ai: Dict[str, Any], escalating: bool) -> Optional[Dict[str, Any]]:
+    rules = ai.get("rules")
+    if rules is None:
+        return None
+    trace = build_decision_trace(rules, ticket.severity, ticket.assigned_team, ticket.triage_source)
+    if _force_p1(ticket):
+        trace["severity_logic"] = "Datadog P1 override"
+    trace["duplicate_score"] = float(ticket.similarity_score or 0.0)
+    trace["escalation_triggered"] = escalating
+    return trace
+
+
+def process_ticket(
+    db: Session,
+    ticket: Ticket,
+    provisional: bool = False,
+    degraded: bool = False,
+    escalate: bool = True,
+) -> Dict[str, Any]:
+    """Triage, de-duplicate, store and (if P1) escalate a ticket.
+
+    Works both for a new, unsaved ticket (synchronous intake) and for a ticket
+    already persisted as RECEIVED (asynchronous intake). Returns the triage result.
+
+    With `provisional=True` only the rulebook runs; the ticket is stored with
+    triage_source=rulebook_provisional and the LLM refines it in the background.
+    A rulebook or Datadog P1 override is final and escalates immediately.
+
+    With `degraded=True` (admission control under load) the rulebook answer is
+    final and no LLM call is made or scheduled.
+
+    With `escalate=False` the caller escalates (e.g. a worker batching several
+    P1 tickets into one bulk Jira request; see `should_escalate`). Either way the
+    escalation is recorded as pending in the triage commit (`defer_escalation`).
+    """
+    is_new = ticket.id is None
+    before = None if is_new else _snapshot(ticket)
+
+    if degraded:
+        ai = triage_rulebook(ticket.title, ticket.description, triage_source=DEGRADED, gate_llm=False)
+    elif provisional:
+        ai = triage_rulebook(ticket.title, ticket.description, triage_source=PROVISIONAL)
+    else:
+        ai = triage_ticket(ticket.title, ticket.description)
+    if _force_p1(ticket):
+        ai = apply_p1_override(ai)
+        if ai.get("triage_source") == PROVISIONAL:
+            ai["triage_source"] = "datadog_override"
+
+    refine_later = ai.get("triage_source") == PROVISIONAL
+
+    ticket.severity = ai["severity"]
+    ticket.confidence = float(ai["confidence"])
+    ticket.assigned_team = ai["assigned_team"]
+    ticket.suggested_fixes = ai["suggested_fixes"]
+    ticket.triage_source = ai.get("triage_source")
+    ticket.lifecycle_status = "TRIAGED"
+    gate = ai.get("gate") or {}
+    if gate:
+        ticket.gate_score = float(gate["score"])
+    if refine_later:
+        ticket.provisional_result = {
+            "severity": ai["severity"],
+            "confidence": float(ai["confidence"]),
+            "assigned_team": ai["assigned_team"],
+            "reasoning": ai.get("reasoning"),
+        }
+
+    match = None
+    if ticket.incident_cluster_id is None:
+        match = detect_duplicate(db, ticket.title, ticket.description, threshold=DUPLICATE_THRESHOLD)
+        ticket.is_duplicate = bool(match.is_duplicate)
+        ticket.duplicate_ticket_id = match.duplicate_ticket_id
+        ticket.similarity_score = float(match.similarity_score)
+
+    ticket.ai_reasoning = str(ai.get("reasoning", "")) or None
+    escalating = not refine_later and should_escalate(ticket)
+    ticket.decision_trace = _decision_trace(ticket, ai, escalating=escalating)
+    if escalating:
+        defer_escalation(ticket)
+
+    db.add(ticket)
+    db.flush()
+    if match is not None:
+        assign_to_cluster(db, ticket, match.vector, match.cluster)
+    with stage("db_commit"):
+        db.commit()
+    db.refresh(ticket)
+    record_outcome(ai.get("triage_source"))
+
+    if is_new:
+        bus.publish(
+            TICKET_CREATED,
+            {
+                "ticket": ticket_summary(ticket),
+                "metrics_delta": created_metrics_delta(ticket),
+                "version": committed_version(db),
+            },
+        )
+    else:
+        bus.publish(
+            TICKET_TRIAGED,
+            {
+                "ticket": ticket_summary(ticket),
+                "metrics_delta": triaged_metrics_delta(before, ticket),
+                "version": committed_version(db),
+            },
+        )
+
+    if gate.get("shadow") and not degraded:
+        _background.submit(shadow_compare, ticket.id)
+
+    if refine_later:
+        _background.submit(refine_ticket, ticket.id)
+    elif escalate and escalating:
+        ticket = escalate_if_needed(db, ticket)
+
+    return ai
+
+
+def _refinable(now: datetime):
+    """Provisional tickets, and REFINING ones whose refiner's lease has run out."""
+    return or_(
+        Ticket.triage_source == PROVISIONAL,
+        (Ticket.triage_source == REFINING)
+        & or_(Ticket.lease_expires_at.is_(None), Ticket.lease_expires_at < now),
+    )
+
+
+def _claim_refinement(db: Session, ticket_id: int, owner: str) -> bool:
+    """Atomically lease a ticket to `owner` as REFINING; only one refiner gets rowcount 1."""
+    now = datetime.utcnow()
+    result = db.execute(
+        update(Ticket)
+        .where(Ticket.id == ticket_id, _refinable(now))
+        .values(
+            triage_source=REFINING,
+            lease_owner=owner,
+            lease_expires_at=now + timedelta(seconds=REFINEMENT_LEASE_SECONDS),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        db.rollback()
+        return False
+    bump_change_counter(db)
+    db.commit()
+    return True
+
+
+def _release_refinement(ticket_id: int, owner: str) -> None:
+    """Hand a ticket whose refinement failed back to the provisional queue."""
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(Ticket)
+            .where(Ticket.id == ticket_id, Ticket.triage_source == REFINING, Ticket.lease_owner == owner)
+            .values(triage_source=PROVISIONAL, lease_owner=None, lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        bump_change_counter(db)
+        db.commit()
+    finally:
+        db.close()
+
+
+def refine_ticket(ticket_id: int) -> None:
+    """Second phase of two-phase triage: replace the provisional answer with the LLM's.
+
+    The ticket is leased before the LLM call, so a ticket queued twice (by intake and
+    by `resume_pending_refinements`, or by several API processes) is refined once.
+    """
+    db = SessionLocal()
+    owner = f"refine:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    claimed = False
+    try:
+        if not _claim_refinement(db, ticket_id, owner):
+            return
+        claimed = True
+        ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+        if ticket is None:
+            return
+
+        before = _snapshot(ticket)
+        result = refine_with_llm(ticket.title, ticket.description)
+        if result is None:
+            # No LLM available; the rulebook answer stands as final.
+            ticket.triage_source = "rulebook_final"
+            if ticket.decision_trace:
+                ticket.decision_trace = {
+                    **ticket.decision_trace,
+                    "triage_source": ticket.triage_source,
+                    "escalation_triggered": should_escalate(ticket),
+                }
+        else:
+            ticket.severity = result["severity"]
+            ticket.confidence = float(result["confidence"])
+            ticket.suggested_fixes = result["suggested_fixes"]
+            ticket.triage_source = result.get("triage_source")
+            ticket.ai_reasoning = str(result.get("reasoning", "")) or None
+            ticket.decision_trace = _decision_trace(ticket, result, escalating=should_escalate(ticket))
+        ticket.refined_at = datetime.utcnow()
+        ticket.lease_owner = None
+        ticket.lease_expires_at = None
+        if should_escalate(ticket):
+            defer_escalation(ticket)
+
+        db.add(ticket)
+        with stage("db_commit"):
+            db.commit()
+        claimed = False
+        db.refresh(ticket)
+        record_outcome(ticket.triage_source)
+
+        bus.publish(
+            TICKET_REFINED,
+            {
+                "ticket": ticket_summary(ticket),
+                "provisional_severity": before["severity"],
+                "metrics_delta": triaged_metrics_delta(before, ticket),
+                "version": committed_version(db),
+            },
+        )
+
+        if should_escalate(ticket):
+            escalate_if_needed(db, ticket)
+    except Exception:
+        logger.exception("Background refinement failed for ticket %s", ticket_id)
+        db.rollback()
+        if claimed:
+            _release_refinement(ticket_id, owner)
+    finally:
+        db.close()
+
+
+def shadow_compare(ticket_id: int) -> None:
+    """Call the LLM for a gated ticket without applying it, to measure agreement."""
+    db = SessionLocal()
+    try:
+        ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+        if ticket is None:
+            return
+        result = refine_with_llm(ticket.title, ticket.description)
+        if result is None:
+            return
+        ticket.shadow_result = {
+            "severity": result["severity"],
+            "confidence": float(result["confidence"]),
+            "agrees": result["severity"] == ticket.severity,
+        }
+        db.add(ticket)
+        db.commit()
+    except Exception:
+        logger.exception("Shadow LLM comparison failed for ticket %s", ticket_id)
+    finally:
+        db.close()
+
+
+def resume_pending_refinements(limit: int = 500) -> int:
+    """Re-queue provisional tickets whose refinement was lost (e.g. on restart).
+
+    A REFINING ticket is re-queued only once its lease has expired: another API
+    process may still be refining it.
+    """
+    db = SessionLocal()
+    try:
+        ids = [
+            int(r[0])
+            for r in db.query(Ticket.id)
+            .filter(_refinable(datetime.utcnow()))
+            .order_by(Ticket.id)
+            .limit(limit)
+            .all()
+        ]
+    finally:
+        db.close()
+
+    for ticket_id in ids:
+        _background.submit(refine_ticket, ticket_id)
+    return len(ids)
+
+
+def receive_ticket(db: Session, ticket: Ticket) -> Ticket:
+    """Persist a raw ticket as RECEIVED for the triage workers to pick up."""
+    ticket.lifecycle_status = "RECEIVED"
+    db.add(ticket)
+    with stage("db_commit"):
+        db.commit()
+    db.refresh(ticket)
+    bus.publish(
+        TICKET_CREATED,
+        {
+            "ticket": ticket_summary(ticket),
+            # RECEIVED tickets are left out of the dashboard until triaged.
+            "metrics_delta": {},
+            "version": committed_version(db),
+        },
+    )
+    return ticket
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import contextvars
+import functools
+import inspect
+import io
+import random
+import secrets
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from settings import env_bool, env_float, env_int
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+SAMPLE_RATE = env_float("PROFILING_SAMPLE_RATE", 0)
+ALLOW_HEADER = env_bool("PROFILING_ALLOW_HEADER")
+MAX_PROFILES = env_int("PROFILING_MAX_PROFILES", 50)
+PROFILING_ENABLED = SAMPLE_RATE > 0 or ALLOW_HEADER
+
+
+class _Slot:
+    __slots__ = ("id", "method", "path", "captured")
+
+    def __init__(self, method: str, path: str) -> None:
+        self.id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.captured = False
+
+
+_active_slot: contextvars.ContextVar[Optional[_Slot]] = contextvars.ContextVar("profile_slot", default=None)
+
+_store: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_store_lock = threading.Lock()
+
+
+def _save(slot: _Slot, started: float, fmt: str, content: str) -> None:
+    entry = {
+        "id": slot.id,
+        "method": slot.method,
+        "path": slot.path,
+        "created_at": datetime.utcnow(),
+        "duration_ms": round((time.perf_counter() - started) * 1000.0, 3),
+        "format": fmt,
+        "content": content,
+    }
+    with _store_lock:
+        _store[slot.id] = entry
+        while len(_store) > MAX_PROFILES:
+            _store.popitem(last=False)
+    slot.captured = True
+
+
+class _Profiler:
+    """pyinstrument when installed (HTML flame view), cProfile text otherwise."""
+
+    def __init__(self) -> None:
+        try:
+            from pyinstrument import Profiler  # type: ignore
+
+            self._impl: Any = Profiler(interval=0.001)
+            self.format = "html"
+        except ImportError:
+            import cProfile
+
+            self._impl = cProfile.Profile()
+            self.format = "text"
+
+    def start(self) -> None:
+        if self.format == "html":
+            self._impl.start()
+        else:
+            self._impl.enable()
+
+    def stop(self) -> str:
+        if self.format == "html":
+            self._impl.stop()
+            return self._impl.output_html()
+
+        import pstats
+
+        self._impl.disable()
+        out = io.StringIO()
+        pstats.Stats(self._impl, stream=out).sort_stats("cumulative").print_stats(60)
+        return out.getvalue()
+
+
+_profiler_busy = threading.Lock()
+
+
+def _begin() -> Optional[_Profiler]:
+    # One profile at a time: bounds overhead, and cProfile cannot run concurrently on 3.12+.
+    if _active_slot.get() is None or not _profiler_busy.acquire(blocking=False):
+        return None
+    profiler = _Profiler()
+    profiler.start()
+    return profiler
+
+
+def _finish(profiler: _Profiler, started: float) -> None:
+    try:
+        slot = _active_slot.get()
+        content = profiler.stop()
+        if slot is not None:
+            _save(slot, started, profiler.format, content)
+    finally:
+        _profiler_busy.release()
+
+
+def _with_resolved_signature(wrapper: Callable[..., Any], func: Callable[..., Any]) -> Callable[..., Any]:
+    # The wrapper's globals are this module's, so FastAPI cannot resolve the endpoint's
+    # string annotations (`from __future__ import annotations`) through it; hand it
+    # the signature with annotations already evaluated in the endpoint's module.
+    wrapper.__signature__ = inspect.signature(func, eval_str=True)  # type: ignore[attr-defined]
+    return wrapper
+
+
+def profiled(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Profile an endpoint in the thread that actually runs it.
+
+    Sync FastAPI endpoints execute in the threadpool, out of reach of a profiler
+    started in middleware, so the middleware only marks the request and this
+    wrapper does the work. Unmarked requests pay one ContextVar lookup.
+    """
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            profiler = _begin()
+            if profiler is None:
+                return await func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _finish(profiler, started)
+
+        return _with_resolved_signature(async_wrapper, func)
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        profiler = _begin()
+        if profiler is None:
+            return func(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _finish(profiler, started)
+
+    return _with_resolved_signature(wrapper, func)
+
+
+class ProfilingMiddleware:
+    """Marks requests for profiling by sampling rate or the `X-Profile: 1` header."""
+
+    def __init__(self, app: Any, admin_token: Optional[str] = None) -> None:
+        self.app = app
+        self.admin_token = admin_token
+
+    def _wants_profile(self, scope: Dict[str, Any]) -> bool:
+        if SAMPLE_RATE > 0 and random.random() < SAMPLE_RATE:
+            return True
+        if not ALLOW_HEADER:
+            return False
+        headers = dict(scope.get("headers") or [])
+        if headers.get(PROFILE_HEADER.encode(), b"").strip() not in {b"1", b"true"}:
+            return False
+        # The header is honored only with a configured, matching admin token.
+        if not self.admin_token:
+            return False
+        return secrets.compare_digest(headers.get(b"x-admin-token", b"").decode(errors="replace"), self.admin_token)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not self._wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        slot = _Slot(scope.get("method", ""), scope.get("path", ""))
+        token = _active_slot.set(slot)
+
+        async def send_with_id(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start" and slot.captured:
+                headers = list(message.get("headers", []))
+                message["headers"] = headers + [(PROFILE_ID_HEADER.encode(), slot.id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _active_slot.reset(token)
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    with _store_lock:
+        return [{k: v for k, v in p.items() if k != "content"} for p in reversed(_store.values())]
+
+
+def get_profile(profile_id: str) -> Optional[Dict[str, Any]]:
+    with _store_lock:
+        return _store.get(profile_id)
@@ -0,0 +1,497 @@
+"""Offline replay of historical tickets through triage and duplicate detection.
+
+Shows how a rulebook or prompt change would shift decisions before it ships:
+
+    python -m replay --rulebook rulebook.candidate.yml --out replay.json
+    python -m replay --input tickets.ndjson --llm recorded --recorded llm_answers.jsonl
+
+Tickets stream from the database (oldest first) or from an NDJSON file in the
+`GET /tickets/export` shape. `triage_ticket` and the embeddings run in a pool
+of worker processes; duplicate detection then runs sequentially in this
+process over in-memory incident clusters built with the same centroid math as
+`clustering.py`, so replayed duplicates depend only on replay order. The LLM
+is never called: `--llm historical` answers with each ticket's stored result,
+`fake` with a fixed answer and `recorded` from a JSONL file of
+{"key": response_key(title, description), "response": ...} lines.
+
+`/tickets/export` is newest first; reverse it (e.g. `tac`) so duplicates are
+detected in the order the tickets arrived.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import random
+import time
+from array import array
+from collections import Counter, defaultdict, deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+import numpy as np
+
+from clustering import merge_centroid
+
+FAKE_LLM_RESPONSE = {
+    "severity": "P3",
+    "confidence": 0.7,
+    "reasoning": "Replay stand-in response.",
+    "suggested_fixes": [
+        "Check application logs for errors.",
+        "Confirm scope of impact.",
+        "Roll back recent changes if needed.",
+    ],
+}
+
+_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "severity",
+    "assigned_team",
+    "is_duplicate",
+    "duplicate_ticket_id",
+    "triage_source",
+    "confidence",
+    "ai_reasoning",
+    "suggested_fixes",
+    "source",
+    "alert_metadata",
+)
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / (np.linalg.norm(vector) + 1e-12)
+
+
+def response_key(title: str, description: str) -> str:
+    """Key of a recorded LLM answer for this ticket text."""
+    return hashlib.sha256(f"{title}\n{description}".encode("utf-8")).hexdigest()[:32]
+
+
+# ==============================
+# INPUT
+# ==============================
+
+def iter_db_tickets(include_archived: bool = False, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    from sqlalchemy import select, union_all
+
+    from database import SessionLocal
+    from models import ArchivedTicket, Ticket
+
+    stmt: Any = select(*(getattr(Ticket, f) for f in _FIELDS), Ticket.created_at)
+    if include_archived:
+        archived = select(*(getattr(ArchivedTicket, f) for f in _FIELDS), ArchivedTicket.created_at)
+        both = union_all(stmt, archived).subquery()
+        stmt = select(*both.c).order_by(both.c.created_at.asc(), both.c.id.asc())
+    else:
+        stmt = stmt.order_by(Ticket.created_at.asc(), Ticket.id.asc())
+    if limit is not None:
+        stmt = stmt.limit(limit)
+
+    db = SessionLocal()
+    try:
+        for row in db.execute(stmt.execution_options(yield_per=2000)):
+            yield dict(row._mapping)
+    finally:
+        db.close()
+
+
+def iter_ndjson_tickets(path: Path, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    with path.open("r", encoding="utf-8") as f:
+        count = 0
+        for line in f:
+            if not line.strip():
+                continue
+            if limit is not None and count >= limit:
+                return
+            record = json.loads(line)
+            ticket = {field: record.get(field) for field in _FIELDS}
+            # The export names the alert metadata column `metadata`.
+            ticket["alert_metadata"] = record.get("metadata", ticket["alert_metadata"])
+            yield ticket
+            count += 1
+
+
+def _chunks(tickets: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk: List[Dict[str, Any]] = []
+    for t in tickets:
+        chunk.append(t)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ==============================
+# WORKER PROCESSES
+# ==============================
+
+_current: Dict[str, Any] = {}
+_embeddings = True
+
+
+def _historical_answer(title: str, description: str, prompt: str) -> str:
+    return json.dumps(
+        {
+            "severity": _current.get("severity") or "P3",
+            "confidence": _current.get("confidence") or 0.6,
+            "reasoning": _current.get("ai_reasoning") or "Historical triage result.",
+            "suggested_fixes": _current.get("suggested_fixes") or [],
+        }
+    )
+
+
+def _fake_answer(title: str, description: str, prompt: str) -> str:
+    return json.dumps(FAKE_LLM_RESPONSE)
+
+
+def _load_recorded(path: str) -> Dict[str, str]:
+    answers: Dict[str, str] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                response = record["response"]
+                answers[record["key"]] = response if isinstance(response, str) else json.dumps(response)
+    return answers
+
+
+def _init_worker(llm: str, recorded: Optional[str], rulebook: Optional[str], embeddings: bool) -> None:
+    global _embeddings
+    # One process per core already; keep numeric libraries from oversubscribing it.
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+    os.environ.setdefault("EMBEDDING_PROVIDER", "local")
+    if rulebook:
+        os.environ["RULEBOOK_PATH"] = rulebook
+    random.seed(0)  # LLM shadow sampling
+    _embeddings = embeddings
+
+    from ai_engine import set_llm_responder
+
+    if llm == "recorded":
+        answers = _load_recorded(recorded or "")
+        # A missing answer raises inside triage, which falls back to the rulebook (rulebook_fallback).
+        set_llm_responder(lambda title, description, prompt: answers[response_key(title, description)])
+    elif llm == "fake":
+        set_llm_responder(_fake_answer)
+    else:
+        set_llm_responder(_historical_answer)
+
+
+def _replay_chunk(chunk: List[Dict[str, Any]]) -> Tuple[List[Tuple[Any, ...]], Optional[np.ndarray], Dict[str, List[float]]]:
+    """Triage (and embed) one chunk. Returns (severity, team, triage_source) per ticket,
+    the embeddings and per-stage timings in ms."""
+    from ai_engine import apply_p1_override, forces_p1, triage_ticket
+    from telemetry import start_request_timings
+
+    results: List[Tuple[Any, ...]] = []
+    timings: Dict[str, List[float]] = defaultdict(list)
+    for t in chunk:
+        _current.clear()
+        _current.update(t)
+        stages = start_request_timings()
+        started = time.perf_counter()
+        result = triage_ticket(t["title"] or "", t["description"] or "")
+        # As at intake (`pipeline.process_ticket`): critical Datadog alerts stay P1.
+        if forces_p1(t.get("source"), t.get("alert_metadata")):
+            result = apply_p1_override(result)
+        timings["triage"].append((time.perf_counter() - started) * 1000.0)
+        for name, ms in stages.items():
+            timings[name].append(ms)
+        results.append((result["severity"], result["assigned_team"], result["triage_source"]))
+
+    vectors = None
+    if _embeddings:
+        from similarity import embed_documents
+
+        started = time.perf_counter()
+        vectors = embed_documents([f"{t['title'] or ''}\n{t['description'] or ''}".strip() for t in chunk])
+        timings["embedding_batch"].append((time.perf_counter() - started) * 1000.0)
+    return results, vectors, dict(timings)
+
+
+# ==============================
+# DUPLICATE DETECTION
+# ==============================
+
+class _Clusters:
+    """Growable in-memory incident clusters: unit centroids, sizes and representative ticket ids.
+
+    Each chunk is scored against the centroids as they were at its start in one
+    matrix product; clusters created or merged within the chunk are re-scored
+    per ticket, so the result equals scanning every cluster ticket by ticket.
+    """
+
+    def __init__(self, threshold: float) -> None:
+        self.threshold = threshold
+        self.count = 0
+        self._centroids: Optional[np.ndarray] = None
+        self._sizes = np.zeros(0, dtype=np.int64)
+        self._reps = np.zeros(0, dtype=np.int64)
+
+    def _append(self, vector: np.ndarray, ticket_id: int) -> None:
+        if self._centroids is None:
+            self._centroids = np.zeros((1024, vector.shape[0]), dtype=np.float32)
+            self._sizes = np.zeros(1024, dtype=np.int64)
+            self._reps = np.zeros(1024, dtype=np.int64)
+        elif self.count == len(self._sizes):
+            grow = len(self._sizes)
+            self._centroids = np.vstack([self._centroids, np.zeros_like(self._centroids[:grow])])
+            self._sizes = np.concatenate([self._sizes, np.zeros(grow, dtype=np.int64)])
+            self._reps = np.concatenate([self._reps, np.zeros(grow, dtype=np.int64)])
+        self._centroids[self.count] = _unit(vector)
+        self._sizes[self.count] = 1
+        self._reps[self.count] = ticket_id
+        self.count += 1
+
+    def assign(self, ids: List[int], vectors: np.ndarray) -> List[Tuple[bool, Optional[int], float]]:
+        """(is_duplicate, duplicate_ticket_id, similarity) per ticket, updating the clusters."""
+        start_count = self.count
+        sims = None
+        if start_count:
+            unit = vectors / (np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12)
+            sims = unit.astype(np.float32) @ self._centroids[:start_count].T
+
+        touched: List[int] = []
+        touched_set = set()
+        out: List[Tuple[bool, Optional[int], float]] = []
+        for i, (ticket_id, vector) in enumerate(zip(ids, vectors)):
+            best_idx, best_score = -1, 0.0
+            if sims is not None:
+                row = sims[i]
+                if touched:
+                    row = row.copy()
+                    row[touched] = -np.inf
+                best_idx = int(np.argmax(row))
+                best_score = float(row[best_idx])
+            fresh = touched + list(range(start_count, self.count))
+            if fresh:
+                fresh_sims = self._centroids[fresh] @ _unit(vector)
+                j = int(np.argmax(fresh_sims))
+                if fresh_sims[j] > best_score or best_idx < 0:
+                    best_idx, best_score = fresh[j], float(fresh_sims[j])
+
+            if best_idx >= 0 and best_score >= self.threshold:
+                size = int(self._sizes[best_idx])
+                self._centroids[best_idx] = merge_centroid(self._centroids[best_idx], size, vector)
+                self._sizes[best_idx] = size + 1
+                if best_idx < start_count and best_idx not in touched_set:
+                    touched.append(best_idx)
+                    touched_set.add(best_idx)
+                out.append((True, int(self._reps[best_idx]), best_score))
+            else:
+                self._append(vector, ticket_id)
+                out.append((False, None, max(best_score, 0.0)))
+        return out
+
+
+# ==============================
+# REPORT
+# ==============================
+
+def _stage_stats(samples: "array[float]") -> Dict[str, Any]:
+    values = np.frombuffer(samples, dtype=np.float64) if len(samples) else np.zeros(0)
+    if not values.size:
+        return {"count": 0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "count": int(values.size),
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+    }
+
+
+class _Diff:
+    def __init__(self, samples: int, changes_out: Optional[TextIO]) -> None:
+        self.total = 0
+        self.severity = Counter()
+        self.team = Counter()
+        self.source_before = Counter()
+        self.source_after = Counter()
+        self.duplicates = Counter()
+        self.changed = 0
+        self.samples: List[Dict[str, Any]] = []
+        self.max_samples = samples
+        self.changes_out = changes_out
+
+    def add(self, ticket: Dict[str, Any], after: Tuple[Any, ...], dup: Optional[Tuple[bool, Optional[int], float]]) -> None:
+        severity, team, source = after
+        self.total += 1
+        self.source_before[ticket.get("triage_source") or "unknown"] += 1
+        self.source_after[source] += 1
+
+        change: Dict[str, Any] = {}
+        if severity != ticket.get("severity"):
+            self.severity[f"{ticket.get('severity')}->{severity}"] += 1
+            change["severity"] = [ticket.get("severity"), severity]
+        if team != ticket.get("assigned_team"):
+            self.team[f"{ticket.get('assigned_team')}->{team}"] += 1
+            change["assigned_team"] = [ticket.get("assigned_team"), team]
+        if dup is not None:
+            was, is_dup = bool(ticket.get("is_duplicate")), dup[0]
+            if is_dup and not was:
+                self.duplicates["became_duplicate"] += 1
+            elif was and not is_dup:
+                self.duplicates["no_longer_duplicate"] += 1
+            elif was and is_dup and dup[1] != ticket.get("duplicate_ticket_id"):
+                self.duplicates["different_original"] += 1
+            if is_dup != was or (is_dup and dup[1] != ticket.get("duplicate_ticket_id")):
+                change["duplicate_ticket_id"] = [ticket.get("duplicate_ticket_id"), dup[1]]
+
+        if change:
+            self.changed += 1
+            record = {"id": ticket.get("id"), "title": ticket.get("title"), **change, "triage_source": source}
+            if len(self.samples) < self.max_samples:
+                self.samples.append(record)
+            if self.changes_out is not None:
+                self.changes_out.write(json.dumps(record) + "\n")
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "tickets": self.total,
+            "changed": self.changed,
+            "severity_changed": sum(self.severity.values()),
+            "team_changed": sum(self.team.values()),
+            "severity_transitions": dict(self.severity.most_common()),
+            "team_transitions": dict(self.team.most_common()),
+            "duplicates": dict(self.duplicates),
+            "triage_source_before": dict(self.source_before.most_common()),
+            "triage_source_after": dict(self.source_after.most_common()),
+        }
+
+
+# ==============================
+# DRIVER
+# ==============================
+
+def replay(
+    tickets: Iterable[Dict[str, Any]],
+    processes: int,
+    chunk_size: int = 500,
+    llm: str = "historical",
+    recorded: Optional[str] = None,
+    rulebook: Optional[str] = None,
+    duplicates: bool = True,
+    threshold: float = 0.85,
+    samples: int = 20,
+    changes_out: Optional[TextIO] = None,
+) -> Dict[str, Any]:
+    diff = _Diff(samples, changes_out)
+    clusters = _Clusters(threshold) if duplicates else None
+    timings: Dict[str, "array[float]"] = defaultdict(lambda: array("d"))
+
+    def consume(chunk: List[Dict[str, Any]], done: Tuple[Any, ...]) -> None:
+        results, vectors, chunk_timings = done
+        for name, values in chunk_timings.items():
+            timings[name].extend(values)
+        dups: List[Any] = [None] * len(chunk)
+        if clusters is not None and vectors is not None:
+            started = time.perf_counter()
+            dups = clusters.assign([int(t["id"]) for t in chunk], vectors)
+            timings["vector_search_batch"].append((time.perf_counter() - started) * 1000.0)
+        for ticket, after, dup in zip(chunk, results, dups):
+            diff.add(ticket, after, dup)
+
+    started = time.perf_counter()
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(processes, initializer=_init_worker, initargs=(llm, recorded, rulebook, duplicates)) as pool:
+        # Bounded window of chunks in flight: streams any history size in constant memory.
+        pending: Deque[Tuple[List[Dict[str, Any]], Any]] = deque()
+        for chunk in _chunks(tickets, chunk_size):
+            pending.append((chunk, pool.apply_async(_replay_chunk, (chunk,))))
+            if len(pending) >= processes * 2:
+                head, result = pending.popleft()
+                consume(head, result.get())
+        while pending:
+            head, result = pending.popleft()
+            consume(head, result.get())
+    elapsed = time.perf_counter() - started
+
+    return {
+        "config": {
+            "processes": processes,
+            "chunk_size": chunk_size,
+            "llm": llm,
+            "rulebook": rulebook or "rulebook.yml",
+            "duplicates": duplicates,
+            "threshold": threshold,
+        },
+        "elapsed_seconds": round(elapsed, 2),
+        "throughput_tps": round(diff.total / elapsed, 1) if elapsed else None,
+        "clusters": clusters.count if clusters is not None else None,
+        "changes": diff.summary(),
+        "stages": {name: _stage_stats(values) for name, values in sorted(timings.items())},
+        "samples": diff.samples,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", type=Path, help="NDJSON file; default: the database at DATABASE_URL")
+    parser.add_argument("--include-archived", action="store_true", help="also replay tickets_archive (database input)")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--llm", choices=["historical", "fake", "recorded"], default="historical")
+    parser.add_argument("--recorded", help="JSONL of recorded LLM answers (--llm recorded)")
+    parser.add_argument("--rulebook", help="candidate rulebook to replay instead of rulebook.yml")
+    parser.add_argument("--skip-duplicates", action="store_true", help="triage only: no embeddings or clustering")
+    parser.add_argument("--threshold", type=float, default=0.85)
+    parser.add_argument("--samples", type=int, default=20, help="changed tickets to include in the report")
+    parser.add_argument("--changes", type=Path, help="write every changed ticket to this NDJSON file")
+    parser.add_argument("--out", type=Path)
+    args = parser.parse_args(argv)
+
+    if args.llm == "recorded" and not args.recorded:
+        parser.error("--llm recorded needs --recorded PATH")
+    rulebook = str(Path(args.rulebook).resolve()) if args.rulebook else None
+
+    if args.input:
+        tickets: Iterable[Dict[str, Any]] = iter_ndjson_tickets(args.input, args.limit)
+    else:
+        tickets = iter_db_tickets(args.include_archived, args.limit)
+
+    changes_out = args.changes.open("w", encoding="utf-8") if args.changes else None
+    try:
+        report = replay(
+            tickets,
+            processes=max(1, args.processes),
+            chunk_size=args.chunk_size,
+            llm=args.llm,
+            recorded=args.recorded,
+            rulebook=rulebook,
+            duplicates=not args.skip_duplicates,
+            threshold=args.threshold,
+            samples=args.samples,
+            changes_out=changes_out,
+        )
+    finally:
+        if changes_out is not None:
+            changes_out.close()
+
+    changes = report["changes"]
+    print(
+        f"replayed {changes['tickets']} tickets in {report['elapsed_seconds']}s "
+        f"({report['throughput_tps']} tickets/s): {changes['changed']} changed, "
+        f"severity {changes['severity_changed']}, team {changes['team_changed']}, duplicates {changes['duplicates']}",
+        flush=True,
+    )
+    for name, stats in report["stages"].items():
+        if stats["count"]:
+            print(f"  {name:<20} n={stats['count']} mean={stats['mean_ms']}ms p95={stats['p95_ms']}ms")
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -31,12 +31,16 @@ class TicketOut(BaseModel):
     is_duplicate: bool
     duplicate_ticket_id: Optional[int] = None
     similarity_score: float
+    incident_cluster_id: Optional[int] = None
 
     escalated: bool
     jira_issue_key: Optional[str] = None
     lifecycle_status: str
     created_at: datetime
 
+    triage_source: Optional[str] = None
+    provisional_result: Optional[Any] = None
+
     ai_reasoning: Optional[str] = None
     decision_trace: Optional[Any] = None
 
@@ -53,6 +57,88 @@ class DashboardMetrics(BaseModel):
     estimated_engineer_hours_saved: float
     by_severity: list[dict]
     by_team: list[dict]
+    # Resume `/events/stream?since=` from here; skip events with `version <= snapshot_version`.
+    snapshot_event_id: int = 0
+    snapshot_version: int = 0
+
+
+class TicketSearchHit(BaseModel):
+    id: int
+    title: str
+    severity: str
+    assigned_team: str
+    source: str
+    lifecycle_status: str
+    is_duplicate: bool
+    incident_cluster_id: Optional[int] = None
+    created_at: datetime
+    score: float
+    # HTML-escaped text with matches wrapped in <mark>...</mark> (keyword mode only).
+    title_highlight: str
+    snippet: str
+
+
+class TicketSearchResults(BaseModel):
+    query: str
+    mode: str
+    total: int
+    limit: int
+    offset: int
+    results: list[TicketSearchHit]
+
+
+class IncidentClusterOut(BaseModel):
+    id: int
+    title: str
+    representative_ticket_id: Optional[int] = None
+    size: int
+    first_seen_at: datetime
+    last_seen_at: datetime
+
+
+class ProfileSummary(BaseModel):
+    id: str
+    method: str
+    path: str
+    created_at: datetime
+    duration_ms: float
+    format: str
+
+
+class RefinementReport(BaseModel):
+    refined_tickets: int
+    pending_refinements: int
+    llm_unavailable: int
+    severity_changed: int
+    severity_change_rate: float
+    transitions: dict[str, int]
+    escalated_after_refinement: int
+
+
+class LlmGatingReport(BaseModel):
+    threshold: float
+    eligible_tickets: int
+    llm_skipped: int
+    skip_rate: float
+    shadow_sampled: int
+    shadow_agreement_rate: Optional[float] = None
+    shadow_disagreements: dict[str, int]
+
+
+class AdmissionLaneStats(BaseModel):
+    in_flight: int
+    waiting: int
+    concurrency: int
+    max_waiting: Optional[int] = None
+    degrade_at: Optional[int] = None
+    shed: int
+    degraded: int
+
+
+class AdmissionStats(BaseModel):
+    high: AdmissionLaneStats
+    normal: AdmissionLaneStats
+    rate_limited: int
 
 
 class SeedResponse(BaseModel):
@@ -61,3 +147,28 @@ class SeedResponse(BaseModel):
 
 class TicketStatusUpdate(BaseModel):
     lifecycle_status: str = Field(..., min_length=3, max_length=20)
+
+
+class TicketFilter(BaseModel):
+    severity: Optional[str] = None
+    assigned_team: Optional[str] = None
+    source: Optional[str] = None
+    lifecycle_status: Optional[str] = None
+    is_duplicate: Optional[bool] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+
+class BulkStatusUpdate(BaseModel):
+    lifecycle_status: str = Field(..., min_length=3, max_length=20)
+    ids: Optional[list[int]] = Field(None, max_length=10_000)
+    filter: Optional[TicketFilter] = None
+    # Also move every ticket that is (transitively) a duplicate of a selected one.
+    cascade_duplicates: bool = False
+
+
+class BulkStatusResult(BaseModel):
+    lifecycle_status: str
+    matched: int
+    cascaded: int
+    updated: int
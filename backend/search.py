@@ -0,0 +1,371 @@
+"""Ticket search: full-text (SQLite FTS5 / Postgres tsvector) and semantic (incident cluster embeddings)."""
+
+from __future__ import annotations
+
+import html
+import logging
+import re
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Type
+
+import numpy as np
+from sqlalchemy import bindparam, column, func, literal, literal_column, select, table, text, union_all
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from clustering import rank_clusters
+from models import ArchivedTicket, Ticket, TicketColumns
+from settings import env_int
+
+logger = logging.getLogger(__name__)
+
+# Highlight markers are control characters so the surrounding text can be HTML-escaped safely.
+_MARK_START = "\x02"
+_MARK_END = "\x03"
+_SNIPPET_TOKENS = 24
+
+# Full-text index per ticket table: archived tickets stay searchable with `include_archived`.
+_FTS_TABLES = {Ticket: "tickets_fts", ArchivedTicket: "tickets_archive_fts"}
+
+_HIT_FIELDS = (
+    "id",
+    "title",
+    "severity",
+    "assigned_team",
+    "source",
+    "lifecycle_status",
+    "is_duplicate",
+    "incident_cluster_id",
+    "created_at",
+)
+
+
+def _hit_columns(model: Type[TicketColumns] = Ticket) -> Tuple[Any, ...]:
+    return tuple(getattr(model, name) for name in _HIT_FIELDS)
+
+
+def _models(include_archived: bool) -> List[Type[TicketColumns]]:
+    return [Ticket, ArchivedTicket] if include_archived else [Ticket]
+
+
+class SearchFilters(NamedTuple):
+    severity: Optional[str] = None
+    assigned_team: Optional[str] = None
+    source: Optional[str] = None
+    lifecycle_status: Optional[str] = None
+    is_duplicate: Optional[bool] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+
+class SearchPage(NamedTuple):
+    total: int
+    hits: List[Dict[str, Any]]
+
+
+class SearchUnavailable(Exception):
+    pass
+
+
+# ==============================
+# INDEX MAINTENANCE
+# ==============================
+
+_SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+        INSERT INTO {fts}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+        INSERT INTO {fts}({fts}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF title, description ON {table} BEGIN
+        INSERT INTO {fts}({fts}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {fts}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+
+_available = True
+
+
+def ensure_search_index(engine: Engine) -> None:
+    """Create the full-text index (and its sync triggers) if missing; idempotent.
+
+    SQLite: an external-content FTS5 table over each of tickets and tickets_archive
+    (title, description), kept in sync by triggers and rebuilt once when first
+    created. Postgres: a generated, weighted tsvector column with a GIN index on both.
+    """
+    global _available
+    try:
+        with engine.begin() as conn:
+            for model, fts in _FTS_TABLES.items():
+                name = model.__tablename__
+                if engine.dialect.name == "sqlite":
+                    exists = conn.execute(
+                        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": fts}
+                    ).first()
+                    if exists is None:
+                        conn.execute(
+                            text(
+                                f"CREATE VIRTUAL TABLE {fts} USING fts5("
+                                f"title, description, content='{name}', content_rowid='id', "
+                                "tokenize='porter unicode61')"
+                            )
+                        )
+                        # Title matches weigh 4x description matches.
+                        conn.execute(text(f"INSERT INTO {fts}({fts}, rank) VALUES ('rank', 'bm25(4.0, 1.0)')"))
+                        conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+                    for trigger in _SQLITE_TRIGGERS:
+                        conn.execute(text(trigger.format(fts=fts, table=name)))
+                elif engine.dialect.name == "postgresql":
+                    conn.execute(
+                        text(
+                            f"ALTER TABLE {name} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                            "GENERATED ALWAYS AS ("
+                            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+                            "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+                            ") STORED"
+                        )
+                    )
+                    conn.execute(
+                        text(f"CREATE INDEX IF NOT EXISTS ix_{name}_search_vector ON {name} USING GIN (search_vector)")
+                    )
+                else:
+                    _available = False
+    except Exception:
+        logger.exception("Full-text search index unavailable")
+        _available = False
+
+
+# ==============================
+# HELPERS
+# ==============================
+
+def filter_conditions(filters: SearchFilters, model: Type[TicketColumns] = Ticket) -> List[Any]:
+    conds: List[Any] = []
+    if filters.severity:
+        conds.append(model.severity == filters.severity)
+    if filters.assigned_team:
+        conds.append(model.assigned_team == filters.assigned_team)
+    if filters.source:
+        conds.append(model.source == filters.source)
+    if filters.lifecycle_status:
+        conds.append(model.lifecycle_status == filters.lifecycle_status)
+    if filters.is_duplicate is not None:
+        conds.append(model.is_duplicate.is_(filters.is_duplicate))
+    if filters.created_after:
+        conds.append(model.created_at >= filters.created_after)
+    if filters.created_before:
+        conds.append(model.created_at < filters.created_before)
+    return conds
+
+
+def _marked(value: Optional[str]) -> str:
+    escaped = html.escape(value or "")
+    return escaped.replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def _hit(row: Any, score: float) -> Dict[str, Any]:
+    return {
+        "id": row.id,
+        "title": row.title,
+        "severity": row.severity,
+        "assigned_team": row.assigned_team,
+        "source": row.source,
+        "lifecycle_status": row.lifecycle_status,
+        "is_duplicate": row.is_duplicate,
+        "incident_cluster_id": row.incident_cluster_id,
+        "created_at": row.created_at,
+        "score": round(float(score), 4),
+        "title_highlight": html.escape(row.title or ""),
+        "snippet": "",
+    }
+
+
+def _fts5_query(q: str) -> str:
+    # Quote every term so user input can never be parsed as FTS5 syntax; terms are ANDed.
+    return " ".join(f'"{term}"' for term in re.findall(r"\w+", q.lower()))
+
+
+# ==============================
+# KEYWORD SEARCH
+# ==============================
+
+def _keyword_sqlite(
+    db: Session, q: str, filters: SearchFilters, limit: int, offset: int, include_archived: bool
+) -> SearchPage:
+    match_query = _fts5_query(q)
+    if not match_query:
+        return SearchPage(0, [])
+
+    per_table = []
+    for model in _models(include_archived):
+        name = _FTS_TABLES[model]
+        fts = table(name, column("rowid"), column("rank"))
+        per_table.append(
+            select(*_hit_columns(model), fts.c.rank, literal(name).label("fts"))
+            .select_from(fts.join(model, model.id == fts.c.rowid))
+            .where(literal_column(name).op("MATCH")(match_query), *filter_conditions(filters, model))
+        )
+    matched = (per_table[0] if len(per_table) == 1 else union_all(*per_table)).subquery()
+
+    total = int(db.execute(select(func.count()).select_from(matched)).scalar() or 0)
+    rows = db.execute(select(matched).order_by(matched.c.rank).limit(limit).offset(offset)).all()
+    # bm25 ranks are negative (lower is better); expose a positive score.
+    hits = [_hit(r, -float(r.rank)) for r in rows]
+    if not hits:
+        return SearchPage(total, hits)
+
+    # Highlight only the page, not every match.
+    by_id: Dict[int, Any] = {}
+    for name in {r.fts for r in rows}:
+        highlights = db.execute(
+            text(
+                f"SELECT rowid, highlight({name}, 0, :start, :end) AS title_hl, "
+                f"snippet({name}, 1, :start, :end, '…', :tokens) AS snippet "
+                f"FROM {name} WHERE {name} MATCH :q AND rowid IN :ids"
+            ).bindparams(bindparam("ids", expanding=True)),
+            {
+                "start": _MARK_START,
+                "end": _MARK_END,
+                "tokens": _SNIPPET_TOKENS,
+                "q": match_query,
+                "ids": [int(r.id) for r in rows if r.fts == name],
+            },
+        ).all()
+        by_id.update({int(r.rowid): r for r in highlights})
+    for h in hits:
+        r = by_id.get(h["id"])
+        if r is not None:
+            h["title_highlight"] = _marked(r.title_hl)
+            h["snippet"] = _marked(r.snippet)
+    return SearchPage(total, hits)
+
+
+def _keyword_postgres(
+    db: Session, q: str, filters: SearchFilters, limit: int, offset: int, include_archived: bool
+) -> SearchPage:
+    query = func.websearch_to_tsquery("english", q)
+    per_table = []
+    for model in _models(include_archived):
+        vector = literal_column(f"{model.__tablename__}.search_vector")
+        per_table.append(
+            select(*_hit_columns(model), func.ts_rank_cd(vector, query).label("rank")).where(
+                vector.op("@@")(query), *filter_conditions(filters, model)
+            )
+        )
+    matched = (per_table[0] if len(per_table) == 1 else union_all(*per_table)).subquery()
+
+    total = int(db.execute(select(func.count()).select_from(matched)).scalar() or 0)
+    rows = db.execute(
+        select(matched).order_by(matched.c.rank.desc(), matched.c.id.desc()).limit(limit).offset(offset)
+    ).all()
+    hits = [_hit(r, r.rank) for r in rows]
+    if not hits:
+        return SearchPage(total, hits)
+
+    options = f"StartSel={_MARK_START}, StopSel={_MARK_END}, HighlightAll=true"
+    snippet_options = f"StartSel={_MARK_START}, StopSel={_MARK_END}, MaxWords={_SNIPPET_TOKENS}, MinWords=8"
+    ids = [h["id"] for h in hits]
+    by_id: Dict[int, Any] = {}
+    for model in _models(include_archived):
+        highlights = db.execute(
+            select(
+                model.id,
+                func.ts_headline("english", model.title, query, options).label("title_hl"),
+                func.ts_headline("english", model.description, query, snippet_options).label("snippet"),
+            ).where(model.id.in_(ids))
+        ).all()
+        by_id.update({int(r.id): r for r in highlights})
+    for h in hits:
+        r = by_id.get(h["id"])
+        if r is not None:
+            h["title_highlight"] = _marked(r.title_hl)
+            h["snippet"] = _marked(r.snippet)
+    return SearchPage(total, hits)
+
+
+def keyword_search(
+    db: Session,
+    q: str,
+    filters: SearchFilters,
+    limit: int = 20,
+    offset: int = 0,
+    include_archived: bool = False,
+) -> SearchPage:
+    if not _available:
+        raise SearchUnavailable("Full-text search is not available on this database")
+    if db.get_bind().dialect.name == "postgresql":
+        return _keyword_postgres(db, q, filters, limit, offset, include_archived)
+    return _keyword_sqlite(db, q, filters, limit, offset, include_archived)
+
+
+# ==============================
+# SEMANTIC SEARCH
+# ==============================
+
+def search_by_vector(
+    db: Session,
+    vector: np.ndarray,
+    filters: SearchFilters,
+    limit: int = 20,
+    offset: int = 0,
+    include_archived: bool = False,
+) -> SearchPage:
+    """Rank incident cluster centroids against `vector`, then the member tickets of the best clusters.
+
+    All clusters are ranked: the active window from the database, older ones from
+    the in-process cold index (see `clustering.rank_clusters`). Members are scored
+    by their own stored embedding when present, else by their cluster's centroid
+    similarity.
+    """
+    cluster_scores = dict(rank_clusters(db, vector, env_int("SEARCH_SEMANTIC_TOP_CLUSTERS", 20)))
+    if not cluster_scores:
+        return SearchPage(0, [])
+
+    max_candidates = env_int("SEARCH_SEMANTIC_MAX_CANDIDATES", 2000)
+    rows: List[Any] = []
+    for model in _models(include_archived):
+        rows.extend(
+            db.execute(
+                select(*_hit_columns(model), model.embedding)
+                .where(model.incident_cluster_id.in_(list(cluster_scores)), *filter_conditions(filters, model))
+                .limit(max_candidates - len(rows))
+            ).all()
+        )
+        if len(rows) >= max_candidates:
+            break
+
+    unit = np.asarray(vector, dtype=np.float32)
+    unit = unit / (np.linalg.norm(unit) + 1e-12)
+    scored: List[Tuple[float, Any]] = []
+    for r in rows:
+        if r.embedding:
+            score = float(np.asarray(r.embedding, dtype=np.float32) @ unit)
+        else:
+            score = cluster_scores.get(int(r.incident_cluster_id), 0.0)
+        scored.append((score, r))
+    scored.sort(key=lambda item: (-item[0], -int(item[1].id)))
+
+    return SearchPage(len(scored), [_hit(r, score) for score, r in scored[offset : offset + limit]])
+
+
+def semantic_search(
+    db: Session,
+    q: str,
+    filters: SearchFilters,
+    limit: int = 20,
+    offset: int = 0,
+    include_archived: bool = False,
+) -> SearchPage:
+    from similarity import embed_texts
+
+    vector = embed_texts([q.strip()])[0]
+    return search_by_vector(db, vector, filters, limit, offset, include_archived)
@@ -0,0 +1,111 @@
+"""Fast JSON for list/export endpoints: column tuples straight to orjson, no per-row pydantic models."""
+
+from __future__ import annotations
+
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from fastapi.responses import Response
+from sqlalchemy import Select, select, union_all
+from sqlalchemy.engine import Row
+
+from models import ArchivedTicket, Ticket, TicketColumns
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - orjson is in requirements; keep working without it
+    orjson = None
+
+# Exactly the fields of schemas.TicketOut, selected as columns so large listings
+# never load embeddings, shadow results or lease columns, nor build ORM objects.
+_TICKET_OUT_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "reporter",
+    "department",
+    "source",
+    "alert_metadata",
+    "severity",
+    "confidence",
+    "assigned_team",
+    "suggested_fixes",
+    "is_duplicate",
+    "duplicate_ticket_id",
+    "similarity_score",
+    "incident_cluster_id",
+    "escalated",
+    "jira_issue_key",
+    "lifecycle_status",
+    "created_at",
+    "triage_source",
+    "provisional_result",
+    "ai_reasoning",
+    "decision_trace",
+)
+
+
+def ticket_out_columns(model: Type[TicketColumns] = Ticket) -> Tuple[Any, ...]:
+    """TicketOut columns of the hot table or of the archive."""
+    return tuple(
+        getattr(model, name).label("metadata") if name == "alert_metadata" else getattr(model, name)
+        for name in _TICKET_OUT_FIELDS
+    )
+
+
+TICKET_OUT_COLUMNS = ticket_out_columns(Ticket)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered with orjson (stdlib json fallback).
+
+    Returning a Response from an endpoint bypasses FastAPI's response_model
+    validation, so callers must hand it data already shaped like the model.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def ticket_rows_query(limit: Optional[int] = None, offset: int = 0, include_archived: bool = False) -> Select:
+    if include_archived:
+        both = union_all(select(*TICKET_OUT_COLUMNS), select(*ticket_out_columns(ArchivedTicket))).subquery()
+        stmt = select(*both.c).order_by(both.c.created_at.desc(), both.c.id.desc())
+    else:
+        stmt = select(*TICKET_OUT_COLUMNS).order_by(Ticket.created_at.desc(), Ticket.id.desc())
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    if offset:
+        stmt = stmt.offset(offset)
+    return stmt
+
+
+def row_dicts(rows: Iterable[Row]) -> List[Dict[str, Any]]:
+    return [dict(r._mapping) for r in rows]
+
+
+def ndjson_lines(rows: Iterable[Row], batch: int = 500) -> Iterator[bytes]:
+    """Newline-delimited JSON, yielded in batches to keep write calls (and gzip flushes) coarse."""
+    buf: List[bytes] = []
+    for r in rows:
+        buf.append(dumps(dict(r._mapping)))
+        if len(buf) >= batch:
+            yield b"\n".join(buf) + b"\n"
+            buf = []
+    if buf:
+        yield b"\n".join(buf) + b"\n"
@@ -0,0 +1,41 @@
+"""Typed readers for environment settings.
+
+An unset or empty variable gives the default; so does an unparsable one, with a
+warning, so a typo in a tuning knob cannot keep the API from starting.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from typing import Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+TRUTHY = frozenset({"1", "true", "yes"})
+
+T = TypeVar("T", int, float)
+
+
+def _env_number(name: str, default: T, parse: Callable[[str], T]) -> T:
+    value = os.getenv(name, "").strip()
+    if not value:
+        return default
+    try:
+        return parse(value)
+    except ValueError:
+        logger.warning("Ignoring invalid %s=%r; using %s", name, value, default)
+        return default
+
+
+def env_int(name: str, default: int) -> int:
+    return _env_number(name, default, int)
+
+
+def env_float(name: str, default: float) -> float:
+    return _env_number(name, default, float)
+
+
+def env_bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name, "").strip().lower()
+    return value in TRUTHY if value else default
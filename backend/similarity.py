@@ -2,13 +2,15 @@ from __future__ import annotations
 
 import os
 from functools import lru_cache
-from typing import List, Optional, Tuple
+from typing import List, NamedTuple, Optional
 
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 from sqlalchemy.orm import Session
 
-from models import Ticket
+from clustering import cold_index, find_nearest_cluster
+from models import IncidentCluster
+from telemetry import record_fallback, stage
+from text_prep import embedding_chunks, embedding_excerpt
 
 
 @lru_cache(maxsize=1)
@@ -44,38 +46,104 @@ def _embed_with_gemini(texts: List[str]) -> np.ndarray:
     return arr / norms
 
 
-def embed_texts(texts: List[str]) -> np.ndarray:
+def _use_gemini() -> bool:
     api_key = os.getenv("GEMINI_API_KEY", "").strip()
-    if api_key:
+    return bool(api_key) and os.getenv("EMBEDDING_PROVIDER", "auto").strip().lower() != "local"
+
+
+def embed_texts(texts: List[str]) -> np.ndarray:
+    if _use_gemini():
         try:
             return _embed_with_gemini(texts)
         except Exception:
+            record_fallback("embedding_gemini_error")
             return _embed_with_sentence_transformers(texts)
     return _embed_with_sentence_transformers(texts)
 
 
+def _local_chunk_chars(text: str) -> Optional[int]:
+    """None when the local model reads `text` whole, else its window in characters of this text.
+
+    Counted in the model's own tokens: dense log lines take far more tokens per
+    character than prose, so a fixed character limit either truncates or over-splits.
+    """
+    model = _get_sentence_transformer()
+    window = int(model.max_seq_length)
+    if len(text) <= window - 2:  # a token covers at least one character; 2 special tokens
+        return None
+    # Tokenize a bounded prefix only: past it the text cannot fit anyway.
+    sample = text[: window * 16]
+    tokens = len(model.tokenizer(sample, add_special_tokens=True, truncation=False)["input_ids"])
+    if tokens <= window and len(sample) == len(text):
+        return None
+    return max(1, int(window * len(sample) / tokens * 0.9))
+
+
+def embed_documents(texts: List[str]) -> np.ndarray:
+    """Embed ticket texts of any length.
+
+    Gemini reads about 2K tokens per request and is called once per input, so it
+    gets one salient excerpt per text (`text_prep.embedding_excerpt`). For the
+    local model, text beyond its token window is split into chunks of its salient
+    excerpt (`text_prep.embedding_chunks`) whose vectors are averaged weighted by
+    chunk length and re-normalized, instead of the model silently truncating it.
+    """
+    if _use_gemini():
+        return embed_texts([embedding_excerpt(t) for t in texts])
+
+    chunked: List[List[str]] = []
+    for t in texts:
+        chunk_chars = _local_chunk_chars(t)
+        chunked.append([t] if chunk_chars is None else embedding_chunks(t, chunk_chars))
+    if all(len(c) == 1 for c in chunked):
+        return embed_texts([c[0] for c in chunked])
+
+    vectors = embed_texts([chunk for chunks in chunked for chunk in chunks])
+    pooled = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+    offset = 0
+    for i, chunks in enumerate(chunked):
+        # A one-line tail chunk must not count as much as a full one.
+        weights = np.asarray([len(c) for c in chunks], dtype=np.float32)
+        mean = weights @ vectors[offset : offset + len(chunks)] / weights.sum()
+        pooled[i] = mean / (np.linalg.norm(mean) + 1e-12)
+        offset += len(chunks)
+    return pooled
+
+
+class DuplicateMatch(NamedTuple):
+    is_duplicate: bool
+    duplicate_ticket_id: Optional[int]
+    similarity_score: float
+    cluster: Optional[IncidentCluster]
+    vector: np.ndarray
+
+
 def detect_duplicate(
     db: Session,
     title: str,
     description: str,
     threshold: float = 0.85,
-) -> Tuple[bool, Optional[int], float]:
-    existing: List[Ticket] = db.query(Ticket).order_by(Ticket.created_at.desc()).limit(200).all()
-    if not existing:
-        return False, None, 0.0
+) -> DuplicateMatch:
+    """Match a new ticket against incident cluster centroids.
 
+    Duplicates point at the cluster's representative (first) ticket rather than at
+    the single closest ticket, so repeated reports never form dup-of-a-dup chains.
+    The embedding is returned so the caller can `assign_to_cluster` after insert.
+    """
     candidate_text = f"{title}\n{description}".strip()
-    corpus_texts = [f"{t.title}\n{t.description}".strip() for t in existing]
-
-    embeddings = embed_texts([candidate_text] + corpus_texts)
-    cand_vec = embeddings[:1]
-    corpus_vecs = embeddings[1:]
-
-    sims = cosine_similarity(cand_vec, corpus_vecs)[0]
-    best_idx = int(np.argmax(sims))
-    best_score = float(sims[best_idx])
-    best_ticket = existing[best_idx]
-
-    if best_score >= threshold:
-        return True, int(best_ticket.id), best_score
-    return False, None, best_score
+    with stage("embedding"):
+        vector = embed_documents([candidate_text])[0]
+
+    with stage("vector_search"):
+        cluster, score = find_nearest_cluster(db, vector)
+    if cluster is not None and score >= threshold:
+        return DuplicateMatch(True, cluster.representative_ticket_id, score, cluster, vector)
+
+    # Recurrence of an incident that has left the hot window (possibly archived).
+    with stage("cold_vector_search"):
+        cold_id, cold_score = cold_index.nearest(vector)
+    if cold_id is not None and cold_score >= threshold:
+        cold_cluster = db.get(IncidentCluster, cold_id)
+        if cold_cluster is not None:
+            return DuplicateMatch(True, cold_cluster.representative_ticket_id, cold_score, cold_cluster, vector)
+    return DuplicateMatch(False, None, max(score, cold_score), None, vector)
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from prometheus_client import Counter, Histogram
+
+from settings import env_bool
+
+STAGE_SECONDS = Histogram(
+    "triage_stage_seconds",
+    "Time spent in each stage of the ticket ingestion path.",
+    ["stage"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+TRIAGE_OUTCOMES = Counter(
+    "triage_outcomes_total",
+    "Triage results by triage_source.",
+    ["triage_source"],
+)
+
+TRIAGE_FALLBACKS = Counter(
+    "triage_fallbacks_total",
+    "Times triage fell back from the LLM to the rulebook.",
+    ["reason"],
+)
+
+_stage_timings: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    "stage_timings", default=None
+)
+
+
+def trace_timings_enabled() -> bool:
+    return env_bool("DECISION_TRACE_TIMINGS")
+
+
+def start_request_timings() -> Dict[str, float]:
+    """Begin collecting per-stage timings (in ms) for the current request."""
+    timings: Dict[str, float] = {}
+    _stage_timings.set(timings)
+    return timings
+
+
+def current_timings() -> Optional[Dict[str, float]]:
+    return _stage_timings.get()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.labels(stage=name).observe(elapsed)
+        timings = _stage_timings.get()
+        if timings is not None:
+            timings[name] = round(timings.get(name, 0.0) + elapsed * 1000.0, 3)
+
+
+def record_outcome(triage_source: Optional[str]) -> None:
+    TRIAGE_OUTCOMES.labels(triage_source=triage_source or "unknown").inc()
+
+
+def record_fallback(reason: str) -> None:
+    TRIAGE_FALLBACKS.labels(reason=reason).inc()
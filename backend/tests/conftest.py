@@ -0,0 +1,77 @@
+"""Test setup: a throwaway SQLite database and a deterministic local embedding model.
+
+The environment is set before any backend module is imported, because the
+engine and most settings are read at import time.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+from typing import Iterator, List
+
+import numpy as np
+import pytest
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+_DB_DIR = tempfile.mkdtemp(prefix="triage-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/test.db"
+os.environ["GEMINI_API_KEY"] = ""
+os.environ["EMBEDDING_PROVIDER"] = "local"
+os.environ["TRIAGE_MODE"] = "sync"
+os.environ["CLUSTER_BACKFILL_LIMIT"] = "0"
+
+
+class _Tokenizer:
+    def __call__(self, text: str, **_: object) -> dict:
+        return {"input_ids": [0] + [1] * len(re.findall(r"\w+|[^\w\s]", text)) + [0]}
+
+
+class FakeSentenceTransformer:
+    """Bag-of-words hashing embedder: texts sharing words get similar vectors."""
+
+    max_seq_length = 256
+    tokenizer = _Tokenizer()
+
+    def encode(self, texts: List[str], normalize_embeddings: bool = True) -> np.ndarray:
+        out = np.zeros((len(texts), 64), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in re.findall(r"\w+", text.lower()):
+                out[i, int(hashlib.md5(word.encode()).hexdigest(), 16) % 64] += 1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True) + 1e-12
+        return out / norms
+
+
+@pytest.fixture(autouse=True)
+def fake_embeddings(monkeypatch: pytest.MonkeyPatch) -> None:
+    import similarity
+
+    monkeypatch.setattr(similarity, "_get_sentence_transformer", lambda: FakeSentenceTransformer())
+
+
+@pytest.fixture
+def db() -> Iterator[object]:
+    """A session on freshly emptied tables."""
+    import main  # noqa: F401 - creates tables, runs migrations and the counters
+    from changes import response_cache
+    from clustering import cold_index
+    from database import Base, SessionLocal, engine
+
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            if table.name != "change_counters":
+                conn.execute(table.delete())
+    response_cache.invalidate()
+    cold_index.invalidate()
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import ai_engine
+from pipeline import PROVISIONAL
+from text_prep import SCAN_MAX_CHARS
+
+
+def test_rulebook_triage_consults_gate_only_with_an_llm(monkeypatch) -> None:
+    monkeypatch.setenv("LLM_SKIP_THRESHOLD", "0")  # every gated ticket would skip the LLM
+
+    without = ai_engine.triage_rulebook("VPN down", "vpn tunnel drops", triage_source=PROVISIONAL)
+    assert without["triage_source"] == PROVISIONAL
+    assert without["gate"] is None
+
+    monkeypatch.setattr(ai_engine, "_llm_responder", lambda title, description, prompt: "{}")
+    with_llm = ai_engine.triage_rulebook("VPN down", "vpn tunnel drops", triage_source=PROVISIONAL)
+    assert with_llm["triage_source"] == "rulebook_gated"
+    assert with_llm["gate"]["skip_llm"]
+
+
+def test_routing_keyword_buried_in_a_long_dump_still_routes() -> None:
+    filler = "".join(f"2024-05-01T10:{i % 60:02d}:00 worker-{i} heartbeat ok\n" for i in range(4000))
+    description = filler + "pg pool: postgres deadlock detected on orders table\n" + filler
+    assert len(description) > 2 * SCAN_MAX_CHARS  # the keyword sits in the middle that gets condensed
+
+    match = ai_engine.match_rules("Checkout failing", description, ai_engine.load_rulebook())
+    assert match.team == "Database Team"
+    assert "deadlock" in match.routing_hits["Database Team"]
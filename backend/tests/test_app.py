@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+
+def test_main_imports_and_profiled_routes_resolve_annotations(db) -> None:
+    import main
+
+    with TestClient(main.app) as client:
+        assert client.get("/dashboard/metrics").status_code == 200
+        created = client.post("/tickets", json={"title": "VPN down", "description": "cannot connect to vpn"})
+        assert created.status_code == 200, created.text
+        assert client.get("/tickets").status_code == 200
+
+
+def test_admin_profiles_closed_without_token() -> None:
+    import main
+
+    with TestClient(main.app) as client:
+        assert client.get("/admin/profiles").status_code == 403
+
+
+def test_anonymous_reporters_rate_limited_by_client_address(db, monkeypatch) -> None:
+    import main
+    from admission import _TokenBuckets
+
+    buckets = _TokenBuckets(rate=0.001, burst=1)
+    monkeypatch.setattr(main.admission, "buckets", buckets)
+    ticket = {"title": "Printer jam", "description": "printer on floor 2 jams"}
+
+    with TestClient(main.app) as client:
+        assert client.post("/tickets", json=ticket).status_code == 200
+        assert client.post("/tickets", json={**ticket, "reporter": "alice"}).status_code == 200
+        assert client.post("/tickets", json=ticket).status_code == 429
+    assert set(buckets._buckets) == {"manual-ip:testclient", "manual:alice"}
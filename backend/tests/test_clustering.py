@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from clustering import backfill_clusters
+from models import Ticket
+
+
+def test_backfill_marks_near_identical_tickets_as_duplicates(db) -> None:
+    now = datetime.utcnow()
+    first = Ticket(
+        title="VPN down in Berlin office",
+        description="Users cannot connect to the VPN gateway since 9am",
+        reporter="a",
+        department="IT",
+        created_at=now - timedelta(minutes=5),
+    )
+    second = Ticket(
+        title="VPN down in Berlin office",
+        description="Users cannot connect to the VPN gateway since 9am today",
+        reporter="b",
+        department="IT",
+        created_at=now,
+    )
+    db.add_all([first, second])
+    db.commit()
+
+    assert backfill_clusters(db) == 2
+
+    db.refresh(first)
+    db.refresh(second)
+    assert first.incident_cluster_id == second.incident_cluster_id
+    assert not first.is_duplicate
+    assert second.is_duplicate
+    assert second.duplicate_ticket_id == first.id
+    assert second.similarity_score >= 0.85
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from events import TICKET_CREATED, bus
+
+
+def test_snapshot_version_orders_ticket_events(db) -> None:
+    import main
+
+    with TestClient(main.app) as client:
+        before = client.get("/dashboard/metrics").json()
+        client.post("/tickets", json={"title": "Printer jam", "description": "Printer on floor 2 jams"})
+        after = client.get("/dashboard/metrics").json()
+
+    seen = bus.replay_since(before["snapshot_event_id"]) or []
+    created = [e["data"] for e in seen if e["type"] == TICKET_CREATED]
+    assert created, seen
+    version = created[-1]["version"]
+    # Not yet in the first snapshot, already in the second: applied once either way.
+    assert before["snapshot_version"] < version <= after["snapshot_version"]
+    assert after["total_tickets"] == before["total_tickets"] + 1
+    assert after["snapshot_event_id"] >= before["snapshot_event_id"]
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pipeline
+from models import Ticket
+
+
+def _refining(db, title: str, lease_expires_at: datetime) -> Ticket:
+    ticket = Ticket(
+        title=title,
+        description=title,
+        reporter="ops",
+        department="IT",
+        lifecycle_status="TRIAGED",
+        triage_source=pipeline.REFINING,
+        lease_owner="refine:other",
+        lease_expires_at=lease_expires_at,
+    )
+    db.add(ticket)
+    db.commit()
+    return ticket
+
+
+def test_resume_leaves_live_refinements_alone(db, monkeypatch) -> None:
+    queued = []
+    monkeypatch.setattr(pipeline._background, "submit", lambda fn, ticket_id: queued.append(ticket_id))
+
+    now = datetime.utcnow()
+    live = _refining(db, "Refining elsewhere", now + timedelta(minutes=5))
+    orphaned = _refining(db, "Refiner died", now - timedelta(seconds=1))
+
+    assert pipeline.resume_pending_refinements() == 1
+    assert queued == [orphaned.id]
+
+    # The live lease also keeps a second refiner from claiming the ticket.
+    assert not pipeline._claim_refinement(db, live.id, "refine:me")
+    assert pipeline._claim_refinement(db, orphaned.id, "refine:me")
+    db.refresh(orphaned)
+    assert orphaned.lease_owner == "refine:me"
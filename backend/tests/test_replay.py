@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import replay
+
+
+def test_replay_keeps_the_datadog_p1_override(monkeypatch) -> None:
+    monkeypatch.setattr(replay, "_embeddings", False)
+    alert = {
+        "id": 1,
+        "title": "Disk usage high on web-3",
+        "description": "disk usage above 80%",
+        "severity": "P1",
+        "source": "datadog",
+        "alert_metadata": {"force_p1": True},
+    }
+    plain = {**alert, "id": 2, "source": "manual", "alert_metadata": None}
+
+    results, _, _ = replay._replay_chunk([alert, plain])
+    assert results[0][0] == "P1"
+    assert results[1][0] != "P1"
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from archival import archive_batch
+from models import Ticket
+from search import SearchFilters, keyword_search
+
+
+def test_archived_tickets_searchable_with_include_archived(db) -> None:
+    import main
+
+    old = datetime.utcnow() - timedelta(days=60)
+    db.add_all(
+        [
+            Ticket(
+                title="Printer jam",
+                description="printer on floor 2 jams",
+                reporter="ops",
+                department="IT",
+                lifecycle_status="RESOLVED",
+                created_at=old,
+            ),
+            Ticket(title="VPN down", description="vpn tunnel drops", reporter="ops", department="IT"),
+        ]
+    )
+    db.commit()
+    assert archive_batch(db, datetime.utcnow() - timedelta(days=30), 100) == 1
+
+    assert keyword_search(db, "printer", SearchFilters()).total == 0
+    page = keyword_search(db, "printer", SearchFilters(), include_archived=True)
+    assert page.total == 1
+    assert page.hits[0]["lifecycle_status"] == "RESOLVED"
+    assert "<mark>" in page.hits[0]["title_highlight"]
+    assert keyword_search(db, "vpn", SearchFilters(), include_archived=True).total == 1
+
+    with TestClient(main.app) as client:
+        hot = client.get("/tickets/search", params={"q": "printer"}).json()
+        both = client.get("/tickets/search", params={"q": "printer", "include_archived": True}).json()
+    assert hot["total"] == 0
+    assert [hit["title"] for hit in both["results"]] == ["Printer jam"]
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from settings import env_float, env_int
+
+
+def test_invalid_numbers_fall_back_to_the_default(monkeypatch) -> None:
+    monkeypatch.setenv("TRIAGE_WORKERS", "abc")
+    monkeypatch.setenv("LLM_SKIP_THRESHOLD", "0,8")
+    monkeypatch.setenv("ARCHIVE_BATCH_SIZE", " 250 ")
+    assert env_int("TRIAGE_WORKERS", 2) == 2
+    assert env_float("LLM_SKIP_THRESHOLD", 0.8) == 0.8
+    assert env_int("ARCHIVE_BATCH_SIZE", 1000) == 250
+
+
+def test_startup_survives_invalid_settings(monkeypatch) -> None:
+    import main
+
+    monkeypatch.setenv("TRIAGE_WORKERS", "abc")
+    monkeypatch.setenv("ARCHIVE_AFTER_DAYS", "thirty")
+    with TestClient(main.app) as client:
+        assert client.get("/admission/stats").status_code == 200
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from models import Ticket
+
+
+def _received(db, title: str, description: str) -> Ticket:
+    from pipeline import receive_ticket
+
+    return receive_ticket(db, Ticket(title=title, description=description, reporter="ops", department="IT"))
+
+
+def test_escalation_lost_after_triage_commit_is_retried(db) -> None:
+    from workers import claim_received, resume_pending_escalations, triage_claimed
+
+    ticket = _received(db, "Production down", "production down for every customer")
+    assert claim_received(db, "w0:test", 4, 60) == [ticket.id]
+
+    # The worker commits the triage, then dies before its bulk escalation.
+    triage_claimed(db, ticket.id, "w0:test", escalate=False)
+    db.refresh(ticket)
+    assert ticket.severity == "P1" and ticket.escalation_pending and not ticket.escalated
+
+    # Nobody else takes it over while the triaging process still holds the lease.
+    assert resume_pending_escalations() == 0
+
+    ticket.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+    assert resume_pending_escalations() == 1
+
+    db.refresh(ticket)
+    assert ticket.escalated and not ticket.escalation_pending
+    assert ticket.lifecycle_status == "ESCALATED"
+
+
+def test_dashboard_metrics_skip_received_tickets(db) -> None:
+    import main
+    from workers import claim_received, triage_claimed
+
+    ticket = _received(db, "Printer jam", "printer on floor 2 jams")
+    with TestClient(main.app) as client:
+        pending = client.get("/dashboard/metrics").json()
+        assert pending["total_tickets"] == 0
+        assert pending["by_team"] == [] and pending["by_severity"] == []
+
+        claim_received(db, "w0:test", 4, 60)
+        triage_claimed(db, ticket.id, "w0:test")
+        triaged = client.get("/dashboard/metrics").json()
+    assert triaged["total_tickets"] == 1
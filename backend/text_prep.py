@@ -0,0 +1,195 @@
+"""Bounded views of ticket text for each consumer.
+
+Descriptions are stored whole, but pasted log dumps can run to megabytes. The
+rulebook scan, the LLM prompt and the embedding model each get a capped,
+normalized view instead:
+
+- `bounded_text`: head, matching lines (errors, stack trace heads, caller-supplied
+  terms such as P1 phrases) and tail, at most TEXT_SCAN_MAX_CHARS. Computed in one
+  pass over the lowercased text and memoized, so the several rule checks made
+  for one ticket share it.
+- `llm_excerpt`: the same selection squeezed to TEXT_PROMPT_MAX_CHARS.
+- `embedding_chunks`: line-aligned chunks of at most TEXT_EMBED_CHUNK_CHARS that
+  the caller embeds and pools, weighted by chunk length, for text longer than the
+  local model's window.
+- `embedding_excerpt`: one excerpt of at most TEXT_EMBED_SINGLE_MAX_CHARS for
+  providers with a large window and one request per input (Gemini).
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from settings import env_int
+
+SCAN_MAX_CHARS = env_int("TEXT_SCAN_MAX_CHARS", 65536)
+PROMPT_MAX_CHARS = env_int("TEXT_PROMPT_MAX_CHARS", 6000)
+EMBED_CHUNK_CHARS = env_int("TEXT_EMBED_CHUNK_CHARS", 800)
+EMBED_MAX_CHUNKS = env_int("TEXT_EMBED_MAX_CHUNKS", 8)
+EMBED_SINGLE_MAX_CHARS = env_int("TEXT_EMBED_SINGLE_MAX_CHARS", 6000)
+
+# Matched against lowercased text without re.IGNORECASE, which is several times slower.
+_SALIENT_TERMS = (
+    "error",
+    "exception",
+    "fatal",
+    "fail",
+    "panic",
+    "critical",
+    "traceback",
+    "caused by",
+    "timeout",
+    "timed out",
+    "refused",
+    "denied",
+    "unavailable",
+    "killed",
+)
+_TRACE_HEAD = re.compile(r"traceback \(most recent call last\)|exception in thread|caused by:|\w+(?:error|exception)\b")
+_FRAME = re.compile(r"\s+(?:at |file \"|\.\.\. \d+ more)")
+_DIGITS = re.compile(r"\d+")
+_REPEATED = re.compile(r"  \[x(\d+)\]$")
+_ANSI = re.compile(r"\x1b\[[0-9;?]*[ -/]*[@-~]")
+_CONTROL = dict.fromkeys(c for c in range(32) if chr(c) not in "\n\t")
+_CONTROL[127] = None
+
+MAX_LINE_CHARS = 300
+TRACE_FRAMES = 3
+
+
+def clean(text: str) -> str:
+    """Strip terminal color codes and control characters; normalize line endings."""
+    return _ANSI.sub("", text).replace("\r\n", "\n").replace("\r", "\n").translate(_CONTROL)
+
+
+@lru_cache(maxsize=16)
+def _salient_pattern(terms: Tuple[str, ...]) -> "re.Pattern[str]":
+    words = sorted({t.lower() for t in _SALIENT_TERMS + terms if t}, key=len, reverse=True)
+    return re.compile("|".join(re.escape(w) for w in words))
+
+
+def _head_end(text: str, limit: int) -> int:
+    if len(text) <= limit:
+        return len(text)
+    cut = text.rfind("\n", 0, limit)
+    return cut if cut > limit // 2 else limit
+
+
+def _tail_start(text: str, limit: int, floor: int) -> int:
+    start = max(floor, len(text) - limit)
+    cut = text.find("\n", start)
+    return cut + 1 if 0 <= cut < start + limit // 2 else start
+
+
+def _line_at(text: str, pos: int, end: int) -> Tuple[int, int]:
+    """Bounds of the line around `pos`, clipped to MAX_LINE_CHARS around it."""
+    start = text.rfind("\n", 0, pos) + 1
+    stop = text.find("\n", pos, end)
+    stop = end if stop < 0 else stop
+    if stop - start > MAX_LINE_CHARS:
+        start = max(start, pos - MAX_LINE_CHARS // 2)
+        stop = min(stop, start + MAX_LINE_CHARS)
+    return start, stop
+
+
+def salient_excerpt(text: str, budget: int, terms: Tuple[str, ...] = ()) -> str:
+    """`text` itself if it fits in `budget` characters, otherwise its head, the lines
+    matching error markers or `terms` (each stack trace with its first frames,
+    repeats collapsed) and its tail, in original order."""
+    text = clean(text) if len(text) <= budget else text
+    if len(text) <= budget:
+        return text
+
+    head_end = _head_end(text, budget // 4)
+    tail_start = _tail_start(text, budget // 8, head_end)
+    room = budget - head_end - (len(text) - tail_start) - 64
+
+    lower = text.lower()
+    pattern = _salient_pattern(terms)
+    picked: Dict[str, List[str]] = {}  # signature (digits masked) -> line, plus frames for a stack trace
+    repeats: Dict[str, int] = {}
+    used = 0
+    omitted = 0
+    pos = head_end
+    while pos < tail_start:
+        m = pattern.search(lower, pos, tail_start)
+        if m is None:
+            break
+        start, stop = _line_at(text, m.start(), tail_start)
+        pos = stop + 1
+        line = text[start:stop].strip()
+        # Lines of an earlier excerpt carry their repeat count.
+        repeated = _REPEATED.search(line)
+        count = int(repeated.group(1)) if repeated else 1
+        line = line[: repeated.start()] if repeated else line
+        signature = _DIGITS.sub("#", line)
+        if signature in picked:
+            repeats[signature] += count
+            continue
+        if used + len(line) > room:
+            omitted += 1
+            continue
+
+        block = [line]
+        if _TRACE_HEAD.search(lower, start, stop):
+            # Keep the first frames of a stack trace, skip the rest of it.
+            while pos < tail_start:
+                nxt_start, nxt_stop = _line_at(text, pos, tail_start)
+                if not _FRAME.match(lower, nxt_start, nxt_stop):
+                    break
+                if len(block) <= TRACE_FRAMES:
+                    block.append(text[nxt_start:nxt_stop].rstrip())
+                pos = nxt_stop + 1
+        picked[signature] = block
+        repeats[signature] = count
+        used += sum(len(b) + 1 for b in block)
+
+    lines = [
+        "\n".join([f"{block[0]}  [x{repeats[sig]}]" if repeats[sig] > 1 else block[0]] + block[1:])
+        for sig, block in picked.items()
+    ]
+    skipped = tail_start - head_end
+    middle = "\n".join(lines)
+    note = f"[... {skipped} chars condensed to {len(lines)} matching lines"
+    note += f", {omitted} more omitted ...]" if omitted else " ...]"
+    return clean("\n".join(p for p in (text[:head_end].rstrip(), note, middle, text[tail_start:].lstrip()) if p))
+
+
+@lru_cache(maxsize=8)
+def bounded_text(text: str, terms: Tuple[str, ...] = ()) -> str:
+    """Working copy for keyword rules: at most TEXT_SCAN_MAX_CHARS, memoized per text."""
+    return salient_excerpt(text, SCAN_MAX_CHARS, terms)
+
+
+def llm_excerpt(text: str, terms: Tuple[str, ...] = ()) -> str:
+    return salient_excerpt(bounded_text(text, terms), PROMPT_MAX_CHARS, terms)
+
+
+def embedding_excerpt(text: str) -> str:
+    return salient_excerpt(bounded_text(text), EMBED_SINGLE_MAX_CHARS)
+
+
+def embedding_chunks(text: str, chunk_chars: Optional[int] = None) -> List[str]:
+    """`[text]` when it fits one chunk, else up to TEXT_EMBED_MAX_CHUNKS line-aligned chunks of its excerpt.
+
+    `chunk_chars` is the caller's measure of the model window in characters
+    (default TEXT_EMBED_CHUNK_CHARS).
+    """
+    size = max(1, chunk_chars or EMBED_CHUNK_CHARS)
+    if len(text) <= size:
+        return [text]
+    excerpt = salient_excerpt(bounded_text(text), size * EMBED_MAX_CHUNKS)
+    chunks: List[str] = []
+    pos = 0
+    while pos < len(excerpt) and len(chunks) < EMBED_MAX_CHUNKS:
+        end = min(len(excerpt), pos + size)
+        if end < len(excerpt):
+            cut = excerpt.rfind("\n", pos, end)
+            end = cut + 1 if cut > pos + size // 2 else end
+        chunk = excerpt[pos:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        pos = end
+    return chunks or [excerpt[:size]]
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import multiprocessing as mp
+import os
+import queue
+import signal
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from database import SessionLocal, engine
+from models import Ticket
+from settings import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+
+def _claim(db: Session, state: ColumnElement[bool], owner: str, limit: int, lease_seconds: int) -> List[int]:
+    """Lease up to `limit` tickets in `state` to `owner` and return their ids.
+
+    On Postgres the candidate rows are locked with FOR UPDATE SKIP LOCKED so
+    concurrent workers never block on each other. SQLite has no row locks, but it
+    serializes writers, so the single conditional UPDATE is already atomic; the
+    lease expiry lets another worker recover tickets from a crashed one.
+    """
+    now = datetime.utcnow()
+    expires = now + timedelta(seconds=lease_seconds)
+    claimable = state & or_(Ticket.lease_expires_at.is_(None), Ticket.lease_expires_at < now)
+
+    candidates = select(Ticket.id).where(claimable).order_by(Ticket.id).limit(limit)
+    if engine.dialect.name == "postgresql":
+        candidates = candidates.with_for_update(skip_locked=True)
+
+    db.execute(
+        update(Ticket)
+        .where(Ticket.id.in_(candidates.scalar_subquery()))
+        .where(claimable)
+        .values(lease_owner=owner, lease_expires_at=expires)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+    rows = db.execute(select(Ticket.id).where(Ticket.lease_owner == owner, state).order_by(Ticket.id))
+    return [int(r[0]) for r in rows]
+
+
+def claim_received(db: Session, owner: str, limit: int, lease_seconds: int) -> List[int]:
+    """Lease up to `limit` RECEIVED tickets to `owner` and return their ids."""
+    return _claim(db, Ticket.lifecycle_status == "RECEIVED", owner, limit, lease_seconds)
+
+
+def claim_pending_escalations(db: Session, owner: str, limit: int, lease_seconds: int) -> List[int]:
+    """Lease up to `limit` triaged P1s whose escalation never ran (see `escalation.defer_escalation`)."""
+    return _claim(db, Ticket.escalation_pending.is_(True), owner, limit, lease_seconds)
+
+
+def resume_pending_escalations(limit: int = 500) -> int:
+    """Escalate tickets left pending by a process that died between triage and escalation."""
+    from escalation import ESCALATION_LEASE_SECONDS, escalate_many
+
+    db = SessionLocal()
+    try:
+        ids = claim_pending_escalations(db, f"startup:{uuid.uuid4().hex[:8]}", limit, ESCALATION_LEASE_SECONDS)
+        if ids:
+            escalate_many(db, db.query(Ticket).filter(Ticket.id.in_(ids)).order_by(Ticket.id).all())
+        return len(ids)
+    except Exception:
+        logger.exception("Failed to resume pending escalations")
+        return 0
+    finally:
+        db.close()
+
+
+def triage_claimed(db: Session, ticket_id: int, owner: str, escalate: bool = True) -> Optional[Ticket]:
+    from pipeline import process_ticket
+
+    ticket = db.query(Ticket).filter(Ticket.id == ticket_id, Ticket.lease_owner == owner).first()
+    if ticket is None or ticket.lifecycle_status != "RECEIVED":
+        return None
+
+    ticket.lease_owner = None
+    ticket.lease_expires_at = None
+    process_ticket(db, ticket, escalate=escalate)
+    return ticket
+
+
+def run_worker(worker_id: str, stop: Any, events: Optional[Any] = None) -> None:
+    """Claim-and-triage loop for one worker process."""
+    from escalation import escalate_many
+    from events import bus
+    from pipeline import should_escalate
+
+    engine.dispose()  # never share pooled connections with the parent process
+    if events is not None:
+        bus.forward_to(lambda event_type, data: events.put((event_type, data)))
+
+    poll_interval = env_float("TRIAGE_WORKER_POLL_SECONDS", 0.5)
+    batch_size = env_int("TRIAGE_WORKER_BATCH", 4)
+    lease_seconds = env_int("TRIAGE_LEASE_SECONDS", 120)
+
+    while not stop.is_set():
+        owner = f"{worker_id}:{uuid.uuid4().hex[:8]}"
+        db = SessionLocal()
+        try:
+            claimed = claim_received(db, owner, batch_size, lease_seconds)
+            to_escalate: List[Ticket] = []
+            for ticket_id in claimed:
+                try:
+                    ticket = triage_claimed(db, ticket_id, owner, escalate=False)
+                    if ticket is not None and should_escalate(ticket):
+                        to_escalate.append(ticket)
+                except Exception:
+                    # The lease expires and another worker retries the ticket.
+                    logger.exception("Triage worker %s failed on ticket %s", worker_id, ticket_id)
+                    db.rollback()
+            # Escalations lost by a worker (or API process) that died after its triage commit.
+            retried = claim_pending_escalations(db, owner, batch_size, lease_seconds)
+            if retried:
+                to_escalate.extend(db.query(Ticket).filter(Ticket.id.in_(retried)).order_by(Ticket.id).all())
+            if to_escalate:
+                # P1s from one batch share a single bulk Jira request.
+                try:
+                    escalate_many(db, to_escalate)
+                except Exception:
+                    logger.exception("Triage worker %s failed to escalate %d tickets", worker_id, len(to_escalate))
+                    db.rollback()
+        except Exception:
+            logger.exception("Triage worker %s failed to claim tickets", worker_id)
+            claimed, retried = [], []
+        finally:
+            db.close()
+
+        if not claimed and not retried:
+            stop.wait(poll_interval)
+
+
+def _worker_entry(worker_id: str, stop: Any, events: Optional[Any]) -> None:
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the parent coordinates shutdown
+    run_worker(worker_id, stop, events)
+
+
+class WorkerPool:
+    """Triage worker processes plus a thread relaying their events to this process's bus."""
+
+    def __init__(self, processes: int) -> None:
+        self._ctx = mp.get_context("spawn")
+        self._stop = self._ctx.Event()
+        self._events = self._ctx.Queue()
+        self._procs = [
+            self._ctx.Process(target=_worker_entry, args=(f"w{i}", self._stop, self._events), daemon=True)
+            for i in range(processes)
+        ]
+        self._relay = threading.Thread(target=self._relay_events, daemon=True)
+
+    def _relay_events(self) -> None:
+        from events import bus
+
+        while not self._stop.is_set():
+            try:
+                event_type, data = self._events.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            bus.publish(event_type, data)
+
+    def start(self) -> "WorkerPool":
+        for p in self._procs:
+            p.start()
+        self._relay.start()
+        return self
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        for p in self._procs:
+            p.join(timeout)
+            if p.is_alive():
+                p.terminate()
+        self._relay.join(timeout)
+
+
+class ExternalTriageWatcher:
+    """Publishes a `resync` when standalone `python -m workers` processes triage tickets.
+
+    Their events go to their own process's bus, so the API cannot relay deltas; it
+    notices the triage instead from the RECEIVED backlog shrinking by more than the
+    intake adds, polled every TRIAGE_EXTERNAL_POLL_SECONDS.
+    """
+
+    def __init__(self) -> None:
+        self.interval = env_float("TRIAGE_EXTERNAL_POLL_SECONDS", 5)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def _snapshot(db: Session) -> Tuple[int, int]:
+        pending = db.execute(select(func.count()).where(Ticket.lifecycle_status == "RECEIVED")).scalar()
+        newest = db.execute(select(func.max(Ticket.id))).scalar()
+        return int(pending or 0), int(newest or 0)
+
+    def _run(self) -> None:
+        from events import RESYNC, bus
+
+        previous: Optional[Tuple[int, int]] = None
+        while not self._stop.is_set():
+            db = SessionLocal()
+            try:
+                pending, newest = self._snapshot(db)
+                if previous is not None:
+                    received = db.execute(select(func.count()).where(Ticket.id > previous[1])).scalar() or 0
+                    triaged = previous[0] + int(received) - pending
+                    if triaged > 0:
+                        bus.publish(RESYNC, {"reason": "external_workers", "triaged": triaged})
+                previous = (pending, newest)
+            except Exception:
+                logger.exception("External triage watcher failed")
+            finally:
+                db.close()
+            self._stop.wait(self.interval)
+
+    def start(self) -> "ExternalTriageWatcher":
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        self._thread.join(timeout)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run asynchronous triage workers for RECEIVED tickets.")
+    parser.add_argument("--processes", type=int, default=env_int("TRIAGE_WORKERS", os.cpu_count() or 1))
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+    pool = WorkerPool(args.processes).start()
+    logger.info("Started %d triage workers", args.processes)
+    while not stop.wait(1.0):
+        pass
+    pool.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-import React, { useEffect, useMemo, useState } from "react";
+import React, { useEffect, useMemo, useRef, useState } from "react";
 import {
   Bar,
   BarChart,
@@ -13,7 +13,31 @@ import {
 } from "recharts";
 import MetricsCards from "../components/MetricsCards.jsx";
 import TicketCard from "../components/TicketCard.jsx";
-import { getMetrics, seedDemo, simulateDatadogAlert } from "../services/api.js";
+import { getMetrics, seedDemo, simulateDatadogAlert, subscribeTicketEvents } from "../services/api.js";
+
+function mergeCounts(rows, delta) {
+  const counts = new Map(rows.map((r) => [r.name, r.value]));
+  for (const [name, value] of Object.entries(delta)) {
+    counts.set(name, (counts.get(name) || 0) + value);
+  }
+  return [...counts.entries()]
+    .filter(([, value]) => value > 0)
+    .sort(([a], [b]) => a.localeCompare(b))
+    .map(([name, value]) => ({ name, value }));
+}
+
+function applyMetricsDelta(metrics, delta) {
+  if (!metrics || !delta) return metrics;
+  const next = { ...metrics };
+  for (const [key, value] of Object.entries(delta)) {
+    if (key === "by_severity" || key === "by_team") {
+      next[key] = mergeCounts(metrics[key] || [], value);
+    } else if (typeof value === "number") {
+      next[key] = Math.round(((next[key] || 0) + value) * 100) / 100;
+    }
+  }
+  return next;
+}
 
 export default function Dashboard() {
   const [metrics, setMetrics] = useState(null);
@@ -21,21 +45,54 @@ export default function Dashboard() {
   const [loading, setLoading] = useState(false);
   const [lastAlertTicket, setLastAlertTicket] = useState(null);
 
-  async function refresh() {
+  const unsubscribeRef = useRef(() => {});
+  const generationRef = useRef(0);
+
+  async function fetchSnapshot() {
     setError("");
     setLoading(true);
     try {
-      const m = await getMetrics();
-      setMetrics(m);
+      return await getMetrics();
     } catch (e) {
       setError("Failed to load metrics. Is backend running on :8000?");
+      return null;
     } finally {
       setLoading(false);
     }
   }
 
+  // Snapshot first, then stream every event after the last one published before it, so
+  // nothing in between is lost; events whose version the snapshot already reflects are
+  // skipped, so nothing is counted twice. Refresh and resync both start over here.
+  async function connect() {
+    const generation = ++generationRef.current;
+    unsubscribeRef.current();
+    unsubscribeRef.current = () => {};
+
+    const snapshot = await fetchSnapshot();
+    if (generation !== generationRef.current || !snapshot) return;
+    setMetrics(snapshot);
+    unsubscribeRef.current = subscribeTicketEvents(
+      (event) => {
+        if (event.type === "resync") {
+          connect();
+          return;
+        }
+        const version = event.data.version;
+        if (version != null && version <= snapshot.snapshot_version) return;
+        setMetrics((m) => applyMetricsDelta(m, event.data.metrics_delta));
+      },
+      undefined,
+      snapshot.snapshot_event_id
+    );
+  }
+
   useEffect(() => {
-    refresh();
+    connect();
+    return () => {
+      generationRef.current += 1;
+      unsubscribeRef.current();
+    };
   }, []);
 
   const severityData = useMemo(() => metrics?.by_severity || [], [metrics]);
@@ -57,7 +114,6 @@ export default function Dashboard() {
               setError("");
               try {
                 await seedDemo();
-                await refresh();
               } catch {
                 setError("Seed failed. Ensure backend is running.");
               }
@@ -67,7 +123,7 @@ export default function Dashboard() {
             Seed Demo Data
           </button>
           <button
-            onClick={refresh}
+            onClick={connect}
             className="rounded-lg bg-slate-900 px-3 py-2 text-sm font-medium text-white shadow-sm hover:bg-slate-800 dark:bg-slate-100 dark:text-slate-900 dark:hover:bg-white"
           >
             Refresh
@@ -79,7 +135,6 @@ export default function Dashboard() {
               try {
                 const t = await simulateDatadogAlert();
                 setLastAlertTicket(t);
-                await refresh();
               } catch (e) {
                 setError(e?.response?.data?.detail || "Datadog simulation failed.");
               }
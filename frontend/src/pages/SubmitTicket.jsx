@@ -1,20 +1,45 @@
-import React, { useState } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import TicketForm from "../components/TicketForm.jsx";
 import TicketCard from "../components/TicketCard.jsx";
-import { createTicket } from "../services/api.js";
+import { createTicket, getTicket } from "../services/api.js";
+
+const POLL_INTERVAL_MS = 1000;
+const POLL_TIMEOUT_MS = 120000;
+
+// In async mode the API answers 202 with the ticket still RECEIVED (placeholder severity and
+// team); poll until a worker has triaged it.
+async function waitForTriage(ticket, isCancelled) {
+  const deadline = Date.now() + POLL_TIMEOUT_MS;
+  let current = ticket;
+  while (current.lifecycle_status === "RECEIVED" && Date.now() < deadline && !isCancelled()) {
+    await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+    current = await getTicket(current.id);
+  }
+  return current;
+}
 
 export default function SubmitTicket() {
   const [loading, setLoading] = useState(false);
   const [result, setResult] = useState(null);
   const [error, setError] = useState("");
+  const unmounted = useRef(false);
+
+  useEffect(() => () => {
+    unmounted.current = true;
+  }, []);
 
   async function onSubmit(form) {
     setError("");
     setResult(null);
     setLoading(true);
     try {
-      const data = await createTicket(form);
-      setResult(data);
+      const data = await waitForTriage(await createTicket(form), () => unmounted.current);
+      if (unmounted.current) return;
+      if (data.lifecycle_status === "RECEIVED") {
+        setError(`Ticket #${data.id} is still queued for triage; check the ticket list later.`);
+      } else {
+        setResult(data);
+      }
     } catch (e) {
       setError(e?.response?.data?.detail || "Failed to submit ticket. Is backend running on :8000?");
     } finally {
@@ -12,16 +12,45 @@ export async function createTicket(payload) {
   return res.data;
 }
 
+export async function getTicket(id) {
+  const res = await api.get(`/tickets/${id}`);
+  return res.data;
+}
+
 export async function listTickets() {
   const res = await api.get("/tickets");
   return res.data;
 }
 
+// Metrics snapshot; `snapshot_event_id` / `snapshot_version` tie it to the event stream.
 export async function getMetrics() {
   const res = await api.get("/dashboard/metrics");
   return res.data;
 }
 
+const TICKET_EVENT_TYPES = ["ticket.created", "ticket.triaged", "ticket.refined", "ticket.status_changed", "ticket.escalated", "resync"];
+
+// Subscribes to the backend's server-sent event stream, replaying events after `since`
+// when given. EventSource reconnects on its own and sends Last-Event-ID, so missed
+// events are replayed (or a "resync" event is sent).
+export function subscribeTicketEvents(onEvent, onError, since = null) {
+  const query = since == null ? "" : `?since=${since}`;
+  const source = new EventSource(`${baseURL}/events/stream${query}`);
+  for (const type of TICKET_EVENT_TYPES) {
+    source.addEventListener(type, (e) => {
+      let data = {};
+      try {
+        data = JSON.parse(e.data);
+      } catch {
+        data = {};
+      }
+      onEvent({ id: e.lastEventId, type, data });
+    });
+  }
+  if (onError) source.onerror = onError;
+  return () => source.close();
+}
+
 export async function seedDemo() {
   const res = await api.post("/seed");
   return res.data;